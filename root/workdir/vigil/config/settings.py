@@ -55,12 +55,109 @@ class LLMConfig:
     
     # Gemini (via Poe API)
     GEMINI_MODEL = "Gemini-2.5-Flash"
+
+    # Cheap models for background work (history summaries)
+    SUMMARY_MODEL = "gpt-4o-mini"
+    CLAUDE_SUMMARY_MODEL = "claude-3-5-haiku-20241022"
+    SUMMARY_MAX_TOKENS = 400
     
+    # Mark the static system prompt and history prefix as cacheable in
+    # Anthropic requests (OpenAI caches repeated prefixes automatically)
+    PROMPT_CACHING = True
+
+    # Trinity mode: seconds to wait for each provider before synthesizing
+    # with whichever answers arrived
+    TRINITY_TIMEOUT_SECONDS = 20.0
+
+    # Provider routing: rolling window of calls kept per provider
+    ROUTER_WINDOW = 50
+    # Providers failing more than this fraction of recent calls are tried last
+    ROUTER_DEMOTE_ERROR_RATE = 0.5
+    # Hedge to the next provider once a call runs past this latency percentile
+    HEDGE_PERCENTILE = 95
+    # Calls needed before a provider's own percentiles are trusted
+    HEDGE_MIN_SAMPLES = 5
+    # Hedge delay used until then, and the floor afterwards (seconds)
+    HEDGE_DEFAULT_DELAY_SECONDS = 4.0
+    HEDGE_MIN_DELAY_SECONDS = 0.5
+    # Circuit breaker: consecutive failures that take a provider out of
+    # rotation, and seconds before a single probe call is allowed
+    BREAKER_FAILURE_THRESHOLD = 3
+    BREAKER_COOLDOWN_SECONDS = 30.0
+
+    # Response cache for repeated questions (opt-in)
+    RESPONSE_CACHE_ENABLED = False
+    # How long a cached answer stays valid (seconds)
+    RESPONSE_CACHE_TTL_SECONDS = 3600
+    # Answers kept in memory / on disk
+    RESPONSE_CACHE_MAX_ENTRIES = 256
+    RESPONSE_CACHE_MAX_DISK_ENTRIES = 5000
+    # Temperatures above this are creative and never cached
+    RESPONSE_CACHE_MAX_TEMPERATURE = 0.7
+
+    # Non-interactive work (reflection, agent tasks): "worker" sends it
+    # through Brain.think in the background; "provider" uses the
+    # Anthropic/OpenAI batch endpoints
+    BATCH_MODE = "worker"
+    # Worker pacing, and how long interactive calls must be idle first
+    BATCH_REQUESTS_PER_MINUTE = 20
+    BATCH_IDLE_SECONDS = 2.0
+    # Provider batches: preferred providers, size, max wait before sending, poll interval
+    BATCH_PROVIDERS = ["anthropic", "openai"]
+    BATCH_MAX_SIZE = 50
+    BATCH_MAX_WAIT_SECONDS = 60
+    BATCH_POLL_SECONDS = 30
+    # On shutdown, keep answering queued batch jobs for up to this long;
+    # what's left is saved and resumed on the next start
+    BATCH_DRAIN_SECONDS = 10
+
+    # USD per million (input, output) tokens, for usage ledger cost estimates
+    MODEL_PRICES = {
+        "gpt-4o": (2.50, 10.00),
+        "gpt-4o-mini": (0.15, 0.60),
+        "claude-sonnet-4-20250514": (3.00, 15.00),
+        "claude-3-5-haiku-20241022": (0.80, 4.00),
+        "Gemini-2.5-Flash": (0.30, 2.50),
+    }
+
     # Temperature settings
     DEFAULT_TEMPERATURE = 0.7
     CREATIVE_TEMPERATURE = 0.9
     PRECISE_TEMPERATURE = 0.3
 
+# =============================================================================
+# MOCK LLM (offline benchmarking)
+# =============================================================================
+
+class MockLLMConfig:
+    # Serve all LLM calls from a local stand-in (set VIGIL_MOCK_LLM=1)
+    ENABLED = os.getenv("VIGIL_MOCK_LLM", "").lower() in ("1", "true", "yes")
+    # Also point the OpenAI and Anthropic clients at the stand-in, so
+    # routing, fallback and Trinity run without API keys
+    MOCK_ALL_PROVIDERS = True
+    HOST = "127.0.0.1"
+    PORT = 0  # 0 = any free port
+    MODEL = "vigil-mock"
+    # Seed for failure injection and jitter, so runs are reproducible
+    SEED = 1234
+
+    # Default response profile
+    LATENCY_SECONDS = 0.3  # Time to first token
+    LATENCY_JITTER_SECONDS = 0.1
+    TOKENS_PER_SECOND = 80.0
+    CHUNK_TOKENS = 3  # Tokens per streamed chunk
+    RESPONSE_TOKENS = 60
+    FAILURE_RATE = 0.0  # Fraction of requests answered with FAILURE_STATUS
+    FAILURE_STATUS = 500
+    STALL_RATE = 0.0  # Fraction of requests held for STALL_SECONDS first
+    STALL_SECONDS = 30.0
+
+    # Per-provider overrides of the profile above
+    PROFILES = {
+        "openai": {"latency": 0.3},
+        "anthropic": {"latency": 0.5},
+    }
+
 # =============================================================================
 # VOICE CONFIGURATION
 # =============================================================================
@@ -92,6 +189,10 @@ class VoiceConfig:
     SAMPLE_RATE = 16000
     CHANNELS = 1
 
+    # Streaming speech: sentences shorter than this are held and joined to
+    # the next one so TTS isn't handed fragments like "Yes."
+    STREAM_MIN_SENTENCE_CHARS = 20
+
 # =============================================================================
 # PATHS
 # =============================================================================
@@ -136,12 +237,69 @@ class MemoryConfig:
     # How many conversation turns to keep in short-term memory
     SHORT_TERM_LIMIT = 20
     
-    # How many interactions to summarize for long-term memory
+    # How many evicted messages to fold into the rolling history summary
+    # per summarization call
     LONG_TERM_SUMMARY_THRESHOLD = 50
     
     # Maximum tokens for context window
     MAX_CONTEXT_TOKENS = 8000
 
+    # Append each daily-log change to a JSONL journal instead of rewriting
+    # the whole day's JSON file; the journal is compacted at day rollover
+    JOURNAL_DAILY_LOGS = True
+
+    # Storage engine: "json" (daily log files) or "sqlite" (indexed history,
+    # import existing logs with `python -m core.memory_store`)
+    STORAGE_BACKEND = "json"
+
+    # Write-behind persistence: memory changes are queued and flushed by a
+    # background thread every FLUSH_INTERVAL_SECONDS, or sooner once
+    # FLUSH_MAX_PENDING changes are waiting
+    WRITE_BEHIND = True
+    FLUSH_INTERVAL_SECONDS = 2.0
+    FLUSH_MAX_PENDING = 64
+
+    # Daily logs older than this many days are moved into compressed
+    # monthly archives (daily_logs/archive/<YYYY-MM>.jsonl.gz)
+    ARCHIVE_AFTER_DAYS = 30
+
+# =============================================================================
+# KNOWLEDGE BASE CONFIGURATION
+# =============================================================================
+
+class KnowledgeConfig:
+    # Share of a search result's score that comes from entry importance;
+    # the rest is BM25 text relevance (0.0 = relevance only)
+    IMPORTANCE_WEIGHT = 0.3
+
+    # Semantic retrieval. Embeddings are computed on the CPU with
+    # sentence-transformers when installed, otherwise with a hashed
+    # bag-of-words fallback; NumPy is required either way.
+    VECTOR_SEARCH_ENABLED = True
+    EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+    # Dimension of the hashed fallback embeddings
+    HASH_EMBEDDING_DIM = 384
+    # Texts embedded per model call when (re-)embedding many entries
+    EMBEDDING_BATCH_SIZE = 64
+    # Minimum cosine similarity for a semantic match to count
+    VECTOR_MIN_SIMILARITY = 0.35
+    # Above this many vectors, search an IVF index instead of every row
+    VECTOR_IVF_MIN_ROWS = 50000
+    # Clusters searched per IVF query
+    VECTOR_IVF_PROBES = 8
+
+    # Bulk import: characters read from a file at a time
+    IMPORT_CHUNK_CHARS = 1 << 20
+    # Bulk import: entries indexed and embedded together
+    IMPORT_BATCH_SIZE = 1000
+
+    # Storage: the active log segment rolls over at this size
+    STORE_SEGMENT_BYTES = 4 * 1024 * 1024
+    # Storage: rewrite the manifest after this many logged changes
+    STORE_CHECKPOINT_EVERY = 1000
+    # Storage: compact once this share of the log is superseded records
+    STORE_COMPACT_DEAD_RATIO = 0.5
+
 # =============================================================================
 # SYSTEM PROMPTS
 # =============================================================================
@@ -6,8 +6,9 @@ Advanced autonomous agent capabilities for Vigil
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass, field
 from enum import Enum
+import asyncio
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Import task manager enums for type checking
 try:
@@ -59,9 +60,11 @@ class AgentSystem:
     - PROJECT_MANAGER: Actively manages projects, tracks commitments, reminds user
     """
     
-    def __init__(self, brain=None, task_manager=None, memory=None):
+    def __init__(self, brain=None, task_manager=None, memory=None, async_brain=None, batch=None):
         """Initialize agent system."""
         self.brain = brain
+        self.async_brain = async_brain
+        self.batch = batch
         self.task_manager = task_manager
         self.memory = memory
         
@@ -75,6 +78,10 @@ class AgentSystem:
         self.pm_check_interval = 3600  # Check every hour
         self.pm_last_check = time.time()
         self.pm_active_projects: List[str] = []
+
+        # Tasks queued before a restart finish through this handler
+        if self.batch:
+            self.batch.register_handler("agent", self._finish_batch_task)
         
         # Active monitoring flags
         self.monitoring_active = False
@@ -172,6 +179,18 @@ class AgentSystem:
         
         self.pm_last_check = current_time
         
+        # Check commitment deadlines (indexed by deadline in memory)
+        if self.memory:
+            overdue = self.memory.overdue()
+            if overdue:
+                names = ", ".join([c["commitment"] for c in overdue[:3]])
+                return f"You have {len(overdue)} overdue commitment(s): {names}. Want to recommit or close them out?"
+            
+            due_soon = self.memory.due_within(timedelta(hours=24))
+            if due_soon:
+                names = ", ".join([c["commitment"] for c in due_soon[:3]])
+                return f"Heads up, {len(due_soon)} commitment(s) due in the next 24 hours: {names}"
+        
         if not self.task_manager:
             return None
         
@@ -236,13 +255,10 @@ class AgentSystem:
         try:
             # Use brain to figure out how to execute the task
             if self.brain:
-                prompt = f"""As an autonomous agent, execute this task:
-                
-Task: {task.description}
-
-Break it down into steps and execute them. Report the result.
-"""
-                response = self.brain.think(prompt)
+                response = self.brain.think(
+                    self._autonomous_prompt(task),
+                    conversation=self.brain.new_conversation(f"task-{task_id}", caller="agent"),
+                )
                 
                 if response:
                     task.result = response.text
@@ -258,6 +274,134 @@ Break it down into steps and execute them. Report the result.
             task.error = str(e)
             return False
     
+    def _autonomous_prompt(self, task: AgentTask) -> str:
+        """Build the prompt for an autonomous task."""
+        return f"""As an autonomous agent, execute this task:
+                
+Task: {task.description}
+
+Break it down into steps and execute them. Report the result.
+"""
+
+    async def execute_autonomous_task_async(self, task_id: str) -> bool:
+        """
+        Execute an autonomous task on the async brain.
+
+        Each task gets its own conversation, so tasks can run together
+        without mixing their histories or the voice conversation.
+        """
+        task = self.autonomous_tasks.get(task_id)
+        if not task:
+            return False
+        
+        if self.current_mode != AgentMode.AUTONOMOUS:
+            print(f"[Agent] Cannot execute autonomous task in {self.current_mode.value} mode")
+            return False
+        
+        if not self.async_brain:
+            task.status = "failed"
+            task.error = "No brain available"
+            return False
+        
+        task.status = "running"
+        session_id = f"task-{task_id}"
+        try:
+            self.async_brain.session(session_id, caller="agent")
+            response = await self.async_brain.think(self._autonomous_prompt(task), session=session_id)
+            if response:
+                task.result = response.text
+                task.status = "completed"
+                return True
+            task.status = "failed"
+            task.error = "No response from brain"
+            return False
+        except Exception as e:
+            task.status = "failed"
+            task.error = str(e)
+            return False
+        finally:
+            self.async_brain.end_session(session_id)
+
+    def run_autonomous_tasks(self, task_ids: Optional[List[str]] = None):
+        """
+        Run autonomous tasks concurrently without blocking the caller.
+
+        Args:
+            task_ids: Tasks to run (None = every pending task)
+
+        Returns:
+            Future resolving to {task_id: success}, or None without an async brain
+        """
+        if not self.async_brain:
+            return None
+        if task_ids is None:
+            task_ids = [tid for tid, t in self.autonomous_tasks.items() if t.status == "pending"]
+
+        async def run_all():
+            results = await asyncio.gather(*(self.execute_autonomous_task_async(tid) for tid in task_ids))
+            return dict(zip(task_ids, results))
+
+        return self.async_brain.submit(run_all())
+
+    def submit_autonomous_tasks(
+        self,
+        task_ids: Optional[List[str]] = None,
+        callback: Optional[Callable[[AgentTask], None]] = None,
+    ) -> int:
+        """
+        Hand autonomous tasks to the batch processor.
+
+        Unlike run_autonomous_tasks(), this is for work nobody is waiting
+        on: jobs yield to interactive traffic and are rate limited.
+        `callback(task)` runs as each task finishes.
+
+        Returns:
+            Number of tasks submitted
+        """
+        if not self.batch:
+            return 0
+        if self.current_mode != AgentMode.AUTONOMOUS:
+            print(f"[Agent] Cannot execute autonomous task in {self.current_mode.value} mode")
+            return 0
+        if task_ids is None:
+            task_ids = [tid for tid, t in self.autonomous_tasks.items() if t.status == "pending"]
+
+        def on_done(job):
+            task = self._finish_batch_task(job)
+            if task and callback:
+                callback(task)
+
+        submitted = 0
+        for task_id in task_ids:
+            task = self.autonomous_tasks.get(task_id)
+            if not task:
+                continue
+            task.status = "queued"
+            self.batch.submit(
+                self._autonomous_prompt(task),
+                on_done,
+                caller="agent",
+                metadata={"task_id": task_id},
+            )
+            submitted += 1
+        return submitted
+
+    def _finish_batch_task(self, job) -> Optional[AgentTask]:
+        """Record a batch job's outcome on its autonomous task."""
+        task = self.autonomous_tasks.get(job.metadata.get("task_id"))
+        if not task:
+            # Tasks live in memory, so one queued before a restart is gone
+            outcome = "completed" if job.response else f"failed ({job.error})"
+            print(f"[Agent] Task {job.metadata.get('task_id')} from a previous run {outcome}")
+            return None
+        if job.response:
+            task.result = job.response.text
+            task.status = "completed"
+        else:
+            task.status = "failed"
+            task.error = job.error
+        return task
+
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get status of an autonomous task."""
         task = self.autonomous_tasks.get(task_id)
@@ -5,7 +5,9 @@ Provides an always-on-top overlay for quick access to Vigil
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-from typing import Optional, Callable
+from concurrent.futures import Future
+from typing import Optional, Callable, Union
+import queue
 import threading
 
 
@@ -17,12 +19,21 @@ class AlwaysOnTopInterface:
     
     def __init__(
         self,
-        on_message_callback: Optional[Callable[[str], str]] = None,
+        on_message_callback: Optional[Callable[[str], Union[str, Future]]] = None,
         on_close_callback: Optional[Callable] = None
     ):
-        """Initialize the interface."""
+        """
+        Initialize the interface.
+
+        on_message_callback may return the reply text, or a Future that
+        resolves to it; a Future keeps the window responsive while the
+        reply is generated.
+        """
         self.on_message_callback = on_message_callback
         self.on_close_callback = on_close_callback
+
+        # Replies finished off the Tk thread, waiting to be displayed
+        self._pending_replies: queue.Queue = queue.Queue()
         
         self.root = None
         self.is_running = False
@@ -53,6 +64,9 @@ class AlwaysOnTopInterface:
         
         # Hotkey to toggle visibility (Ctrl+Shift+V)
         self.root.bind('<Control-Shift-V>', self._toggle_visibility)
+
+        # Display replies that arrive from other threads
+        self.root.after(100, self._poll_replies)
     
     def _create_ui(self):
         """Create the UI components."""
@@ -180,12 +194,30 @@ class AlwaysOnTopInterface:
         if self.on_message_callback:
             try:
                 response = self.on_message_callback(message)
-                self._add_message("Vigil", response, "assistant")
+                if isinstance(response, Future):
+                    response.add_done_callback(self._pending_replies.put)
+                else:
+                    self._add_message("Vigil", response, "assistant")
             except Exception as e:
                 self._add_message("System", f"Error: {e}", "error")
         else:
             self._add_message("Vigil", "Message received (no callback set)", "assistant")
     
+    def _poll_replies(self):
+        """Show replies from completed Futures (Tk widgets are only touched here)."""
+        while True:
+            try:
+                future = self._pending_replies.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self._add_message("Vigil", future.result(), "assistant")
+            except Exception as e:
+                self._add_message("System", f"Error: {e}", "error")
+
+        if self.is_running and self.root:
+            self.root.after(100, self._poll_replies)
+
     def _add_message(self, sender: str, message: str, msg_type: str = "normal"):
         """Add a message to the chat display."""
         if not self.text_display:
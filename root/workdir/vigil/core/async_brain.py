@@ -0,0 +1,554 @@
+"""
+VIGIL - Async Brain
+Asyncio LLM orchestration with per-session conversations
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Dict, List, Optional, Union
+
+from config.settings import (
+    OPENAI_API_KEY,
+    ANTHROPIC_API_KEY,
+    POE_API_KEY,
+    LLMConfig,
+    MemoryConfig,
+    MockLLMConfig,
+    BOT_NAME,
+    get_system_prompt,
+)
+from core.brain import (
+    Brain,
+    LLMResponse,
+    Provider,
+    estimate_request_tokens,
+    format_anthropic_messages,
+    format_openai_messages,
+    format_poe_messages,
+    record_usage,
+)
+from core.conversation import (
+    MESSAGE_OVERHEAD_TOKENS,
+    Conversation,
+    estimate_tokens,
+    format_summary,
+    select_window,
+)
+from core.ledger import UsageLedger
+from core.router import PriorityGate, ProviderRouter
+
+
+class AsyncBrain:
+    """
+    Asyncio counterpart of Brain.
+
+    One AsyncOpenAI and one AsyncAnthropic client, each with its own
+    pooled HTTP connections, serve every request. History lives in a
+    Conversation per session rather than one shared list, so any number
+    of requests can run concurrently on one event loop.
+
+    Sync callers (the Tk interface, agent tasks) use submit() to run a
+    coroutine on the brain's background loop and get a Future back. The
+    clients bind to that loop on first use, so all calls should go
+    through it.
+    """
+
+    def __init__(self, router: ProviderRouter = None, ledger: UsageLedger = None, priority: PriorityGate = None):
+        # Initialize OpenAI
+        self.openai_client = None
+        if OPENAI_API_KEY:
+            try:
+                from openai import AsyncOpenAI
+                self.openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+            except Exception as e:
+                print(f"[{BOT_NAME}] Async OpenAI init error: {e}")
+
+        # Initialize Anthropic
+        self.anthropic_client = None
+        if ANTHROPIC_API_KEY:
+            try:
+                from anthropic import AsyncAnthropic
+                self.anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+            except Exception as e:
+                print(f"[{BOT_NAME}] Async Anthropic init error: {e}")
+
+        # Poe (for Gemini)
+        self.poe_available = bool(POE_API_KEY)
+
+        # Local stand-in for offline benchmarking (VIGIL_MOCK_LLM=1)
+        self.mock_client = None
+        if MockLLMConfig.ENABLED:
+            self._init_mock_clients()
+
+        # System prompt
+        self.system_prompt = get_system_prompt()
+        self._system_prompt_tokens = estimate_tokens(self.system_prompt) + MESSAGE_OVERHEAD_TOKENS
+
+        # Pass the sync Brain's router to share provider health and breakers
+        self.router = router or ProviderRouter()
+
+        # Pass the sync Brain's ledger too: two ledgers must not share a directory
+        self._owns_ledger = ledger is None
+        self.ledger = ledger or UsageLedger()
+
+        # Interface and agent calls count as interactive for batch work
+        self.priority = priority or PriorityGate()
+
+        # session_id -> Conversation
+        self.sessions: Dict[str, Conversation] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    def _init_mock_clients(self):
+        """Point clients at the mock LLM server instead of the real APIs."""
+        from openai import AsyncOpenAI
+        from anthropic import AsyncAnthropic
+        from core.mock_llm import get_mock_server
+
+        server = get_mock_server()
+        # No SDK retries, so injected failures reach the breakers and router as-is
+        self.mock_client = AsyncOpenAI(api_key="mock", base_url=server.base_url("mock") + "/v1", max_retries=0)
+        if MockLLMConfig.MOCK_ALL_PROVIDERS:
+            self.openai_client = AsyncOpenAI(api_key="mock", base_url=server.base_url("openai") + "/v1", max_retries=0)
+            self.anthropic_client = AsyncAnthropic(api_key="mock", base_url=server.base_url("anthropic"), max_retries=0)
+            self.poe_available = False
+
+    # -------------------------------------------------------------------------
+    # Sessions
+    # -------------------------------------------------------------------------
+
+    def session(self, session_id: str = "default", caller: str = None) -> Conversation:
+        """
+        Get (creating if needed) the conversation for a session.
+
+        `caller` labels the session's calls in the usage ledger
+        (default: session_id).
+        """
+        if session_id not in self.sessions:
+            self.sessions[session_id] = Conversation(session_id, caller=caller)
+        return self.sessions[session_id]
+
+    def end_session(self, session_id: str):
+        """Forget a session's conversation."""
+        self.sessions.pop(session_id, None)
+
+    def _resolve(self, session: Union[str, Conversation, None]) -> Conversation:
+        """Accept a session ID or a Conversation."""
+        if isinstance(session, Conversation):
+            return session
+        return self.session(session or "default")
+
+    def _history_token_budget(self, summary: str) -> int:
+        """Tokens available for history once the system prompt and summary are paid for."""
+        summary_tokens = estimate_tokens(summary) + MESSAGE_OVERHEAD_TOKENS if summary else 0
+        return MemoryConfig.MAX_CONTEXT_TOKENS - self._system_prompt_tokens - summary_tokens
+
+    def _request_parts(self, prompt: str, conversation: Conversation, context: str = None) -> tuple:
+        """Summary block and message window for a prompt; the conversation is not modified."""
+        summary = format_summary(conversation.summary)
+        window = select_window(conversation.with_prompt(prompt), self._history_token_budget(summary), context)
+        return summary, window
+
+    def _record_turn(self, conversation: Conversation, prompt: str, text: str):
+        """Add a completed exchange to a conversation and trim it."""
+        conversation.add("user", prompt)
+        conversation.add("assistant", text)
+        # Sessions are short-lived; trimmed turns are dropped rather than summarized
+        conversation.trim(
+            MemoryConfig.SHORT_TERM_LIMIT * 2,
+            self._history_token_budget(format_summary(conversation.summary)),
+        )
+
+    # -------------------------------------------------------------------------
+    # Providers
+    # -------------------------------------------------------------------------
+
+    async def think_with_openai(
+        self,
+        prompt: str,
+        conversation: Conversation,
+        temperature: float = None,
+        max_tokens: int = 2000,
+        context: str = None,
+    ) -> Optional[LLMResponse]:
+        """Generate a response using OpenAI GPT-4o."""
+        if not self.openai_client:
+            return None
+        return await self._chat_completion(
+            self.openai_client, Provider.OPENAI, prompt, conversation, temperature, max_tokens, context
+        )
+
+    async def think_with_mock(
+        self,
+        prompt: str,
+        conversation: Conversation,
+        temperature: float = None,
+        max_tokens: int = 2000,
+        context: str = None,
+    ) -> Optional[LLMResponse]:
+        """Generate a response using the mock LLM server."""
+        if not self.mock_client:
+            return None
+        return await self._chat_completion(
+            self.mock_client, Provider.MOCK, prompt, conversation, temperature, max_tokens, context
+        )
+
+    async def _chat_completion(
+        self,
+        client,
+        provider: Provider,
+        prompt: str,
+        conversation: Conversation,
+        temperature: float,
+        max_tokens: int,
+        context: str,
+    ) -> Optional[LLMResponse]:
+        """Run one request against an OpenAI-compatible chat completions API."""
+        model = Brain._model_name(provider)
+        try:
+            summary, window = self._request_parts(prompt, conversation, context)
+            response = await client.chat.completions.create(
+                model=model,
+                messages=format_openai_messages(self.system_prompt, summary, window),
+                temperature=temperature or LLMConfig.DEFAULT_TEMPERATURE,
+                max_tokens=max_tokens,
+            )
+            usage = response.usage
+            details = getattr(usage, "prompt_tokens_details", None)
+            return LLMResponse(
+                text=response.choices[0].message.content,
+                provider=provider,
+                model=model,
+                tokens_used=usage.total_tokens if usage else 0,
+                prompt_tokens=usage.prompt_tokens if usage else 0,
+                completion_tokens=usage.completion_tokens if usage else 0,
+                metadata={"cached_tokens": getattr(details, "cached_tokens", 0) or 0},
+            )
+        except Exception as e:
+            print(f"[{BOT_NAME}] Async {provider.value} error: {e}")
+            return None
+
+    async def think_with_claude(
+        self,
+        prompt: str,
+        conversation: Conversation,
+        temperature: float = None,
+        max_tokens: int = 2000,
+        context: str = None,
+    ) -> Optional[LLMResponse]:
+        """Generate a response using Anthropic Claude."""
+        if not self.anthropic_client:
+            return None
+
+        try:
+            summary, window = self._request_parts(prompt, conversation, context)
+            system_prompt, messages = format_anthropic_messages(self.system_prompt, summary, window)
+            response = await self.anthropic_client.messages.create(
+                model=LLMConfig.CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                system=system_prompt,
+                messages=messages,
+            )
+            usage = response.usage
+            cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+            cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+            prompt_tokens = usage.input_tokens + cache_read + cache_write
+            return LLMResponse(
+                text=response.content[0].text,
+                provider=Provider.ANTHROPIC,
+                model=LLMConfig.CLAUDE_MODEL,
+                tokens_used=prompt_tokens + usage.output_tokens,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=usage.output_tokens,
+                metadata={"cached_tokens": cache_read},
+            )
+        except Exception as e:
+            print(f"[{BOT_NAME}] Async Anthropic error: {e}")
+            return None
+
+    async def think_with_gemini(
+        self,
+        prompt: str,
+        conversation: Conversation,
+        temperature: float = None,
+        max_tokens: int = 2000,
+        context: str = None,
+    ) -> Optional[LLMResponse]:
+        """Generate a response using Gemini via Poe's async client."""
+        if not self.poe_available:
+            return None
+
+        try:
+            import fastapi_poe as fp
+
+            summary, window = self._request_parts(prompt, conversation, context)
+            messages = format_poe_messages(self.system_prompt, summary, window)
+            chunks = []
+            async for partial in fp.get_bot_response(
+                messages=messages,
+                bot_name=LLMConfig.GEMINI_MODEL,
+                api_key=POE_API_KEY,
+            ):
+                chunks.append(partial.text)
+            text = "".join(chunks)
+            # Poe reports no usage, so tokens are estimated
+            prompt_tokens = estimate_request_tokens(None, messages)
+            completion_tokens = estimate_tokens(text)
+            return LLMResponse(
+                text=text,
+                provider=Provider.POE,
+                model=LLMConfig.GEMINI_MODEL,
+                tokens_used=prompt_tokens + completion_tokens,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                metadata={"estimated_tokens": True},
+            )
+        except ImportError:
+            print(f"[{BOT_NAME}] fastapi_poe not installed.")
+            return None
+        except Exception as e:
+            print(f"[{BOT_NAME}] Async Poe/Gemini error: {e}")
+            return None
+
+    def _providers(self) -> List[Provider]:
+        """Configured providers, in default preference order."""
+        providers = []
+        if self.mock_client:
+            providers.append(Provider.MOCK)
+        if self.openai_client:
+            providers.append(Provider.OPENAI)
+        if self.anthropic_client:
+            providers.append(Provider.ANTHROPIC)
+        if self.poe_available:
+            providers.append(Provider.POE)
+        return providers
+
+    async def _call(
+        self,
+        provider: Provider,
+        prompt: str,
+        conversation: Conversation,
+        temperature: float = None,
+        context: str = None,
+    ) -> Optional[LLMResponse]:
+        """Call one provider through its circuit breaker, recording latency and usage."""
+        methods = {
+            Provider.OPENAI: self.think_with_openai,
+            Provider.ANTHROPIC: self.think_with_claude,
+            Provider.POE: self.think_with_gemini,
+            Provider.MOCK: self.think_with_mock,
+        }
+        breaker = self.router.breaker(provider)
+        if not breaker.allow():
+            return None
+
+        start = time.time()
+        try:
+            with self.priority.interactive():
+                response = await methods[provider](prompt, conversation, temperature, context=context)
+        except asyncio.CancelledError:
+            # Lost a hedge race; the outcome says nothing about the provider
+            breaker.abandon()
+            raise
+        ok = response is not None
+        latency = time.time() - start
+        breaker.record(ok)
+        self.router.record(provider, latency, ok)
+        record_usage(
+            self.ledger, conversation.caller, provider, Brain._model_name(provider), latency, response, context
+        )
+        return response
+
+    # -------------------------------------------------------------------------
+    # Thinking
+    # -------------------------------------------------------------------------
+
+    async def think(
+        self,
+        prompt: str,
+        session: Union[str, Conversation, None] = None,
+        provider: Optional[Provider] = None,
+        temperature: float = None,
+        context: str = None,
+    ) -> Optional[LLMResponse]:
+        """
+        Answer a prompt within a session's conversation.
+
+        Routing and hedging follow Brain.think: providers in the router's
+        order, with the next one started if the current one passes its
+        hedge delay. Losing requests are cancelled.
+
+        Args:
+            prompt: The user's input
+            session: Session ID or Conversation (None = "default")
+            provider: Specific provider to use (None = auto)
+            temperature: Creativity level (0.0 - 1.0)
+            context: Per-turn context sent with this prompt but not kept in history
+
+        Returns:
+            LLMResponse or None if all providers fail
+        """
+        conversation = self._resolve(session)
+        providers = [provider] if provider else self.router.rank(self._providers())
+
+        waiting = list(providers)
+        running = set()
+        latest = None
+
+        def launch() -> Provider:
+            next_provider = waiting.pop(0)
+            running.add(asyncio.ensure_future(
+                self._call(next_provider, prompt, conversation, temperature, context)
+            ))
+            return next_provider
+
+        try:
+            if waiting:
+                latest = launch()
+            while running:
+                delay = self.router.hedge_delay(latest) if waiting else None
+                done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    print(f"[{BOT_NAME}] {latest.value} slower than {delay:.1f}s, hedging with {waiting[0].value}")
+                    latest = launch()
+                    continue
+
+                for task in done:
+                    running.discard(task)
+                    response = task.result()
+                    if response:
+                        self._record_turn(conversation, prompt, response.text)
+                        return response
+
+                if waiting:
+                    latest = launch()
+
+            print(f"[{BOT_NAME}] All providers failed.")
+            return None
+
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def trinity(
+        self,
+        prompt: str,
+        session: Union[str, Conversation, None] = None,
+        context: str = None,
+        timeout: float = None,
+    ) -> Optional[LLMResponse]:
+        """
+        Consult all three LLMs concurrently and synthesize their responses.
+
+        Same contract as Brain.trinity_mode, without threads: providers
+        still running at the deadline are cancelled.
+        """
+        conversation = self._resolve(session)
+        timeout = timeout or LLMConfig.TRINITY_TIMEOUT_SECONDS
+        names = {Provider.OPENAI: "GPT-4o", Provider.ANTHROPIC: "Claude", Provider.POE: "Gemini", Provider.MOCK: "Mock"}
+
+        tasks = {
+            asyncio.ensure_future(self._call(p, prompt, conversation.fork(caller="trinity"), context=context)): names[p]
+            for p in self._providers()
+        }
+        if not tasks:
+            return None
+        done, late = await asyncio.wait(tasks, timeout=timeout)
+        for task in late:
+            print(f"[{BOT_NAME}] Trinity: {tasks[task]} missed the {timeout:.0f}s deadline.")
+            task.cancel()
+
+        responses = {tasks[task]: task.result().text for task in done if task.result()}
+        if not responses:
+            return None
+
+        synthesis_prompt = f"""You received the following question: "{prompt}"
+
+Three AI perspectives responded:
+
+{chr(10).join(f'**{name}:** {text}' for name, text in responses.items())}
+
+Synthesize these into ONE unified response that:
+1. Captures the convergent truth across all perspectives
+2. Notes any important tensions or differences
+3. Speaks as Vigil - the unified voice of the Trinity
+
+Keep it concise (3-5 sentences)."""
+
+        synthesis = await self.think(synthesis_prompt, session=Conversation("trinity"), temperature=0.7)
+        if not synthesis:
+            return None
+
+        self._record_turn(conversation, prompt, synthesis.text)
+        return LLMResponse(
+            text=synthesis.text,
+            provider=synthesis.provider,
+            model="trinity",
+            tokens_used=synthesis.tokens_used,
+            metadata={"individual_responses": responses},
+        )
+
+    # -------------------------------------------------------------------------
+    # Event loop for sync callers
+    # -------------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    daemon=True,
+                    name="AsyncBrainLoop",
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Run a coroutine on the brain's event loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def aclose(self):
+        """Close the HTTP clients."""
+        for client in (self.openai_client, self.anthropic_client, self.mock_client):
+            if client:
+                try:
+                    await client.close()
+                except Exception as e:
+                    print(f"[{BOT_NAME}] Async client close error: {e}")
+
+    def close(self):
+        """Close the clients and stop the background loop."""
+        if self._owns_ledger:
+            self.ledger.close()
+        if self._loop is None:
+            return
+        try:
+            self.submit(self.aclose()).result(timeout=5)
+        except Exception as e:
+            print(f"[{BOT_NAME}] Async brain close error: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+        self._loop = None
+
+
+if __name__ == "__main__":
+    async def demo():
+        brain = AsyncBrain()
+        questions = ["What is courage?", "What is patience?", "What is focus?"]
+        # Three independent sessions answered concurrently
+        responses = await asyncio.gather(*(
+            brain.think(q, session=f"demo-{i}") for i, q in enumerate(questions)
+        ))
+        for question, response in zip(questions, responses):
+            print(f"\n{question}\n{response.text if response else 'No response'}")
+        await brain.aclose()
+        brain.ledger.close()
+
+    asyncio.run(demo())
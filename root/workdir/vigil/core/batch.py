@@ -0,0 +1,584 @@
+"""
+VIGIL - Batch Processing
+Non-interactive LLM work (reflection, agent tasks) off the interactive path
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config.settings import BOT_NAME, LLMConfig, Paths
+from core.brain import LLMResponse, Provider, record_usage
+from core.conversation import Conversation
+
+
+class RateLimiter:
+    """Spaces calls evenly to stay under a requests-per-minute limit."""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, stop_event: threading.Event = None) -> bool:
+        """Wait for the next slot; returns False if `stop_event` was set first."""
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        delay = start - now
+        if delay <= 0:
+            return True
+        if stop_event:
+            return not stop_event.wait(delay)
+        time.sleep(delay)
+        return True
+
+
+@dataclass
+class BatchJob:
+    """One queued prompt and, once done, its response."""
+    job_id: str
+    prompt: str
+    caller: str = "batch"  # Ledger label: reflection, agent, ...
+    temperature: Optional[float] = None
+    max_tokens: int = 2000
+    context: Optional[str] = None
+    callback: Optional[Callable[['BatchJob'], None]] = None
+    # JSON-safe data a resumed job's handler needs to finish it
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    submitted_at: float = field(default_factory=time.time)
+    completed_at: Optional[float] = None
+    status: str = "queued"  # queued, submitted, completed, failed
+    response: Optional[LLMResponse] = None
+    error: str = ""
+
+
+class BatchProcessor:
+    """
+    Queue for LLM prompts that don't need an answer right away.
+
+    Jobs are answered in the background and handed to their callback.
+    Two modes (LLMConfig.BATCH_MODE):
+
+    - "worker": one thread sends jobs through Brain.think, one at a
+      time, no faster than BATCH_REQUESTS_PER_MINUTE, and only once
+      interactive calls have been quiet for BATCH_IDLE_SECONDS.
+    - "provider": jobs are collected and sent as one request to the
+      Anthropic or OpenAI batch endpoint, which has its own rate limits
+      and returns results within hours. Jobs fall back to the worker
+      when no provider with a batch API is configured, or when a batch
+      can't be created.
+
+    Callbacks run on the batch thread and should return quickly.
+
+    stop() answers queued jobs for up to BATCH_DRAIN_SECONDS. Jobs still
+    unanswered after that, and provider batches still running, are saved
+    and picked up by the next start(). A resumed job has lost its
+    callback, so its result goes to the handler registered for its
+    caller with register_handler().
+    """
+
+    def __init__(
+        self,
+        brain,
+        mode: str = None,
+        requests_per_minute: float = None,
+        state_file: Optional[Path] = None,
+    ):
+        self.brain = brain
+        self.mode = mode or LLMConfig.BATCH_MODE
+        self.limiter = RateLimiter(requests_per_minute or LLMConfig.BATCH_REQUESTS_PER_MINUTE)
+        self.state_file = state_file or (Paths.REFLECTION / "batch_pending.json")
+
+        self._queue: Deque[BatchJob] = deque()
+        self._jobs: Dict[str, BatchJob] = {}
+        # Provider batch ID -> (provider, job IDs, submitted at)
+        self._batches: Dict[str, Tuple[Provider, List[str], float]] = {}
+        self._last_poll = 0.0
+        self._running: Optional[BatchJob] = None
+        # Caller -> handler for jobs resumed without their callback
+        self._handlers: Dict[str, Callable[[BatchJob], None]] = {}
+        self._resumed = False
+        self.completed = 0
+        self.failed = 0
+
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._draining = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def submit(
+        self,
+        prompt: str,
+        callback: Callable[[BatchJob], None] = None,
+        caller: str = "batch",
+        temperature: float = None,
+        max_tokens: int = 2000,
+        context: str = None,
+        metadata: Dict[str, Any] = None,
+    ) -> BatchJob:
+        """
+        Queue a prompt. `callback(job)` runs when job.response is set (or
+        job.status is "failed"). `metadata` is saved with the job if it
+        outlives this run, for the caller's registered handler.
+        """
+        job = BatchJob(
+            job_id=uuid.uuid4().hex[:12],
+            prompt=prompt,
+            caller=caller,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            context=context,
+            callback=callback,
+            metadata=metadata or {},
+        )
+        with self._cond:
+            self._jobs[job.job_id] = job
+            self._queue.append(job)
+            self._cond.notify_all()
+        self.start()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[BatchJob]:
+        """Get a job that hasn't finished yet."""
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def register_handler(self, caller: str, handler: Callable[[BatchJob], None]):
+        """Handle finished jobs of `caller` that were resumed from a previous run."""
+        with self._cond:
+            self._handlers[caller] = handler
+
+    def start(self):
+        """Start the batch thread, resuming work saved by the last stop()."""
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            if not self._resumed:
+                self._resumed = True
+                self._load_pending()
+            self._stop_event.clear()
+            self._draining.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="BatchWorker")
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """
+        Answer queued jobs for up to `timeout` seconds (default
+        BATCH_DRAIN_SECONDS), then stop and save whatever is left.
+        """
+        timeout = LLMConfig.BATCH_DRAIN_SECONDS if timeout is None else timeout
+        deadline = time.time() + timeout
+        self._draining.set()
+        with self._cond:
+            self._cond.notify_all()
+            while (self._queue or self._running) and self._thread and self._thread.is_alive():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=max(0.0, deadline - time.time()) + 1.0)
+            self._thread = None
+        self._save_pending()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Queue depth and totals."""
+        with self._cond:
+            return {
+                "mode": self.mode,
+                "queued": len(self._queue),
+                "provider_batches": len(self._batches),
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+    # -------------------------------------------------------------------------
+    # Batch thread
+    # -------------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            # A new provider batch would not finish before shutdown
+            draining = self._draining.is_set()
+            provider = self._batch_provider() if self.mode == "provider" and not draining else None
+            try:
+                if provider:
+                    self._provider_step(provider)
+                else:
+                    self._worker_step()
+                # Batches can outlive a change of mode, or a restart
+                if self._batches and time.time() - self._last_poll >= LLMConfig.BATCH_POLL_SECONDS:
+                    self._last_poll = time.time()
+                    self._poll_batches()
+            except Exception as e:
+                print(f"[{BOT_NAME}] Batch error: {e}")
+                self._stop_event.wait(1.0)
+
+    def _next_job(self, timeout: float = None) -> Optional[BatchJob]:
+        """Pop the oldest queued job, waiting up to `timeout` for one."""
+        with self._cond:
+            if not self._queue:
+                self._cond.wait(timeout)
+            return self._queue.popleft() if self._queue else None
+
+    def _worker_step(self):
+        """Answer one queued job through Brain.think."""
+        job = self._next_job(timeout=1.0)
+        if not job:
+            return
+        with self._cond:
+            self._running = job
+        try:
+            # Once draining for shutdown starts nobody is talking to Vigil any more
+            # (stop() always sets the drain event first, so it also ends the wait)
+            quiet = self._draining.is_set() or self.brain.priority.wait_quiet(stop_event=self._draining)
+            if not (quiet or self._draining.is_set()) or not self.limiter.acquire(self._stop_event):
+                with self._cond:
+                    self._queue.appendleft(job)
+                return
+            self._run_job(job)
+        finally:
+            with self._cond:
+                self._running = None
+                self._cond.notify_all()
+
+    def _run_job(self, job: BatchJob):
+        """
+        Answer a job now on this thread.
+
+        Providers are tried one after another rather than hedged, so a
+        background job never has two requests in flight.
+        """
+        conversation = self.brain.new_conversation(f"batch-{job.job_id}", caller=job.caller)
+        response = None
+        with self.brain.priority.background():
+            for provider in self.brain.router.rank(self.brain._providers()):
+                response = self.brain.think(
+                    job.prompt,
+                    provider=provider,
+                    temperature=job.temperature,
+                    max_tokens=job.max_tokens,
+                    context=job.context,
+                    conversation=conversation,
+                )
+                if response:
+                    break
+        self._deliver(job, response)
+
+    def _deliver(self, job: BatchJob, response: Optional[LLMResponse], error: str = ""):
+        """Record a job's outcome and run its callback."""
+        job.response = response
+        job.status = "completed" if response else "failed"
+        job.error = "" if response else (error or "No response from any provider")
+        job.completed_at = time.time()
+        with self._cond:
+            self._jobs.pop(job.job_id, None)
+            if response:
+                self.completed += 1
+            else:
+                self.failed += 1
+            callback = job.callback or self._handlers.get(job.caller)
+        if callback:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"[{BOT_NAME}] Batch callback error: {e}")
+
+    # -------------------------------------------------------------------------
+    # Saved work
+    # -------------------------------------------------------------------------
+
+    def _save_pending(self):
+        """Save unanswered jobs and running provider batches for the next start()."""
+        if not self._resumed:
+            # Never started, so anything saved last time is still on disk
+            return
+        with self._cond:
+            jobs = list(self._jobs.values())
+            batches = {
+                batch_id: [provider.value, job_ids, submitted_at]
+                for batch_id, (provider, job_ids, submitted_at) in self._batches.items()
+            }
+        try:
+            if not jobs and not batches:
+                if self.state_file.exists():
+                    self.state_file.unlink()
+                return
+            data = {
+                "jobs": [
+                    {
+                        "job_id": job.job_id,
+                        "prompt": job.prompt,
+                        "caller": job.caller,
+                        "temperature": job.temperature,
+                        "max_tokens": job.max_tokens,
+                        "context": job.context,
+                        "metadata": job.metadata,
+                        "submitted_at": job.submitted_at,
+                        "status": job.status,
+                    }
+                    for job in jobs
+                ],
+                "batches": batches,
+            }
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_file.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.state_file)
+            print(f"[{BOT_NAME}] Batch: saved {len(jobs)} unfinished jobs "
+                  f"({len(batches)} provider batches) for next start.")
+        except Exception as e:
+            print(f"[{BOT_NAME}] Batch: error saving unfinished jobs: {e}")
+
+    def _load_pending(self):
+        """Requeue jobs and provider batches saved by the last stop() (caller holds the lock)."""
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for fields in data.get("jobs", []):
+                job = BatchJob(**fields)
+                self._jobs[job.job_id] = job
+                # Jobs in a provider batch wait for its results instead
+                if job.status != "submitted":
+                    job.status = "queued"
+                    self._queue.append(job)
+            for batch_id, (provider, job_ids, submitted_at) in data.get("batches", {}).items():
+                self._batches[batch_id] = (Provider(provider), job_ids, submitted_at)
+            self.state_file.unlink()
+            print(f"[{BOT_NAME}] Batch: resumed {len(self._jobs)} jobs "
+                  f"({len(self._batches)} provider batches) from last run.")
+        except Exception as e:
+            print(f"[{BOT_NAME}] Batch: error loading unfinished jobs: {e}")
+
+    # -------------------------------------------------------------------------
+    # Provider batch endpoints
+    # -------------------------------------------------------------------------
+
+    def _batch_provider(self) -> Optional[Provider]:
+        """First configured provider with a batch API, per LLMConfig.BATCH_PROVIDERS."""
+        # The mock server has no batch endpoints
+        if getattr(self.brain, "mock_client", None):
+            return None
+        clients = {
+            Provider.ANTHROPIC: self.brain.anthropic_client,
+            Provider.OPENAI: self.brain.openai_client,
+        }
+        for name in LLMConfig.BATCH_PROVIDERS:
+            provider = Provider(name)
+            if clients.get(provider) and self.brain.router.breaker(provider).available():
+                return provider
+        return None
+
+    def _provider_step(self, provider: Provider):
+        """Send a batch when one is due, and collect finished ones."""
+        with self._cond:
+            oldest = self._queue[0].submitted_at if self._queue else None
+            due = oldest is not None and (
+                len(self._queue) >= LLMConfig.BATCH_MAX_SIZE
+                or time.time() - oldest >= LLMConfig.BATCH_MAX_WAIT_SECONDS
+            )
+            jobs = []
+            if due:
+                while self._queue and len(jobs) < LLMConfig.BATCH_MAX_SIZE:
+                    jobs.append(self._queue.popleft())
+
+        if jobs:
+            self._submit_batch(provider, jobs)
+
+        with self._cond:
+            if not self._stop_event.is_set():
+                self._cond.wait(1.0)
+
+    def _job_request(self, provider: Provider, job: BatchJob) -> Dict[str, Any]:
+        """Request body for one job, formatted as Brain would send it."""
+        conversation = Conversation(f"batch-{job.job_id}", caller=job.caller)
+        conversation.add("user", job.prompt)
+        temperature = job.temperature or LLMConfig.DEFAULT_TEMPERATURE
+        if provider == Provider.ANTHROPIC:
+            system, messages = self.brain._format_messages_anthropic(job.context, conversation)
+            return {
+                "model": LLMConfig.CLAUDE_MODEL,
+                "max_tokens": job.max_tokens,
+                "system": system,
+                "messages": messages,
+                "temperature": temperature,
+            }
+        return {
+            "model": LLMConfig.PRIMARY_MODEL,
+            "messages": self.brain._format_messages_openai(job.context, conversation),
+            "temperature": temperature,
+            "max_tokens": job.max_tokens,
+        }
+
+    def _submit_batch(self, provider: Provider, jobs: List[BatchJob]):
+        """Create a provider batch; on failure, answer the jobs through the worker path."""
+        try:
+            if provider == Provider.ANTHROPIC:
+                batch = self.brain.anthropic_client.messages.batches.create(requests=[
+                    {"custom_id": job.job_id, "params": self._job_request(provider, job)}
+                    for job in jobs
+                ])
+            else:
+                lines = [
+                    json.dumps({
+                        "custom_id": job.job_id,
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": self._job_request(provider, job),
+                    })
+                    for job in jobs
+                ]
+                upload = self.brain.openai_client.files.create(
+                    file=("vigil_batch.jsonl", "\n".join(lines).encode("utf-8")),
+                    purpose="batch",
+                )
+                batch = self.brain.openai_client.batches.create(
+                    input_file_id=upload.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h",
+                )
+        except Exception as e:
+            print(f"[{BOT_NAME}] Batch: {provider.value} batch create failed ({e}), using worker.")
+            for job in jobs:
+                if self._stop_event.is_set():
+                    break
+                self.limiter.acquire(self._stop_event)
+                self._run_job(job)
+            return
+
+        for job in jobs:
+            job.status = "submitted"
+        with self._cond:
+            self._batches[batch.id] = (provider, [job.job_id for job in jobs], time.time())
+        print(f"[{BOT_NAME}] Batch: sent {len(jobs)} jobs to {provider.value} batch {batch.id}")
+
+    def _poll_batches(self):
+        """Deliver the results of provider batches that have finished."""
+        with self._cond:
+            batches = list(self._batches.items())
+
+        for batch_id, (provider, job_ids, submitted_at) in batches:
+            try:
+                if provider == Provider.ANTHROPIC:
+                    results = self._anthropic_results(batch_id)
+                else:
+                    results = self._openai_results(batch_id)
+            except Exception as e:
+                print(f"[{BOT_NAME}] Batch: polling {batch_id} failed: {e}")
+                continue
+            if results is None:
+                continue  # Still running
+
+            with self._cond:
+                self._batches.pop(batch_id, None)
+                jobs = [self._jobs[job_id] for job_id in job_ids if job_id in self._jobs]
+            latency = time.time() - submitted_at
+            for job in jobs:
+                response, error = results.get(job.job_id, (None, "Missing from batch results"))
+                record_usage(
+                    self.brain.ledger, job.caller, provider, self.brain._model_name(provider),
+                    latency, response, job.context,
+                )
+                self._deliver(job, response, error)
+
+    def _anthropic_results(self, batch_id: str) -> Optional[Dict[str, Tuple[Optional[LLMResponse], str]]]:
+        """{job ID: (response, error)} for a finished Anthropic batch, or None if still running."""
+        client = self.brain.anthropic_client
+        if client.messages.batches.retrieve(batch_id).processing_status != "ended":
+            return None
+
+        results = {}
+        for item in client.messages.batches.results(batch_id):
+            if item.result.type != "succeeded":
+                results[item.custom_id] = (None, f"Batch request {item.result.type}")
+                continue
+            message = item.result.message
+            usage = message.usage
+            cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+            cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+            prompt_tokens = usage.input_tokens + cache_read + cache_write
+            results[item.custom_id] = (LLMResponse(
+                text=message.content[0].text,
+                provider=Provider.ANTHROPIC,
+                model=LLMConfig.CLAUDE_MODEL,
+                tokens_used=prompt_tokens + usage.output_tokens,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=usage.output_tokens,
+                metadata={"cached_tokens": cache_read, "batch_id": batch_id},
+            ), "")
+        return results
+
+    def _openai_results(self, batch_id: str) -> Optional[Dict[str, Tuple[Optional[LLMResponse], str]]]:
+        """{job ID: (response, error)} for a finished OpenAI batch, or None if still running."""
+        client = self.brain.openai_client
+        batch = client.batches.retrieve(batch_id)
+        if batch.status not in ("completed", "failed", "expired", "cancelled"):
+            return None
+
+        results = {}
+        if batch.output_file_id:
+            for line in client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                reply = item.get("response") or {}
+                if reply.get("status_code") != 200:
+                    results[item["custom_id"]] = (None, json.dumps(item.get("error") or reply.get("body")))
+                    continue
+                body = reply["body"]
+                usage = body.get("usage") or {}
+                details = usage.get("prompt_tokens_details") or {}
+                results[item["custom_id"]] = (LLMResponse(
+                    text=body["choices"][0]["message"]["content"],
+                    provider=Provider.OPENAI,
+                    model=LLMConfig.PRIMARY_MODEL,
+                    tokens_used=usage.get("total_tokens", 0),
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0),
+                    metadata={"cached_tokens": details.get("cached_tokens", 0), "batch_id": batch_id},
+                ), "")
+        return results
+
+
+if __name__ == "__main__":
+    # Queue a few prompts and wait for their callbacks
+    from core.brain import Brain
+
+    brain = Brain()
+    batch = BatchProcessor(brain)
+    done = threading.Event()
+    questions = ["What is patience?", "What is focus?", "What is courage?"]
+    answers = {}
+
+    def on_done(job: BatchJob):
+        answers[job.prompt] = job.response.text if job.response else f"failed: {job.error}"
+        if len(answers) == len(questions):
+            done.set()
+
+    for question in questions:
+        batch.submit(question, on_done, caller="demo")
+    done.wait(timeout=300)
+    for question, answer in answers.items():
+        print(f"\n{question}\n{answer}")
+    print(batch.get_status())
+    batch.stop()
+    brain.close()
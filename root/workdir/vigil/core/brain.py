@@ -4,35 +4,47 @@ Multi-model AI backend with OpenAI, Claude, and Gemini
 """
 
 import json
-from typing import Optional, List, Dict, Any
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial, wraps
+from typing import Optional, Iterator, List, Dict, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
 from openai import OpenAI
 from anthropic import Anthropic
 
+from core.conversation import (
+    MESSAGE_OVERHEAD_TOKENS,
+    Conversation,
+    Message,
+    estimate_tokens,
+    format_summary,
+    select_window,
+)
+from core.ledger import UsageLedger
+from core.response_cache import ResponseCache, make_key
+from core.router import PriorityGate, ProviderRouter
+
 from config.settings import (
     OPENAI_API_KEY,
     ANTHROPIC_API_KEY,
     POE_API_KEY,
     LLMConfig,
+    MemoryConfig,
+    MockLLMConfig,
     BOT_NAME,
+    PRIMARY_USER_NAME,
     get_system_prompt,
 )
 
-
 class Provider(Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
     POE = "poe"
-
-
-@dataclass
-class Message:
-    """Represents a conversation message."""
-    role: str  # "user", "assistant", "system"
-    content: str
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    MOCK = "mock"  # Local stand-in (core/mock_llm.py), for offline benchmarks
 
 
 @dataclass
@@ -42,9 +54,161 @@ class LLMResponse:
     provider: Provider
     model: str
     tokens_used: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class _StreamAttempt:
+    """One provider's try at streaming a response."""
+    name: Provider
+    start: float = field(default_factory=time.time)
+    chunks: List[str] = field(default_factory=list)
+    usage: Dict[str, int] = field(default_factory=dict)
+    cancel: threading.Event = field(default_factory=threading.Event)
+
+
+def format_openai_messages(system_prompt: str, summary: str, window: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Build an OpenAI message list.
+
+    OpenAI caches the longest previously seen prefix automatically, so
+    the order runs from most to least stable: system prompt, history
+    summary, history, then the current message carrying the per-turn
+    context.
+    """
+    messages = [{"role": "system", "content": system_prompt}]
+    if summary:
+        messages.append({"role": "system", "content": summary})
+    messages.extend(window)
+    return messages
+
+
+def format_anthropic_messages(system_prompt: str, summary: str, window: List[Dict[str, str]]) -> tuple:
+    """
+    Build an Anthropic (system, messages) pair.
+
+    With prompt caching on, cache breakpoints go after the system
+    prompt, after the history summary, and on the last message before
+    the current one, so each turn re-reads the previous turn's prefix
+    from cache. The per-turn context rides on the current message,
+    past every breakpoint.
+    """
+    messages = [m for m in window if m["role"] != "system"]
+
+    if not LLMConfig.PROMPT_CACHING:
+        system = f"{system_prompt}\n\n{summary}" if summary else system_prompt
+        return system, messages
+
+    cache = {"type": "ephemeral"}
+    system = [{"type": "text", "text": system_prompt, "cache_control": cache}]
+    if summary:
+        system.append({"type": "text", "text": summary, "cache_control": cache})
+    if len(messages) > 1:
+        messages[-2] = {
+            "role": messages[-2]["role"],
+            "content": [{"type": "text", "text": messages[-2]["content"], "cache_control": cache}],
+        }
+    return system, messages
+
+
+def format_poe_messages(system_prompt: str, summary: str, window: List[Dict[str, str]]) -> list:
+    """Build a Poe ProtocolMessage list."""
+    import fastapi_poe as fp
+
+    messages = [fp.ProtocolMessage(role="system", content=system_prompt)]
+    if summary:
+        messages.append(fp.ProtocolMessage(role="system", content=summary))
+    for msg in window:
+        # Poe calls the assistant role "bot"
+        role = "bot" if msg["role"] == "assistant" else msg["role"]
+        messages.append(fp.ProtocolMessage(role=role, content=msg["content"]))
+    return messages
+
+
+def estimate_request_tokens(system: Any, messages: list) -> int:
+    """
+    Estimate the prompt tokens of a formatted request, for providers that
+    report no usage (Poe) and streams that end before reporting it.
+    """
+    def text(content) -> str:
+        if isinstance(content, str):
+            return content
+        return "".join(block.get("text", "") for block in content or [])
+
+    total = estimate_tokens(text(system)) + MESSAGE_OVERHEAD_TOKENS if system else 0
+    for message in messages:
+        content = message["content"] if isinstance(message, dict) else message.content
+        total += estimate_tokens(text(content)) + MESSAGE_OVERHEAD_TOKENS
+    return total
+
+
+def record_usage(
+    ledger: UsageLedger,
+    caller: str,
+    provider: Provider,
+    model: str,
+    latency: float,
+    response: Optional[LLMResponse] = None,
+    context: str = None,
+):
+    """Record one provider call (failed if response is None) in the usage ledger."""
+    try:
+        ledger.record(
+            caller,
+            provider.value,
+            response.model if response else model,
+            prompt_tokens=response.prompt_tokens if response else 0,
+            completion_tokens=response.completion_tokens if response else 0,
+            latency=latency,
+            ok=response is not None,
+            cached_tokens=response.metadata.get("cached_tokens", 0) if response else 0,
+            context_tokens=estimate_tokens(context) if context else 0,
+        )
+    except Exception as e:
+        print(f"[{BOT_NAME}] Usage ledger error: {e}")
+
+
+def provider_call(provider: Provider):
+    """
+    Guard a think_with_* method with the provider's circuit breaker and
+    record it in the usage ledger.
+
+    While the breaker is open the call returns None at once instead of
+    waiting on a provider that is known to be down. Calls that go ahead
+    are timed and recorded under their conversation's caller, and count
+    as interactive traffic unless made from a background worker.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            breaker = self.router.breaker(provider)
+            if not breaker.allow():
+                print(f"[{BOT_NAME}] {provider.value} circuit open, skipping.")
+                return None
+            start = time.time()
+            with self.priority.interactive():
+                response = method(self, *args, **kwargs)
+            if provider not in self._providers():
+                # Never configured, so no call was made
+                breaker.abandon()
+                return response
+            breaker.record(response is not None)
+            record_usage(
+                self.ledger,
+                self._resolve(kwargs.get("conversation")).caller,
+                provider,
+                self._model_name(provider),
+                time.time() - start,
+                response,
+                kwargs.get("context"),
+            )
+            return response
+        return wrapper
+    return decorator
+
+
 class Brain:
     """
     Vigil's brain - orchestrates multiple LLMs.
@@ -73,93 +237,333 @@ class Brain:
         if self.poe_available:
             print(f"[{BOT_NAME}] Poe API available for Gemini access.")
 
+        # Local stand-in for offline benchmarking (VIGIL_MOCK_LLM=1)
+        self.mock_client = None
+        if MockLLMConfig.ENABLED:
+            self._init_mock_clients()
+
+        # Tracks provider latency/errors to order and hedge think() calls
+        self.router = ProviderRouter()
+
+        # Lets background work (batch jobs, summaries) yield to interactive calls
+        self.priority = PriorityGate()
+
+        # Tokens, latency and cost of every provider call
+        self.ledger = UsageLedger()
+
+        # Answers to repeated deterministic questions (opt-in)
+        self.response_cache = ResponseCache() if LLMConfig.RESPONSE_CACHE_ENABLED else None
+
         # System prompt
         self.system_prompt = get_system_prompt()
+        self._system_prompt_tokens = estimate_tokens(self.system_prompt) + MESSAGE_OVERHEAD_TOKENS
+
+        # The voice conversation; other callers pass their own Conversation
+        self.conversation = Conversation("voice")
+
+        # Turns trimmed out of the voice conversation are folded into its
+        # summary by a background thread with a cheap model
+        self._evicted: List[Message] = []
+        self._summary_lock = threading.Lock()
+        self._summary_event = threading.Event()
+        self._summarizer_thread: Optional[threading.Thread] = None
+
+    @property
+    def conversation_history(self) -> List[Message]:
+        """Messages of the voice conversation."""
+        return self.conversation.messages
+
+    @property
+    def history_summary(self) -> str:
+        """Running summary of the voice conversation's trimmed turns."""
+        return self.conversation.summary
+
+    def _resolve(self, conversation: Optional[Conversation]) -> Conversation:
+        """The given conversation, or the voice conversation if None."""
+        # Not `conversation or ...`: an empty Conversation is falsy
+        return self.conversation if conversation is None else conversation
+
+    def new_conversation(self, session_id: str, caller: str = None) -> Conversation:
+        """
+        Start a conversation independent of the voice one (reflection, tasks, ...).
 
-        # Conversation history
-        self.conversation_history: List[Message] = []
-
-    def add_to_history(self, role: str, content: str):
-        """Add a message to conversation history."""
-        self.conversation_history.append(Message(role=role, content=content))
+        `caller` labels its calls in the usage ledger (default: session_id).
+        """
+        return Conversation(session_id, caller=caller)
 
-        # Trim history if too long (keep last 20 exchanges)
-        max_messages = 40  # 20 user + 20 assistant
-        if len(self.conversation_history) > max_messages:
-            self.conversation_history = self.conversation_history[-max_messages:]
+    def add_to_history(self, role: str, content: str, conversation: Conversation = None):
+        """Add a message to a conversation (default: voice) and trim it."""
+        conversation = self._resolve(conversation)
+        conversation.add(role, content)
+        self._trim_history(conversation)
 
     def clear_history(self):
-        """Clear conversation history."""
-        self.conversation_history = []
+        """Clear the voice conversation."""
+        with self._summary_lock:
+            self.conversation.clear()
+            self._evicted = []
+
+    def _init_mock_clients(self):
+        """Point clients at the mock LLM server instead of the real APIs."""
+        from core.mock_llm import get_mock_server
+
+        server = get_mock_server()
+        # No SDK retries, so injected failures reach the breakers and router as-is
+        self.mock_client = OpenAI(api_key="mock", base_url=server.base_url("mock") + "/v1", max_retries=0)
+        if MockLLMConfig.MOCK_ALL_PROVIDERS:
+            self.openai_client = OpenAI(api_key="mock", base_url=server.base_url("openai") + "/v1", max_retries=0)
+            self.anthropic_client = Anthropic(api_key="mock", base_url=server.base_url("anthropic"), max_retries=0)
+            self.poe_available = False
+        print(f"[{BOT_NAME}] Using mock LLM server at {server.url}")
+
+    def _history_token_budget(self, conversation: Conversation = None) -> int:
+        """Tokens available for history once the system prompt and summary are paid for."""
+        summary = format_summary(self._resolve(conversation).summary)
+        summary_tokens = estimate_tokens(summary) + MESSAGE_OVERHEAD_TOKENS if summary else 0
+        return MemoryConfig.MAX_CONTEXT_TOKENS - self._system_prompt_tokens - summary_tokens
+
+    def _trim_history(self, conversation: Conversation = None):
+        """Drop the oldest messages until history fits the message and token budgets."""
+        conversation = self._resolve(conversation)
+        evicted = conversation.trim(MemoryConfig.SHORT_TERM_LIMIT * 2, self._history_token_budget(conversation))
+        # Only the long-lived voice conversation keeps a summary
+        if evicted and conversation is self.conversation:
+            self._queue_for_summary(evicted)
+
+    # -------------------------------------------------------------------------
+    # Rolling summary of evicted history
+    # -------------------------------------------------------------------------
+
+    def _queue_for_summary(self, messages: List[Message]):
+        """Hand trimmed messages to the background summarizer."""
+        fresh = []
+        for msg in messages:
+            # A message can be trimmed from more than one copy of history
+            if msg.role == "system" or msg.metadata.get("evicted"):
+                continue
+            msg.metadata["evicted"] = True
+            fresh.append(msg)
+        if not fresh:
+            return
+
+        with self._summary_lock:
+            self._evicted.extend(fresh)
+            if not (self._summarizer_thread and self._summarizer_thread.is_alive()):
+                self._summarizer_thread = threading.Thread(
+                    target=self._summarizer_loop,
+                    daemon=True,
+                    name="HistorySummarizer",
+                )
+                self._summarizer_thread.start()
+        self._summary_event.set()
+
+    def _summarizer_loop(self):
+        """Fold evicted messages into the running summary as they arrive."""
+        while True:
+            self._summary_event.wait()
+            self._summary_event.clear()
+
+            while True:
+                with self._summary_lock:
+                    batch = self._evicted[:MemoryConfig.LONG_TERM_SUMMARY_THRESHOLD]
+                    del self._evicted[:len(batch)]
+                    previous = self.conversation.summary
+                if not batch:
+                    break
+
+                # Summaries can wait; let the conversation have the provider first
+                self.priority.wait_quiet()
+                try:
+                    summary = self._summarize(previous, batch)
+                except Exception as e:
+                    print(f"[{BOT_NAME}] History summary error: {e}")
+                    summary = None
+
+                if summary:
+                    with self._summary_lock:
+                        # clear_history() may have run while we were summarizing
+                        if self.conversation.summary == previous:
+                            self.conversation.summary = summary.strip()
+
+    def _summarize(self, previous: str, messages: List[Message]) -> Optional[str]:
+        """Ask a cheap model to merge messages into the running summary."""
+        transcript = "\n".join(f"{msg.role.upper()}: {msg.content}" for msg in messages)
+        prompt = f"""Update the running summary of an ongoing conversation between {PRIMARY_USER_NAME} and {BOT_NAME}.
+
+Current summary:
+{previous or "(none yet)"}
+
+Turns to fold in:
+{transcript}
+
+Write the updated summary in under 200 words. Keep facts, decisions, commitments, open questions and {PRIMARY_USER_NAME}'s preferences; drop small talk."""
+
+        start = time.time()
+        if self.openai_client:
+            response = self.openai_client.chat.completions.create(
+                model=LLMConfig.SUMMARY_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=LLMConfig.PRECISE_TEMPERATURE,
+                max_tokens=LLMConfig.SUMMARY_MAX_TOKENS,
+            )
+            usage = response.usage
+            self.ledger.record(
+                "summary", Provider.OPENAI.value, LLMConfig.SUMMARY_MODEL,
+                prompt_tokens=usage.prompt_tokens if usage else 0,
+                completion_tokens=usage.completion_tokens if usage else 0,
+                latency=time.time() - start,
+            )
+            return response.choices[0].message.content
+
+        if self.anthropic_client:
+            response = self.anthropic_client.messages.create(
+                model=LLMConfig.CLAUDE_SUMMARY_MODEL,
+                max_tokens=LLMConfig.SUMMARY_MAX_TOKENS,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            self.ledger.record(
+                "summary", Provider.ANTHROPIC.value, LLMConfig.CLAUDE_SUMMARY_MODEL,
+                prompt_tokens=response.usage.input_tokens,
+                completion_tokens=response.usage.output_tokens,
+                latency=time.time() - start,
+            )
+            return response.content[0].text
 
-    def _format_messages_openai(self) -> List[Dict[str, str]]:
+        return None
+
+    def _summary_block(self, conversation: Conversation = None) -> str:
+        """Format a conversation's running summary for inclusion in a request."""
+        return format_summary(self._resolve(conversation).summary)
+
+    def _abort_turn(self, conversation: Conversation):
+        """Remove the user message a failed call added."""
+        conversation.pop_last("user")
+
+    def _context_window(self, context: str = None, conversation: Conversation = None) -> List[Dict[str, str]]:
+        """Select the history to send for this turn (see select_window)."""
+        conversation = self._resolve(conversation)
+        return select_window(conversation.messages, self._history_token_budget(conversation), context)
+
+    def _format_messages_openai(self, context: str = None, conversation: Conversation = None) -> List[Dict[str, str]]:
         """Format messages for OpenAI API."""
-        messages = [{"role": "system", "content": self.system_prompt}]
-        for msg in self.conversation_history:
-            messages.append({"role": msg.role, "content": msg.content})
-        return messages
+        return format_openai_messages(
+            self.system_prompt, self._summary_block(conversation), self._context_window(context, conversation)
+        )
 
-    def _format_messages_anthropic(self) -> tuple:
+    def _format_messages_anthropic(self, context: str = None, conversation: Conversation = None) -> tuple:
         """Format messages for Anthropic API."""
-        messages = []
-        for msg in self.conversation_history:
-            if msg.role != "system":
-                messages.append({"role": msg.role, "content": msg.content})
-        return self.system_prompt, messages
+        return format_anthropic_messages(
+            self.system_prompt, self._summary_block(conversation), self._context_window(context, conversation)
+        )
+
+    def _format_messages_poe(self, context: str = None, conversation: Conversation = None) -> list:
+        """Format messages for Poe API."""
+        return format_poe_messages(
+            self.system_prompt, self._summary_block(conversation), self._context_window(context, conversation)
+        )
 
+    @provider_call(Provider.OPENAI)
     def think_with_openai(
         self,
         prompt: str,
         temperature: float = None,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        context: str = None,
+        conversation: Conversation = None,
     ) -> Optional[LLMResponse]:
         """
         Generate response using OpenAI GPT-4o.
+
+        `context` is per-turn material (knowledge, user context) sent with
+        this prompt only; history keeps just the prompt. The exchange is
+        recorded in `conversation` (default: the voice conversation).
         """
         if not self.openai_client:
             print(f"[{BOT_NAME}] OpenAI not available.")
             return None
+        return self._chat_completion(
+            self.openai_client, Provider.OPENAI, prompt, temperature, max_tokens, context, conversation
+        )
+
+    @provider_call(Provider.MOCK)
+    def think_with_mock(
+        self,
+        prompt: str,
+        temperature: float = None,
+        max_tokens: int = 2000,
+        context: str = None,
+        conversation: Conversation = None,
+    ) -> Optional[LLMResponse]:
+        """
+        Generate response using the mock LLM server (OpenAI wire format).
+        """
+        if not self.mock_client:
+            print(f"[{BOT_NAME}] Mock LLM not enabled.")
+            return None
+        return self._chat_completion(
+            self.mock_client, Provider.MOCK, prompt, temperature, max_tokens, context, conversation
+        )
 
+    def _chat_completion(
+        self,
+        client: OpenAI,
+        provider: Provider,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        context: str,
+        conversation: Optional[Conversation],
+    ) -> Optional[LLMResponse]:
+        """Run one turn against an OpenAI-compatible chat completions API."""
+        conversation = self._resolve(conversation)
         temperature = temperature or LLMConfig.DEFAULT_TEMPERATURE
+        model = self._model_name(provider)
 
         try:
             # Add user message to history
-            self.add_to_history("user", prompt)
+            self.add_to_history("user", prompt, conversation)
 
             # Make API call
-            response = self.openai_client.chat.completions.create(
-                model=LLMConfig.PRIMARY_MODEL,
-                messages=self._format_messages_openai(),
+            response = client.chat.completions.create(
+                model=model,
+                messages=self._format_messages_openai(context, conversation),
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
 
             # Extract response
             assistant_message = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens if response.usage else 0
+            usage = response.usage
+            tokens_used = usage.total_tokens if usage else 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", 0) or 0
 
             # Add to history
-            self.add_to_history("assistant", assistant_message)
+            self.add_to_history("assistant", assistant_message, conversation)
 
             return LLMResponse(
                 text=assistant_message,
-                provider=Provider.OPENAI,
-                model=LLMConfig.PRIMARY_MODEL,
+                provider=provider,
+                model=model,
                 tokens_used=tokens_used,
+                prompt_tokens=usage.prompt_tokens if usage else 0,
+                completion_tokens=usage.completion_tokens if usage else 0,
+                metadata={"cached_tokens": cached_tokens},
             )
 
         except Exception as e:
-            print(f"[{BOT_NAME}] OpenAI error: {e}")
-            # Remove the user message we added since it failed
-            if self.conversation_history and self.conversation_history[-1].role == "user":
-                self.conversation_history.pop()
+            print(f"[{BOT_NAME}] {provider.value} error: {e}")
+            self._abort_turn(conversation)
             return None
 
+    @provider_call(Provider.ANTHROPIC)
     def think_with_claude(
         self,
         prompt: str,
         temperature: float = None,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        context: str = None,
+        conversation: Conversation = None,
     ) -> Optional[LLMResponse]:
         """
         Generate response using Anthropic Claude.
@@ -168,14 +572,15 @@ class Brain:
             print(f"[{BOT_NAME}] Anthropic not available.")
             return None
 
+        conversation = self._resolve(conversation)
         temperature = temperature or LLMConfig.DEFAULT_TEMPERATURE
 
         try:
             # Add user message to history
-            self.add_to_history("user", prompt)
+            self.add_to_history("user", prompt, conversation)
 
             # Format messages
-            system_prompt, messages = self._format_messages_anthropic()
+            system_prompt, messages = self._format_messages_anthropic(context, conversation)
 
             # Make API call
             response = self.anthropic_client.messages.create(
@@ -187,50 +592,57 @@ class Brain:
 
             # Extract response
             assistant_message = response.content[0].text
-            tokens_used = response.usage.input_tokens + response.usage.output_tokens
+            usage = response.usage
+            # input_tokens excludes prompt tokens read from or written to the cache
+            cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+            cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+            prompt_tokens = usage.input_tokens + cache_read + cache_write
 
             # Add to history
-            self.add_to_history("assistant", assistant_message)
+            self.add_to_history("assistant", assistant_message, conversation)
 
             return LLMResponse(
                 text=assistant_message,
                 provider=Provider.ANTHROPIC,
                 model=LLMConfig.CLAUDE_MODEL,
-                tokens_used=tokens_used,
+                tokens_used=prompt_tokens + usage.output_tokens,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=usage.output_tokens,
+                metadata={"cached_tokens": cache_read},
             )
 
         except Exception as e:
             print(f"[{BOT_NAME}] Anthropic error: {e}")
-            if self.conversation_history and self.conversation_history[-1].role == "user":
-                self.conversation_history.pop()
+            self._abort_turn(conversation)
             return None
 
+    @provider_call(Provider.POE)
     def think_with_gemini(
         self,
         prompt: str,
         temperature: float = None,
+        max_tokens: int = 2000,
+        context: str = None,
+        conversation: Conversation = None,
     ) -> Optional[LLMResponse]:
         """
         Generate response using Gemini via Poe API.
+        Poe has no response length setting, so max_tokens is not applied.
         """
         if not self.poe_available:
             print(f"[{BOT_NAME}] Poe API not available for Gemini.")
             return None
 
+        conversation = self._resolve(conversation)
+
         try:
             import fastapi_poe as fp
 
             # Add user message to history
-            self.add_to_history("user", prompt)
+            self.add_to_history("user", prompt, conversation)
 
             # Build messages for Poe
-            poe_messages = [
-                fp.ProtocolMessage(role="system", content=self.system_prompt)
-            ]
-            for msg in self.conversation_history:
-                poe_messages.append(
-                    fp.ProtocolMessage(role=msg.role, content=msg.content)
-                )
+            poe_messages = self._format_messages_poe(context, conversation)
 
             # Make synchronous call
             response_text = ""
@@ -242,12 +654,19 @@ class Brain:
                 response_text += partial.text
 
             # Add to history
-            self.add_to_history("assistant", response_text)
+            self.add_to_history("assistant", response_text, conversation)
 
+            # Poe reports no usage, so tokens are estimated
+            prompt_tokens = estimate_request_tokens(None, poe_messages)
+            completion_tokens = estimate_tokens(response_text)
             return LLMResponse(
                 text=response_text,
                 provider=Provider.POE,
                 model=LLMConfig.GEMINI_MODEL,
+                tokens_used=prompt_tokens + completion_tokens,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                metadata={"estimated_tokens": True},
             )
 
         except ImportError:
@@ -255,78 +674,473 @@ class Brain:
             return None
         except Exception as e:
             print(f"[{BOT_NAME}] Poe/Gemini error: {e}")
-            if self.conversation_history and self.conversation_history[-1].role == "user":
-                self.conversation_history.pop()
+            self._abort_turn(conversation)
+            return None
+
+    def get_provider_status(self) -> Dict[str, Dict[str, Any]]:
+        """Latency, error rate and circuit breaker state for each provider."""
+        return self.router.get_status()
+
+    @staticmethod
+    def _model_name(provider: Provider) -> str:
+        """Configured model for a provider."""
+        return {
+            Provider.OPENAI: LLMConfig.PRIMARY_MODEL,
+            Provider.ANTHROPIC: LLMConfig.CLAUDE_MODEL,
+            Provider.POE: LLMConfig.GEMINI_MODEL,
+            Provider.MOCK: MockLLMConfig.MODEL,
+        }[provider]
+
+    def _cache_key(
+        self,
+        prompt: str,
+        provider: Optional[Provider],
+        temperature: float,
+        context: Optional[str],
+        conversation: Conversation,
+    ) -> Optional[str]:
+        """Response cache key for a call, or None if it shouldn't be cached."""
+        if not self.response_cache:
+            return None
+        if not ResponseCache.should_cache(prompt, temperature, len(conversation) > 0):
             return None
 
+        if provider:
+            model = self._model_name(provider)
+        else:
+            model = "auto:" + "/".join(self._model_name(p) for p in Provider)
+        return make_key(prompt, context, model, temperature)
+
+    def _cached_response(self, key: Optional[str], prompt: str, conversation: Conversation) -> Optional[LLMResponse]:
+        """Serve a call from the response cache, recording the turn in history."""
+        if not key:
+            return None
+        cached = self.response_cache.get(key)
+        if not cached:
+            return None
+
+        self.add_to_history("user", prompt, conversation)
+        self.add_to_history("assistant", cached["text"], conversation)
+        return LLMResponse(
+            text=cached["text"],
+            provider=Provider(cached["provider"]),
+            model=cached["model"],
+            metadata={"cached": True},
+        )
+
+    def close(self):
+        """Flush and close the response cache and usage ledger."""
+        if self.response_cache:
+            self.response_cache.close()
+        self.ledger.close()
+
+    def _providers(self) -> List[Provider]:
+        """Configured providers, in default preference order."""
+        providers = []
+        if self.mock_client:
+            providers.append(Provider.MOCK)
+        if self.openai_client:
+            providers.append(Provider.OPENAI)
+        if self.anthropic_client:
+            providers.append(Provider.ANTHROPIC)
+        if self.poe_available:
+            providers.append(Provider.POE)
+        return providers
+
     def think(
         self,
         prompt: str,
         provider: Optional[Provider] = None,
         temperature: float = None,
+        context: str = None,
+        cache_context: str = None,
+        conversation: Conversation = None,
+        max_tokens: int = 2000,
     ) -> Optional[LLMResponse]:
         """
         Main thinking method - routes to appropriate provider.
 
+        With no provider given, providers are ordered by the router's
+        recent latency and error rates. If the first hasn't answered by
+        its hedge percentile, the next is started alongside it and the
+        first answer wins.
+
         Args:
             prompt: The user's input
             provider: Specific provider to use (None = auto)
             temperature: Creativity level (0.0 - 1.0)
+            context: Per-turn context sent with this prompt but not kept in history
+            cache_context: The part of the context the answer depends on,
+                used for the response cache key (defaults to `context`)
+            conversation: Conversation to answer within (None = voice)
+            max_tokens: Cap on the response length (not supported by Poe)
 
         Returns:
             LLMResponse or None if all providers fail
         """
-        # If specific provider requested
-        if provider == Provider.ANTHROPIC:
-            return self.think_with_claude(prompt, temperature)
-        elif provider == Provider.POE:
-            return self.think_with_gemini(prompt, temperature)
-        elif provider == Provider.OPENAI:
-            return self.think_with_openai(prompt, temperature)
-
-        # Default: Try OpenAI first, then Claude, then Gemini
-        response = self.think_with_openai(prompt, temperature)
-        if response:
-            return response
+        conversation = self._resolve(conversation)
+        temperature = temperature or LLMConfig.DEFAULT_TEMPERATURE
+        cache_key = self._cache_key(
+            prompt, provider, temperature, context if cache_context is None else cache_context, conversation
+        )
+        cached = self._cached_response(cache_key, prompt, conversation)
+        if cached:
+            return cached
+
+        methods = {
+            Provider.OPENAI: self.think_with_openai,
+            Provider.ANTHROPIC: self.think_with_claude,
+            Provider.POE: self.think_with_gemini,
+            Provider.MOCK: self.think_with_mock,
+        }
+        if provider:
+            response = methods[provider](
+                prompt, temperature, max_tokens=max_tokens, context=context, conversation=conversation
+            )
+        else:
+            # Each candidate answers in its own fork; only the winning
+            # answer is recorded in the conversation
+            result = self.router.run([
+                (p, partial(
+                    methods[p], prompt, temperature,
+                    max_tokens=max_tokens, context=context, conversation=conversation.fork(),
+                ))
+                for p in self.router.rank(self._providers())
+            ])
+            if not result:
+                print(f"[{BOT_NAME}] All providers failed.")
+                return None
+
+            _, response = result
+            self.add_to_history("user", prompt, conversation)
+            self.add_to_history("assistant", response.text, conversation)
+
+        if response and cache_key:
+            self.response_cache.put(
+                cache_key, response.text, response.provider.value, response.model, response.tokens_used
+            )
+        return response
+
+    def _stream_openai(
+        self, temperature: float, max_tokens: int, context: str, conversation: Conversation, usage: Dict[str, int]
+    ) -> Iterator[str]:
+        """Stream text deltas from OpenAI, filling in `usage` from the final chunk."""
+        return self._stream_chat_completion(
+            self.openai_client, LLMConfig.PRIMARY_MODEL, temperature, max_tokens, context, conversation, usage
+        )
 
-        print(f"[{BOT_NAME}] OpenAI failed, trying Claude...")
-        response = self.think_with_claude(prompt, temperature)
-        if response:
-            return response
+    def _stream_mock(
+        self, temperature: float, max_tokens: int, context: str, conversation: Conversation, usage: Dict[str, int]
+    ) -> Iterator[str]:
+        """Stream text deltas from the mock LLM server."""
+        return self._stream_chat_completion(
+            self.mock_client, MockLLMConfig.MODEL, temperature, max_tokens, context, conversation, usage
+        )
+
+    def _stream_chat_completion(
+        self,
+        client: OpenAI,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        context: str,
+        conversation: Conversation,
+        usage: Dict[str, int],
+    ) -> Iterator[str]:
+        """Stream text deltas from an OpenAI-compatible API."""
+        messages = self._format_messages_openai(context, conversation)
+        usage["prompt_tokens"] = estimate_request_tokens(None, messages)
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if chunk.usage:
+                details = getattr(chunk.usage, "prompt_tokens_details", None)
+                usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                usage["completion_tokens"] = chunk.usage.completion_tokens
+                usage["cached_tokens"] = getattr(details, "cached_tokens", 0) or 0
+
+    def _stream_claude(
+        self, temperature: float, max_tokens: int, context: str, conversation: Conversation, usage: Dict[str, int]
+    ) -> Iterator[str]:
+        """Stream text deltas from Anthropic, filling in `usage` once the message completes."""
+        system_prompt, messages = self._format_messages_anthropic(context, conversation)
+        usage["prompt_tokens"] = estimate_request_tokens(system_prompt, messages)
+        with self.anthropic_client.messages.stream(
+            model=LLMConfig.CLAUDE_MODEL,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=messages,
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+            final = stream.get_final_message().usage
+            cache_read = getattr(final, "cache_read_input_tokens", 0) or 0
+            cache_write = getattr(final, "cache_creation_input_tokens", 0) or 0
+            usage["prompt_tokens"] = final.input_tokens + cache_read + cache_write
+            usage["completion_tokens"] = final.output_tokens
+            usage["cached_tokens"] = cache_read
+
+    def _stream_gemini(
+        self, temperature: float, max_tokens: int, context: str, conversation: Conversation, usage: Dict[str, int]
+    ) -> Iterator[str]:
+        """Stream text deltas from Gemini via Poe (usage is estimated)."""
+        import fastapi_poe as fp
+
+        messages = self._format_messages_poe(context, conversation)
+        usage["prompt_tokens"] = estimate_request_tokens(None, messages)
+        for partial in fp.get_bot_response(
+            messages=messages,
+            bot_name=LLMConfig.GEMINI_MODEL,
+            api_key=POE_API_KEY,
+        ):
+            if partial.text:
+                yield partial.text
+
+    def think_stream(
+        self,
+        prompt: str,
+        provider: Optional[Provider] = None,
+        temperature: float = None,
+        context: str = None,
+        max_tokens: int = 2000,
+        cache_context: str = None,
+        conversation: Conversation = None,
+    ) -> Iterator[str]:
+        """
+        Streaming version of think() - yields the response as it is generated.
+
+        Providers are tried in the router's order, each streaming on its
+        own thread. If the first chunk hasn't arrived by the provider's
+        hedge delay, the next provider is started alongside it; whichever
+        produces text first is streamed and the others are cancelled. A
+        provider that fails before producing any text falls through to
+        the next one; a failure mid-response ends the stream with what
+        was already yielded. Finished streams are timed into the router's
+        stats like think() calls. The complete response is added to
+        history once the stream finishes. A response cache hit is yielded
+        as one chunk.
+
+        Usage:
+            for chunk in brain.think_stream("Hello"):
+                print(chunk, end="")
+        """
+        conversation = self._resolve(conversation)
+        temperature = temperature or LLMConfig.DEFAULT_TEMPERATURE
+        cache_key = self._cache_key(
+            prompt, provider, temperature, context if cache_context is None else cache_context, conversation
+        )
+        cached = self._cached_response(cache_key, prompt, conversation)
+        if cached:
+            yield cached.text
+            return
+
+        methods = {
+            Provider.OPENAI: self._stream_openai,
+            Provider.ANTHROPIC: self._stream_claude,
+            Provider.POE: self._stream_gemini,
+            Provider.MOCK: self._stream_mock,
+        }
+        providers = [provider] if provider else self.router.rank(self._providers())
+        streams = [(p, methods[p]) for p in providers]
+
+        if not streams:
+            print(f"[{BOT_NAME}] No LLM providers available for streaming.")
+            return
+
+        self.add_to_history("user", prompt, conversation)
+
+        def record(name: Provider, chunks: List[str], usage: Dict[str, int], start: float):
+            """Record a streamed call in the usage ledger."""
+            response = None
+            if chunks:
+                text = "".join(chunks)
+                # Fall back to an estimate when the stream ended before usage arrived
+                prompt_tokens = usage.get("prompt_tokens", 0)
+                completion_tokens = usage.get("completion_tokens") or estimate_tokens(text)
+                response = LLMResponse(
+                    text=text,
+                    provider=name,
+                    model=self._model_name(name),
+                    tokens_used=prompt_tokens + completion_tokens,
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    metadata={"cached_tokens": usage.get("cached_tokens", 0)},
+                )
+            record_usage(
+                self.ledger, conversation.caller, name, self._model_name(name), time.time() - start, response, context
+            )
 
-        print(f"[{BOT_NAME}] Claude failed, trying Gemini...")
-        return self.think_with_gemini(prompt, temperature)
+        # Attempts stream on their own threads into one queue, so a slow
+        # provider can be hedged before it produces anything
+        events: "queue.Queue[Tuple[_StreamAttempt, str, Any]]" = queue.Queue()
+        waiting = list(streams)
+        running: List[_StreamAttempt] = []
+        winner: Optional[_StreamAttempt] = None
+        said: List[str] = []
+
+        def settle(attempt: _StreamAttempt, error: Optional[Exception]):
+            """Record an ended attempt with its breaker, the router and the ledger (on its own thread)."""
+            ok = bool(attempt.chunks)
+            breaker = self.router.breaker(attempt.name)
+            if attempt.cancel.is_set():
+                # Cut short by the caller, so its latency says nothing
+                if ok:
+                    breaker.record(True)
+                else:
+                    breaker.abandon()
+            else:
+                if error is not None:
+                    print(f"[{BOT_NAME}] {attempt.name.value} streaming error: {error}")
+                breaker.record(ok)
+                self.router.record(attempt.name, time.time() - attempt.start, ok)
+            record(attempt.name, attempt.chunks, attempt.usage, attempt.start)
+
+        def launch() -> Optional[_StreamAttempt]:
+            """Start the next provider whose breaker lets a call through."""
+            while waiting:
+                name, stream = waiting.pop(0)
+                if not self.router.breaker(name).allow():
+                    continue
+                attempt = _StreamAttempt(name)
+                running.append(attempt)
+                threading.Thread(
+                    target=self._pump_stream,
+                    args=(attempt, stream, (temperature, max_tokens, context, conversation), events, settle),
+                    daemon=True,
+                    name=f"Stream-{name.value}",
+                ).start()
+                return attempt
+            return None
 
-    def trinity_mode(self, prompt: str) -> Optional[LLMResponse]:
+        latest = launch()
+        try:
+            with self.priority.interactive():
+                while running:
+                    timeout = None
+                    if winner is None and waiting:
+                        delay = self.router.hedge_delay(latest.name)
+                        timeout = max(0.0, latest.start + delay - time.time())
+                    try:
+                        attempt, kind, value = events.get(timeout=timeout)
+                    except queue.Empty:
+                        print(f"[{BOT_NAME}] {latest.name.value} slower than {delay:.1f}s, hedging with {waiting[0][0].value}")
+                        latest = launch() or latest
+                        continue
+
+                    if kind == "chunk":
+                        # The first text picks the stream; losing hedges run
+                        # on in the background so their latency is still learned
+                        winner = winner or attempt
+                        if attempt is winner:
+                            said.append(value)
+                            yield value
+                        continue
+
+                    running.remove(attempt)
+                    if attempt is winner:
+                        break
+                    if winner is None:
+                        # Failed before any text - move on to the next provider now
+                        latest = launch() or latest
+        except GeneratorExit:
+            # Caller stopped listening (e.g. interrupted); keep what was said
+            for attempt in running:
+                if winner is None or attempt is winner:
+                    attempt.cancel.set()
+            if said:
+                self.add_to_history("assistant", "".join(said), conversation)
+            else:
+                self._abort_turn(conversation)
+            raise
+
+        if not said:
+            self._abort_turn(conversation)
+            return
+
+        text = "".join(said)
+        self.add_to_history("assistant", text, conversation)
+        if cache_key:
+            self.response_cache.put(cache_key, text, winner.name.value, self._model_name(winner.name))
+
+    @staticmethod
+    def _pump_stream(
+        attempt: _StreamAttempt,
+        stream: Callable[..., Iterator[str]],
+        args: tuple,
+        events: "queue.Queue[Tuple[_StreamAttempt, str, Any]]",
+        settle: Callable[[_StreamAttempt, Optional[Exception]], None],
+    ):
+        """Run one streaming attempt, posting ("chunk", text) events and then ("end", error)."""
+        chunks = None
+        error = None
+        try:
+            chunks = stream(*args, attempt.usage)
+            for chunk in chunks:
+                if attempt.cancel.is_set():
+                    break
+                attempt.chunks.append(chunk)
+                events.put((attempt, "chunk", chunk))
+        except Exception as e:
+            error = e
+        finally:
+            if chunks is not None:
+                chunks.close()
+            settle(attempt, error)
+            events.put((attempt, "end", error))
+
+    def trinity_mode(
+        self,
+        prompt: str,
+        context: str = None,
+        timeout: float = None,
+        conversation: Conversation = None,
+    ) -> Optional[LLMResponse]:
         """
         Consult all three LLMs and synthesize their responses.
         Returns a unified response combining insights from GPT, Claude, and Gemini.
+
+        The three providers are queried concurrently, each in its own fork
+        of the conversation. Synthesis goes ahead with whichever answers
+        arrive within `timeout` seconds.
         """
         print(f"[{BOT_NAME}] 🔮 Invoking Trinity Mode...")
 
-        responses = {}
-
-        # Get response from each (don't add to history yet)
-        original_history = self.conversation_history.copy()
-
-        # GPT-4o
-        self.conversation_history = original_history.copy()
-        gpt_response = self.think_with_openai(prompt)
-        if gpt_response:
-            responses["GPT-4o"] = gpt_response.text
-            self.conversation_history = original_history.copy()
+        conversation = self._resolve(conversation)
+        timeout = timeout or LLMConfig.TRINITY_TIMEOUT_SECONDS
+        consultants = {
+            "GPT-4o": self.think_with_openai,
+            "Claude": self.think_with_claude,
+            "Gemini": self.think_with_gemini,
+        }
+
+        # A fresh pool per call, so a provider that hangs past its deadline
+        # can't hold a worker the next Trinity call needs
+        start = time.time()
+        executor = ThreadPoolExecutor(max_workers=len(consultants), thread_name_prefix="Trinity")
+        futures = {
+            executor.submit(think, prompt, context=context, conversation=conversation.fork(caller="trinity")): name
+            for name, think in consultants.items()
+        }
+        done, late = wait(futures, timeout=timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
 
-        # Claude
-        claude_response = self.think_with_claude(prompt)
-        if claude_response:
-            responses["Claude"] = claude_response.text
-            self.conversation_history = original_history.copy()
+        responses = {}
+        for future in done:
+            response = future.result()
+            if response:
+                responses[futures[future]] = response.text
+        for future in late:
+            print(f"[{BOT_NAME}] Trinity: {futures[future]} missed the {timeout:.0f}s deadline.")
 
-        # Gemini
-        gemini_response = self.think_with_gemini(prompt)
-        if gemini_response:
-            responses["Gemini"] = gemini_response.text
-            self.conversation_history = original_history.copy()
+        print(f"[{BOT_NAME}] Trinity gathered {len(responses)}/{len(consultants)} perspectives in {time.time() - start:.1f}s")
 
         if not responses:
             return None
@@ -345,26 +1159,27 @@ Synthesize these into ONE unified response that:
 
 Keep it concise (3-5 sentences)."""
 
-        # Use OpenAI to synthesize
-        self.conversation_history = original_history
-        self.add_to_history("user", prompt)
-
-        synthesis = self.openai_client.chat.completions.create(
-            model=LLMConfig.PRIMARY_MODEL,
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": synthesis_prompt}
-            ],
-            temperature=0.7,
+        # Use OpenAI to synthesize (Claude if OpenAI is unavailable). The
+        # system prompt leads the request as usual, so the synthesis call
+        # reads it from the provider's prompt cache.
+        synthesis = self.think_with_openai(
+            synthesis_prompt, temperature=0.7, conversation=self.new_conversation("trinity")
         )
+        if not synthesis:
+            synthesis = self.think_with_claude(
+                synthesis_prompt, temperature=0.7, conversation=self.new_conversation("trinity")
+            )
+        if not synthesis:
+            return None
 
-        final_response = synthesis.choices[0].message.content
-        self.add_to_history("assistant", final_response)
+        self.add_to_history("user", prompt, conversation)
+        self.add_to_history("assistant", synthesis.text, conversation)
 
         return LLMResponse(
-            text=final_response,
-            provider=Provider.OPENAI,
+            text=synthesis.text,
+            provider=synthesis.provider,
             model="trinity",
+            tokens_used=synthesis.tokens_used,
             metadata={"individual_responses": responses}
         )
 
@@ -0,0 +1,190 @@
+"""
+VIGIL - Conversation
+Message history for one dialogue session, with token-budgeted windows
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+# Rough per-message framing cost (role, separators) in chat formats
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local estimate of a text's token count.
+
+    Uses ~4 characters per token, which tracks OpenAI and Anthropic
+    tokenizers closely enough for budgeting English conversation
+    without loading a tokenizer.
+    """
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class Message:
+    """Represents a conversation message."""
+    role: str  # "user", "assistant", "system"
+    content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    tokens: int = 0  # Estimated tokens, including message overhead
+
+
+def make_message(role: str, content: str) -> Message:
+    """Create a message with its token estimate filled in."""
+    return Message(role=role, content=content, tokens=estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS)
+
+
+def format_summary(summary: str) -> str:
+    """Format a running summary for inclusion in a request."""
+    if not summary:
+        return ""
+    return f"## EARLIER IN THIS CONVERSATION\n\n{summary}"
+
+
+def count_trimmed(history: List[Message], max_messages: int, budget: int) -> int:
+    """
+    Number of oldest messages to drop so history fits both budgets.
+
+    Always keeps the newest message, and never leaves history starting
+    on an assistant turn.
+    """
+    total = sum(msg.tokens for msg in history)
+    drop = 0
+    while drop < len(history) - 1 and (
+        len(history) - drop > max_messages
+        or total > budget
+        or (drop and history[drop].role == "assistant")
+    ):
+        total -= history[drop].tokens
+        drop += 1
+    return drop
+
+
+def select_window(history: List[Message], budget: int, context: str = None) -> List[Dict[str, str]]:
+    """
+    Select the history to send for a turn.
+
+    Walks back from the newest message until the token budget (less
+    the per-turn context) is spent, then attaches the context to the
+    current user message. The context is sent but never stored, so
+    it isn't re-sent on later turns.
+    """
+    if context:
+        budget -= estimate_tokens(context)
+
+    start = len(history)
+    total = 0
+    while start > 0 and total + history[start - 1].tokens <= budget:
+        start -= 1
+        total += history[start].tokens
+    # The current message goes out even if it alone is over budget
+    start = min(start, max(len(history) - 1, 0))
+    while start < len(history) - 1 and history[start].role != "user":
+        start += 1
+
+    messages = [{"role": msg.role, "content": msg.content} for msg in history[start:]]
+    if context and messages and messages[-1]["role"] == "user":
+        messages[-1]["content"] = f"{messages[-1]['content']}\n\n{context}"
+    return messages
+
+
+class Conversation:
+    """
+    One dialogue session: its messages and a summary of turns trimmed out.
+
+    Each caller that talks to an LLM independently (voice, UI, agent
+    tasks, reflection) holds its own Conversation, so concurrent requests
+    never have to share or swap one history list.
+
+    fork() is copy-on-write: the fork shares the message list until either
+    side changes, and only then does the side that changes take a copy.
+
+    `caller` names the feature the conversation belongs to (voice, ui,
+    agent, ...) for usage accounting; it defaults to the session ID and
+    is inherited by forks.
+    """
+
+    def __init__(
+        self,
+        session_id: str = "default",
+        messages: List[Message] = None,
+        summary: str = "",
+        caller: str = None,
+    ):
+        self.session_id = session_id
+        self.caller = caller or session_id
+        self.summary = summary
+        self._messages: List[Message] = list(messages or [])
+        # True while another Conversation may hold the same list
+        self._shared = False
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @property
+    def messages(self) -> List[Message]:
+        """The messages, oldest first. Treat as read-only; use add()/trim()."""
+        return self._messages
+
+    @messages.setter
+    def messages(self, messages: List[Message]):
+        self._messages = messages
+        self._shared = False
+
+    def _own(self):
+        """Take a private copy of the message list before changing it."""
+        if self._shared:
+            self._messages = list(self._messages)
+            self._shared = False
+
+    def fork(self, session_id: str = None, caller: str = None) -> 'Conversation':
+        """
+        Branch the conversation without copying it.
+
+        The fork starts with the same messages and summary; from then on
+        neither side sees the other's changes.
+        """
+        child = Conversation(
+            session_id or f"{self.session_id}/fork",
+            summary=self.summary,
+            caller=caller or self.caller,
+        )
+        child._messages = self._messages
+        child._shared = True
+        self._shared = True
+        return child
+
+    def add(self, role: str, content: str) -> Message:
+        """Append a message."""
+        self._own()
+        message = make_message(role, content)
+        self._messages.append(message)
+        return message
+
+    def pop_last(self, role: str) -> Optional[Message]:
+        """Remove the newest message if it has the given role."""
+        if not self._messages or self._messages[-1].role != role:
+            return None
+        self._own()
+        return self._messages.pop()
+
+    def with_prompt(self, prompt: str) -> List[Message]:
+        """The messages plus a pending user prompt, leaving this conversation unchanged."""
+        return self._messages + [make_message("user", prompt)]
+
+    def trim(self, max_messages: int, budget: int) -> List[Message]:
+        """Drop the oldest messages beyond the budgets; returns what was dropped."""
+        drop = count_trimmed(self._messages, max_messages, budget)
+        if not drop:
+            return []
+        evicted = self._messages[:drop]
+        # Slicing makes a new list, so this side no longer shares
+        self.messages = self._messages[drop:]
+        return evicted
+
+    def clear(self):
+        """Forget every message and the summary."""
+        self.messages = []
+        self.summary = ""
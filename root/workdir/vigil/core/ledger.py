@@ -0,0 +1,349 @@
+"""
+VIGIL - Usage Ledger
+Per-call token, latency and cost accounting in columnar daily files
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from config.settings import BOT_NAME, LLMConfig, MemoryConfig, Paths
+from core.persistence import WriteBehindPersister
+
+
+# Column name -> array typecode. Text columns are dictionary-coded: the
+# file holds small integer codes and dictionary.json maps them to values.
+COLUMNS = {
+    "timestamp": "d",
+    "caller": "H",
+    "provider": "H",
+    "model": "H",
+    "prompt_tokens": "I",
+    "completion_tokens": "I",
+    "cached_tokens": "I",
+    "context_tokens": "I",
+    "latency_ms": "I",
+    "ok": "B",
+}
+TEXT_COLUMNS = ("caller", "provider", "model")
+
+
+@dataclass
+class LedgerEntry:
+    """One LLM call."""
+    timestamp: float
+    caller: str  # voice, trinity, reflection, agent, ui, summary
+    provider: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # Prompt tokens served from the provider's cache
+    context_tokens: int = 0  # Per-turn context (knowledge, user context) in the prompt
+    latency_ms: int = 0
+    ok: bool = True
+
+    @property
+    def cost_usd(self) -> float:
+        """Estimated cost from LLMConfig.MODEL_PRICES (USD per million tokens)."""
+        input_price, output_price = LLMConfig.MODEL_PRICES.get(self.model, (0.0, 0.0))
+        return (self.prompt_tokens * input_price + self.completion_tokens * output_price) / 1_000_000
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class UsageLedger:
+    """
+    Records every LLM call and answers questions about spend and latency.
+
+    Each day is a directory with one binary file per column. A flush
+    appends to each file, and a query reads only the columns it needs
+    into typed arrays, so a day of calls costs a few bytes per call on
+    disk. Writes go through a write-behind persister and never block
+    the caller.
+    """
+
+    def __init__(self, ledger_dir: Optional[Path] = None):
+        self.ledger_dir = ledger_dir or (Paths.REFLECTION / "ledger")
+        self.ledger_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # day -> {column: [values]} for dictionary-coded columns
+        self._dictionaries: Dict[str, Dict[str, List[str]]] = {}
+
+        self.persister = WriteBehindPersister(
+            flush_interval=MemoryConfig.FLUSH_INTERVAL_SECONDS,
+            max_pending=MemoryConfig.FLUSH_MAX_PENDING,
+            name="LedgerWriter",
+        )
+        self.persister.start()
+
+    # -------------------------------------------------------------------------
+    # Recording
+    # -------------------------------------------------------------------------
+
+    def record(
+        self,
+        caller: str,
+        provider: str,
+        model: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        latency: float = 0.0,
+        ok: bool = True,
+        cached_tokens: int = 0,
+        context_tokens: int = 0,
+    ) -> LedgerEntry:
+        """Record one call (latency in seconds)."""
+        entry = LedgerEntry(
+            timestamp=time.time(),
+            caller=caller,
+            provider=provider,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+            context_tokens=context_tokens,
+            latency_ms=int(latency * 1000),
+            ok=ok,
+        )
+        day = date.fromtimestamp(entry.timestamp).isoformat()
+        self.persister.append(("ledger", day), entry, lambda entries, day=day: self._write_entries(day, entries))
+        return entry
+
+    def _day_dir(self, day: str) -> Path:
+        return self.ledger_dir / day
+
+    def _load_dictionary(self, day: str) -> Dict[str, List[str]]:
+        """Get a day's text dictionaries (caller holds the lock)."""
+        if day not in self._dictionaries:
+            path = self._day_dir(day) / "dictionary.json"
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._dictionaries[day] = json.load(f)
+            else:
+                self._dictionaries[day] = {column: [] for column in TEXT_COLUMNS}
+        return self._dictionaries[day]
+
+    def _write_entries(self, day: str, entries: List[LedgerEntry]):
+        """Append a batch of entries to a day's column files."""
+        with self._lock:
+            day_dir = self._day_dir(day)
+            day_dir.mkdir(parents=True, exist_ok=True)
+            dictionary = self._load_dictionary(day)
+
+            columns = {name: array(code) for name, code in COLUMNS.items()}
+            grew = False
+            for entry in entries:
+                for name in COLUMNS:
+                    value = getattr(entry, name)
+                    if name in TEXT_COLUMNS:
+                        values = dictionary[name]
+                        if value not in values:
+                            values.append(value)
+                            grew = True
+                        value = values.index(value)
+                    columns[name].append(int(value) if name != "timestamp" else value)
+
+            # The dictionary lands first so every code on disk can be decoded
+            if grew:
+                tmp_path = day_dir / "dictionary.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(dictionary, f)
+                os.replace(tmp_path, day_dir / "dictionary.json")
+
+            self._trim_columns(day_dir)
+            for name, values in columns.items():
+                with open(day_dir / f"{name}.col", 'ab') as f:
+                    values.tofile(f)
+
+    @staticmethod
+    def _trim_columns(day_dir: Path):
+        """
+        Cut every column file back to the shortest one.
+
+        A crash partway through a flush leaves some columns ahead of the
+        rest; appending after those rows would misalign every later row.
+        """
+        sizes = {}
+        for name, code in COLUMNS.items():
+            path = day_dir / f"{name}.col"
+            sizes[name] = path.stat().st_size // array(code).itemsize if path.exists() else 0
+        rows = min(sizes.values())
+        for name, size in sizes.items():
+            if size > rows:
+                with open(day_dir / f"{name}.col", 'r+b') as f:
+                    f.truncate(rows * array(COLUMNS[name]).itemsize)
+
+    def flush(self):
+        """Write out pending entries."""
+        self.persister.flush()
+
+    def close(self):
+        """Flush and stop the background writer."""
+        self.persister.stop()
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def _read_columns(self, day: str, names: Iterable[str]) -> Tuple[Dict[str, array], int]:
+        """Load some of a day's columns; returns them with the row count."""
+        day_dir = self._day_dir(day)
+        loaded = {}
+        for name in names:
+            values = array(COLUMNS[name])
+            path = day_dir / f"{name}.col"
+            if path.exists():
+                with open(path, 'rb') as f:
+                    values.frombytes(f.read())
+            loaded[name] = values
+        # A crash mid-flush can leave some columns ahead until the next flush trims them
+        rows = min((len(values) for values in loaded.values()), default=0)
+        return loaded, rows
+
+    def _days(self, since: Optional[date], until: Optional[date]) -> List[str]:
+        """Days with ledger data within [since, until]."""
+        days = []
+        for path in sorted(self.ledger_dir.iterdir()):
+            if not path.is_dir():
+                continue
+            day = path.name
+            if since and day < since.isoformat():
+                continue
+            if until and day > until.isoformat():
+                continue
+            days.append(day)
+        return days
+
+    @staticmethod
+    def _as_datetime(value: Union[date, datetime, None], end: bool = False) -> Optional[datetime]:
+        """Normalize a date bound to a datetime (end of day for `until` dates)."""
+        if value is None or isinstance(value, datetime):
+            return value
+        moment = datetime.combine(value, datetime.min.time())
+        return moment + timedelta(days=1) - timedelta(microseconds=1) if end else moment
+
+    def query(
+        self,
+        since: Union[date, datetime, None] = None,
+        until: Union[date, datetime, None] = None,
+        caller: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> List[LedgerEntry]:
+        """
+        Get recorded calls, oldest first.
+
+        Args:
+            since: Earliest date or time to include
+            until: Latest date or time to include
+            caller/provider/model: Only calls matching these values
+        """
+        self.flush()
+        start = self._as_datetime(since)
+        end = self._as_datetime(until, end=True)
+        filters = {"caller": caller, "provider": provider, "model": model}
+
+        entries = []
+        for day in self._days(start.date() if start else None, end.date() if end else None):
+            with self._lock:
+                dictionary = self._load_dictionary(day)
+            columns, rows = self._read_columns(day, COLUMNS)
+
+            # Resolve text filters to codes once per day
+            wanted = {}
+            for name, value in filters.items():
+                if value is None:
+                    continue
+                if value not in dictionary[name]:
+                    break
+                wanted[name] = dictionary[name].index(value)
+            else:
+                for i in range(rows):
+                    if any(columns[name][i] != code for name, code in wanted.items()):
+                        continue
+                    timestamp = columns["timestamp"][i]
+                    if start and timestamp < start.timestamp():
+                        continue
+                    if end and timestamp > end.timestamp():
+                        continue
+                    row = {name: columns[name][i] for name in COLUMNS}
+                    for name in TEXT_COLUMNS:
+                        row[name] = dictionary[name][row[name]]
+                    row["ok"] = bool(row["ok"])
+                    entries.append(LedgerEntry(**row))
+        return entries
+
+    def summarize(
+        self,
+        since: Union[date, datetime, None] = None,
+        until: Union[date, datetime, None] = None,
+        group_by: Union[str, Tuple[str, ...]] = "caller",
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Aggregate calls by one or more of caller, provider and model.
+
+        Returns:
+            {group: {calls, errors, prompt_tokens, completion_tokens,
+            cached_tokens, context_tokens, cost_usd, p50_ms, p95_ms}},
+            keyed by the value (or a tuple of values for several columns)
+        """
+        keys = (group_by,) if isinstance(group_by, str) else tuple(group_by)
+        groups: Dict[Any, Dict[str, Any]] = {}
+        latencies: Dict[Any, List[int]] = {}
+
+        for entry in self.query(since, until):
+            key = tuple(getattr(entry, k) for k in keys)
+            key = key[0] if len(keys) == 1 else key
+            group = groups.setdefault(key, {
+                "calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "cached_tokens": 0, "context_tokens": 0, "cost_usd": 0.0,
+            })
+            group["calls"] += 1
+            group["errors"] += 0 if entry.ok else 1
+            group["prompt_tokens"] += entry.prompt_tokens
+            group["completion_tokens"] += entry.completion_tokens
+            group["cached_tokens"] += entry.cached_tokens
+            group["context_tokens"] += entry.context_tokens
+            group["cost_usd"] += entry.cost_usd
+            if entry.ok:
+                latencies.setdefault(key, []).append(entry.latency_ms)
+
+        for key, group in groups.items():
+            group["cost_usd"] = round(group["cost_usd"], 4)
+            group["p50_ms"] = _percentile(latencies.get(key, []), 50)
+            group["p95_ms"] = _percentile(latencies.get(key, []), 95)
+        return groups
+
+    def get_daily_totals(self, day: Optional[date] = None) -> Dict[str, Any]:
+        """Token and cost totals for one day (default today)."""
+        day = day or date.today()
+        totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+        for group in self.summarize(day, day, group_by="model").values():
+            for key in totals:
+                totals[key] += group[key]
+        totals["cost_usd"] = round(totals["cost_usd"], 4)
+        return totals
+
+
+if __name__ == "__main__":
+    # Today's usage by call site
+    ledger = UsageLedger()
+    today = date.today()
+    print(f"[{BOT_NAME}] Usage for {today.isoformat()}")
+    for caller, stats in sorted(ledger.summarize(today, today).items()):
+        print(f"  {caller}: {json.dumps(stats)}")
+    print(f"  total: {json.dumps(ledger.get_daily_totals(today))}")
+    ledger.close()
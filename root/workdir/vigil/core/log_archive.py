@@ -0,0 +1,147 @@
+"""
+VIGIL - Daily Log Archive
+Compressed monthly archives of old daily logs
+"""
+
+import gzip
+import json
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Archive layout (<YYYY-MM>.jsonl.gz):
+#   [gzip member: day 1 JSON line][gzip member: day 2 JSON line]...
+#   [footer: JSON {"days": {date: [offset, length]}}]
+#   [trailer: footer length (8-byte big-endian) + MAGIC]
+# Each day is its own gzip member, so one day is read by seeking to its
+# offset and decompressing only its bytes.
+MAGIC = b"VIGILIDX"
+TRAILER = struct.Struct(">Q8s")
+
+
+class LogArchive:
+    """
+    Monthly compressed archive tier for daily logs.
+
+    Days are stored as independent gzip members with a footer index,
+    so reading one day never decompresses the rest of the month.
+    """
+
+    def __init__(self, archive_dir: Path):
+        self.archive_dir = archive_dir
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # path -> (mtime, footer index)
+        self._footer_cache: Dict[Path, Tuple[float, Dict[str, List[int]]]] = {}
+
+    def _archive_path(self, month: str) -> Path:
+        """Get path for a month's archive (month as YYYY-MM)."""
+        return self.archive_dir / f"{month}.jsonl.gz"
+
+    def _read_footer(self, path: Path) -> Tuple[Dict[str, List[int]], int]:
+        """Read an archive's day index and the offset where the footer starts."""
+        with open(path, 'rb') as f:
+            f.seek(-TRAILER.size, os.SEEK_END)
+            footer_length, magic = TRAILER.unpack(f.read(TRAILER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a Vigil log archive: {path}")
+            footer_start = f.seek(-(TRAILER.size + footer_length), os.SEEK_END)
+            footer = json.loads(f.read(footer_length).decode('utf-8'))
+        return footer["days"], footer_start
+
+    def _get_index(self, path: Path) -> Dict[str, List[int]]:
+        """Get an archive's day index, cached until the file changes."""
+        mtime = path.stat().st_mtime
+        cached = self._footer_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        index, _ = self._read_footer(path)
+        self._footer_cache[path] = (mtime, index)
+        return index
+
+    def list_days(self) -> List[str]:
+        """Get every archived date, oldest first."""
+        days = []
+        with self._lock:
+            for path in self.archive_dir.glob("*.jsonl.gz"):
+                try:
+                    days.extend(self._get_index(path))
+                except Exception:
+                    continue
+        return sorted(days)
+
+    def has_day(self, day: str) -> bool:
+        """Check whether a date is archived."""
+        path = self._archive_path(day[:7])
+        if not path.exists():
+            return False
+        with self._lock:
+            try:
+                return day in self._get_index(path)
+            except Exception:
+                return False
+
+    def read_day(self, day: str) -> Optional[Dict[str, Any]]:
+        """Read one archived day's log data, or None if it isn't archived."""
+        path = self._archive_path(day[:7])
+        if not path.exists():
+            return None
+
+        with self._lock:
+            index = self._get_index(path)
+            if day not in index:
+                return None
+            offset, length = index[day]
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                member = f.read(length)
+
+        return json.loads(gzip.decompress(member).decode('utf-8'))
+
+    def add_days(self, logs: Dict[str, Dict[str, Any]]):
+        """
+        Archive daily logs, given as {date: log data}.
+
+        Each affected month is rewritten once; days already archived
+        are replaced.
+        """
+        by_month: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for day, data in logs.items():
+            by_month.setdefault(day[:7], {})[day] = data
+
+        with self._lock:
+            for month, month_logs in by_month.items():
+                self._write_month(month, month_logs)
+
+    def _write_month(self, month: str, new_logs: Dict[str, Dict[str, Any]]):
+        """Merge new days into a month's archive (caller holds the lock)."""
+        path = self._archive_path(month)
+
+        members: Dict[str, bytes] = {}
+        if path.exists():
+            index, footer_start = self._read_footer(path)
+            with open(path, 'rb') as f:
+                body = f.read(footer_start)
+            for day, (offset, length) in index.items():
+                if day not in new_logs:
+                    members[day] = body[offset:offset + length]
+
+        for day, data in new_logs.items():
+            line = json.dumps(data, ensure_ascii=False) + "\n"
+            members[day] = gzip.compress(line.encode('utf-8'))
+
+        index = {}
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            for day in sorted(members):
+                index[day] = [f.tell(), len(members[day])]
+                f.write(members[day])
+            footer = json.dumps({"days": index}).encode('utf-8')
+            f.write(footer)
+            f.write(TRAILER.pack(len(footer), MAGIC))
+        os.replace(tmp_path, path)
+        self._footer_cache.pop(path, None)
@@ -4,12 +4,20 @@ Conversation memory, user learning, and knowledge storage
 """
 
 import json
-from datetime import datetime, date
+import os
+import threading
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from functools import partial
+from datetime import datetime, date, time, timedelta
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from dataclasses import dataclass, field, asdict
 
 from config.settings import Paths, BOT_NAME, PRIMARY_USER_NAME, MemoryConfig
+from core.persistence import WriteBehindPersister
+from core.search_index import BM25Index
+from core.log_archive import LogArchive
 
 
 @dataclass
@@ -60,7 +68,16 @@ class Memory:
     - Learning from interactions
     """
 
-    def __init__(self):
+    def __init__(self, backend: str = None, background: bool = True):
+        """
+        Initialize memory.
+
+        Args:
+            backend: "json" or "sqlite" (defaults to MemoryConfig.STORAGE_BACKEND)
+            background: Start the write-behind, history index and archiver
+                threads. Tools that only read the logs (like migrations)
+                turn this off so nothing moves files underneath them.
+        """
         Paths.ensure_directories()
 
         self.memory_dir = Paths.REFLECTION / "memory"
@@ -70,16 +87,71 @@ class Memory:
         self.daily_logs_dir = self.memory_dir / "daily_logs"
         self.daily_logs_dir.mkdir(exist_ok=True)
 
+        # Optional SQLite storage engine
+        self.backend = backend or MemoryConfig.STORAGE_BACKEND
+        self.store = None
+        self.archive = None
+        if self.backend == "sqlite":
+            from core.memory_store import SQLiteMemoryStore
+            self.store = SQLiteMemoryStore(self.memory_dir / "memory.db")
+            if self.store.is_empty() and self.user_profile_path.exists():
+                print(f"[{BOT_NAME}] SQLite memory is empty. Run 'python -m core.memory_store' to import JSON logs.")
+
+        # Guards profile/log state shared with the write-behind thread
+        self._lock = threading.RLock()
+
+        # Disk writes happen off the voice thread when write-behind is on
+        self.persister = None
+        if MemoryConfig.WRITE_BEHIND and background:
+            self.persister = WriteBehindPersister(
+                flush_interval=MemoryConfig.FLUSH_INTERVAL_SECONDS,
+                max_pending=MemoryConfig.FLUSH_MAX_PENDING,
+                name="MemoryWriteBehind",
+            )
+            self.persister.start()
+
         # Load or create user profile
         self.user_profile = self._load_user_profile()
 
+        # Pending commitments by ID, pending deadlines in sorted order,
+        # and the rendered context block
+        self._commitments_by_id: Dict[str, Dict[str, Any]] = {}
+        self._pending_commitments: Dict[str, Dict[str, Any]] = {}
+        self._deadline_index: List[tuple] = []
+        self._user_context_cache: Optional[str] = None
+        self._rebuild_commitment_index()
+
         # Current day's log
+        if not self.store:
+            # Old JSON logs roll into compressed monthly archives
+            self.archive = LogArchive(self.daily_logs_dir / "archive")
+            self._archive_lock = threading.Lock()
+            self._compact_stale_journals()
         self.today_log = self._load_or_create_daily_log()
 
+        # Full-text index over past interactions, loaded in the background
+        self.history_index_path = self.memory_dir / "history_index.json"
+        self.history_index = BM25Index()
+        self._history_counts: Dict[str, int] = {}
+        self._history_lock = threading.Lock()
+        self._history_ready = threading.Event()
+        # Without a loader thread the index is built on first search
+        self._history_in_background = background
+        if background:
+            threading.Thread(
+                target=self._load_history_index,
+                daemon=True,
+                name="HistoryIndexLoader",
+            ).start()
+            self._start_archiver()
+
         print(f"[{BOT_NAME}] Memory system initialized.")
 
     def _load_user_profile(self) -> UserProfile:
         """Load user profile from disk or create new one."""
+        if self.store:
+            return self.store.load_user_profile() or UserProfile()
+
         if self.user_profile_path.exists():
             try:
                 with open(self.user_profile_path, 'r') as f:
@@ -91,58 +163,264 @@ class Memory:
         return UserProfile()
 
     def _save_user_profile(self):
-        """Save user profile to disk."""
+        """Save user profile to disk (deferred when write-behind is on)."""
+        # Every profile change comes through here, so it also invalidates
+        # the cached context block
+        with self._lock:
+            self._user_context_cache = None
+
+        if self.persister:
+            self.persister.mark_dirty("user_profile", self._write_user_profile)
+        else:
+            self._write_user_profile()
+
+    def _write_user_profile(self):
+        """Write the current user profile to storage."""
+        with self._lock:
+            data = asdict(self.user_profile)
+
+        if self.store:
+            self.store.save_user_profile(UserProfile(**data))
+            return
+
         try:
             with open(self.user_profile_path, 'w') as f:
-                json.dump(asdict(self.user_profile), f, indent=2)
+                json.dump(data, f, indent=2)
         except Exception as e:
             print(f"[{BOT_NAME}] Error saving user profile: {e}")
 
+    def _get_log_path(self, log_date: str) -> Path:
+        """Get path for a day's compacted snapshot."""
+        return self.daily_logs_dir / f"{log_date}.json"
+
+    def _get_journal_path(self, log_date: str) -> Path:
+        """Get path for a day's append-only journal."""
+        return self.daily_logs_dir / f"{log_date}.jsonl"
+
     def _get_today_log_path(self) -> Path:
         """Get path for today's log file."""
-        today = date.today().isoformat()
-        return self.daily_logs_dir / f"{today}.json"
+        return self._get_log_path(date.today().isoformat())
 
     def _load_or_create_daily_log(self) -> DailyLog:
         """Load today's log or create a new one."""
-        log_path = self._get_today_log_path()
+        if self.store:
+            return self.store.load_daily_log(date.today().isoformat())
+        return self._read_daily_log(date.today().isoformat())
+
+    def _read_daily_log(self, log_date: str) -> DailyLog:
+        """Load a day's snapshot (or archived copy) and replay its journal on top of it."""
+        data = None
+        log_path = self._get_log_path(log_date)
+        journal_path = self._get_journal_path(log_date)
 
         if log_path.exists():
             try:
                 with open(log_path, 'r') as f:
                     data = json.load(f)
-                # Reconstruct interactions properly
-                interactions = [Interaction(**i) for i in data.get('interactions', [])]
-                return DailyLog(
-                    date=data['date'],
-                    interactions=interactions,
-                    lessons_learned=data.get('lessons_learned', []),
-                    challenges=data.get('challenges', []),
-                    performance_notes=data.get('performance_notes', []),
-                    external_entities=data.get('external_entities', []),
-                )
+            except FileNotFoundError:
+                # Archived between the check and the open
+                pass
             except Exception as e:
                 print(f"[{BOT_NAME}] Error loading daily log: {e}")
 
-        return DailyLog(date=date.today().isoformat())
+        if data is None and not journal_path.exists() and self.archive:
+            try:
+                data = self.archive.read_day(log_date)
+            except Exception as e:
+                print(f"[{BOT_NAME}] Error reading archived daily log: {e}")
+
+        if data is None:
+            log = DailyLog(date=log_date)
+        else:
+            log = self._log_from_dict(data)
+
+        if journal_path.exists():
+            self._replay_journal(log, journal_path, (data or {}).get('journal_offset', 0))
+
+        return log
+
+    @staticmethod
+    def _log_from_dict(data: Dict[str, Any]) -> DailyLog:
+        """Build a DailyLog from its serialized form."""
+        # Reconstruct interactions properly
+        interactions = [Interaction(**i) for i in data.get('interactions', [])]
+        return DailyLog(
+            date=data['date'],
+            interactions=interactions,
+            lessons_learned=data.get('lessons_learned', []),
+            challenges=data.get('challenges', []),
+            performance_notes=data.get('performance_notes', []),
+            external_entities=data.get('external_entities', []),
+        )
 
-    def _save_daily_log(self):
-        """Save today's log to disk."""
-        log_path = self._get_today_log_path()
+    def _replay_journal(self, log: DailyLog, journal_path: Path, offset: int = 0):
+        """Apply journal events to a log, skipping bytes already in the snapshot."""
         try:
-            data = {
-                'date': self.today_log.date,
-                'interactions': [asdict(i) for i in self.today_log.interactions],
-                'lessons_learned': self.today_log.lessons_learned,
-                'challenges': self.today_log.challenges,
-                'performance_notes': self.today_log.performance_notes,
-                'external_entities': self.today_log.external_entities,
-            }
-            with open(log_path, 'w') as f:
+            with open(journal_path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final line from a crash mid-append
+                        continue
+                    self._apply_event(log, record['event'], record['data'])
+        except Exception as e:
+            print(f"[{BOT_NAME}] Error replaying daily journal: {e}")
+
+    @staticmethod
+    def _apply_event(log: DailyLog, event: str, data: Any):
+        """Apply a single journal event to a daily log."""
+        if event == "interaction":
+            log.interactions.append(Interaction(**data))
+        elif event == "lesson":
+            log.lessons_learned.append(data)
+        elif event == "challenge":
+            log.challenges.append(data)
+        elif event == "performance_note":
+            log.performance_notes.append(data)
+        elif event == "external_entity":
+            log.external_entities.append(data)
+
+    def _record_event(self, event: str, data: Any):
+        """Persist one change to today's log (deferred when write-behind is on)."""
+        log_date = self.today_log.date
+        if not self.persister:
+            self._write_events(log_date, [(event, data)])
+        elif self.store or MemoryConfig.JOURNAL_DAILY_LOGS:
+            self.persister.append(("daily_log", log_date), (event, data), partial(self._write_events, log_date))
+        else:
+            # Full-rewrite mode: any number of changes coalesce into one snapshot
+            self.persister.mark_dirty(("daily_log", log_date), self._save_daily_log)
+
+    def _write_events(self, log_date: str, events: List[tuple]):
+        """Write a batch of daily-log events to storage."""
+        if self.store:
+            self.store.record_events(log_date, events)
+            return
+
+        if not MemoryConfig.JOURNAL_DAILY_LOGS:
+            self._save_daily_log()
+            return
+
+        journal_path = self._get_journal_path(log_date)
+        try:
+            lines = "".join(json.dumps({"event": event, "data": data}) + "\n" for event, data in events)
+            with open(journal_path, 'a') as f:
+                f.write(lines)
+                if self.persister:
+                    # Off the voice thread, so durability is free
+                    f.flush()
+                    os.fsync(f.fileno())
+        except Exception as e:
+            print(f"[{BOT_NAME}] Error appending to daily journal: {e}")
+
+    def _save_daily_log(self, log: DailyLog = None, journal_offset: int = 0):
+        """Save a day's log (today's by default) as a full snapshot."""
+        log = log or self.today_log
+        log_path = self._get_log_path(log.date)
+        try:
+            with self._lock:
+                data = {
+                    'date': log.date,
+                    'interactions': [asdict(i) for i in log.interactions],
+                    'lessons_learned': list(log.lessons_learned),
+                    'challenges': list(log.challenges),
+                    'performance_notes': list(log.performance_notes),
+                    'external_entities': list(log.external_entities),
+                }
+            if journal_offset:
+                data['journal_offset'] = journal_offset
+            tmp_path = log_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
                 json.dump(data, f, indent=2)
+            os.replace(tmp_path, log_path)
         except Exception as e:
             print(f"[{BOT_NAME}] Error saving daily log: {e}")
 
+    def _compact_daily_log(self, log_date: str):
+        """Fold a day's journal into its snapshot and remove the journal."""
+        journal_path = self._get_journal_path(log_date)
+        if not journal_path.exists():
+            return
+
+        log = self._read_daily_log(log_date)
+        # Record how much journal the snapshot covers, so a crash before
+        # the unlink below can't replay the same events twice
+        self._save_daily_log(log, journal_offset=journal_path.stat().st_size)
+        try:
+            journal_path.unlink()
+        except OSError as e:
+            print(f"[{BOT_NAME}] Error removing compacted journal: {e}")
+
+    def archive_old_logs(self, older_than_days: int = None) -> int:
+        """
+        Move compacted daily logs older than N days into monthly archives.
+
+        Returns the number of days archived.
+        """
+        if not self.archive:
+            return 0
+        # Only one archiver at a time; a concurrent run would find nothing new
+        if not self._archive_lock.acquire(blocking=False):
+            return 0
+
+        try:
+            if older_than_days is None:
+                older_than_days = MemoryConfig.ARCHIVE_AFTER_DAYS
+            cutoff = (date.today() - timedelta(days=older_than_days)).isoformat()
+
+            logs = {}
+            for log_path in self.daily_logs_dir.glob("*.json"):
+                log_date = log_path.stem
+                # Days with a live journal haven't been compacted yet
+                if log_date >= cutoff or self._get_journal_path(log_date).exists():
+                    continue
+                try:
+                    with open(log_path, 'r') as f:
+                        data = json.load(f)
+                except Exception as e:
+                    print(f"[{BOT_NAME}] Error reading daily log for archive: {e}")
+                    continue
+                data.pop('journal_offset', None)
+                logs[log_date] = data
+
+            if not logs:
+                return 0
+
+            self.archive.add_days(logs)
+            for log_date in logs:
+                self._get_log_path(log_date).unlink(missing_ok=True)
+
+            print(f"[{BOT_NAME}] Archived {len(logs)} daily logs.")
+            return len(logs)
+
+        except Exception as e:
+            print(f"[{BOT_NAME}] Error archiving daily logs: {e}")
+            return 0
+        finally:
+            self._archive_lock.release()
+
+    def _start_archiver(self):
+        """Archive old daily logs on a background thread."""
+        if not self.archive:
+            return
+        threading.Thread(
+            target=self.archive_old_logs,
+            daemon=True,
+            name="DailyLogArchiver",
+        ).start()
+
+    def _compact_stale_journals(self):
+        """Compact journals left behind by days Vigil wasn't running over midnight."""
+        today = date.today().isoformat()
+        for journal_path in self.daily_logs_dir.glob("*.jsonl"):
+            if journal_path.stem != today:
+                self._compact_daily_log(journal_path.stem)
+
     def record_interaction(
         self,
         user_input: str,
@@ -161,8 +439,12 @@ class Memory:
             learned=learned,
         )
 
-        self.today_log.interactions.append(interaction)
-        self._save_daily_log()
+        with self._lock:
+            self.today_log.interactions.append(interaction)
+            position = len(self.today_log.interactions) - 1
+            self._record_event("interaction", asdict(interaction))
+
+        self._index_interaction(self.today_log.date, position, interaction)
 
         # Update user profile if we learned something
         if learned:
@@ -170,20 +452,23 @@ class Memory:
 
     def add_lesson(self, lesson: str):
         """Add something Vigil learned today."""
-        if lesson not in self.today_log.lessons_learned:
-            self.today_log.lessons_learned.append(lesson)
-            self._save_daily_log()
+        with self._lock:
+            if lesson not in self.today_log.lessons_learned:
+                self.today_log.lessons_learned.append(lesson)
+                self._record_event("lesson", lesson)
 
     def add_challenge(self, challenge: str):
         """Record a challenge faced today."""
-        if challenge not in self.today_log.challenges:
-            self.today_log.challenges.append(challenge)
-            self._save_daily_log()
+        with self._lock:
+            if challenge not in self.today_log.challenges:
+                self.today_log.challenges.append(challenge)
+                self._record_event("challenge", challenge)
 
     def add_performance_note(self, note: str):
         """Add a note about performance."""
-        self.today_log.performance_notes.append(note)
-        self._save_daily_log()
+        with self._lock:
+            self.today_log.performance_notes.append(note)
+            self._record_event("performance_note", note)
 
     def add_external_entity(self, name: str, entity_type: str, trust_level: str, notes: str = ""):
         """Record an external entity (person or system) encountered."""
@@ -194,65 +479,372 @@ class Memory:
             "notes": notes,
             "timestamp": datetime.now().isoformat(),
         }
-        self.today_log.external_entities.append(entity)
-        self._save_daily_log()
-
-    def add_user_commitment(self, commitment: str, deadline: str = None):
-        """Track a commitment the user made."""
-        self.user_profile.commitments.append({
+        with self._lock:
+            self.today_log.external_entities.append(entity)
+            self._record_event("external_entity", entity)
+
+    def add_user_commitment(self, commitment: str, deadline: str = None) -> str:
+        """
+        Track a commitment the user made.
+
+        Returns the commitment ID.
+        """
+        entry = {
+            "id": self._generate_commitment_id(),
             "commitment": commitment,
             "created": datetime.now().isoformat(),
             "deadline": deadline,
             "completed": False,
-        })
+        }
+        with self._lock:
+            self.user_profile.commitments.append(entry)
+            self._index_commitment(entry)
         self._save_user_profile()
         print(f"[{BOT_NAME}] Tracked commitment: {commitment}")
+        return entry["id"]
 
-    def complete_commitment(self, commitment_index: int):
+    def complete_commitment(self, commitment_id: str) -> bool:
         """Mark a commitment as completed."""
-        if 0 <= commitment_index < len(self.user_profile.commitments):
-            self.user_profile.commitments[commitment_index]["completed"] = True
-            self.user_profile.commitments[commitment_index]["completed_date"] = datetime.now().isoformat()
+        with self._lock:
+            entry = self._commitments_by_id.get(commitment_id)
+            if not entry or entry.get("completed", False):
+                return False
+            entry["completed"] = True
+            entry["completed_date"] = datetime.now().isoformat()
+            self._unindex_pending(entry)
+        self._save_user_profile()
+        return True
+
+    def get_commitment(self, commitment_id: str) -> Optional[Dict[str, Any]]:
+        """Get a commitment by ID."""
+        return self._commitments_by_id.get(commitment_id)
+
+    @staticmethod
+    def _generate_commitment_id() -> str:
+        """Generate a stable commitment ID."""
+        return f"cm_{uuid.uuid4().hex[:12]}"
+
+    @staticmethod
+    def _parse_deadline(deadline: Optional[str]) -> Optional[datetime]:
+        """Parse a deadline; a bare date means the end of that day."""
+        if not deadline:
+            return None
+        try:
+            if len(deadline) == 10:
+                return datetime.combine(date.fromisoformat(deadline), time.max)
+            parsed = datetime.fromisoformat(deadline)
+        except (TypeError, ValueError):
+            return None
+        # Compare everything in naive local time
+        if parsed.tzinfo:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+
+    def _index_commitment(self, entry: Dict[str, Any]):
+        """Add a commitment to the ID, pending and deadline indexes."""
+        self._commitments_by_id[entry["id"]] = entry
+        if entry.get("completed", False):
+            return
+        self._pending_commitments[entry["id"]] = entry
+        deadline = self._parse_deadline(entry.get("deadline"))
+        if deadline:
+            insort(self._deadline_index, (deadline, entry["id"]))
+
+    def _unindex_pending(self, entry: Dict[str, Any]):
+        """Drop a commitment from the pending and deadline indexes."""
+        self._pending_commitments.pop(entry["id"], None)
+        deadline = self._parse_deadline(entry.get("deadline"))
+        if deadline:
+            key = (deadline, entry["id"])
+            i = bisect_left(self._deadline_index, key)
+            if i < len(self._deadline_index) and self._deadline_index[i] == key:
+                del self._deadline_index[i]
+
+    def _rebuild_commitment_index(self):
+        """Index commitments, giving IDs to any saved before IDs existed."""
+        missing_ids = False
+        with self._lock:
+            self._commitments_by_id = {}
+            self._pending_commitments = {}
+            self._deadline_index = []
+            for entry in self.user_profile.commitments:
+                if not entry.get("id"):
+                    entry["id"] = self._generate_commitment_id()
+                    missing_ids = True
+                self._index_commitment(entry)
+        if missing_ids:
             self._save_user_profile()
 
     def get_pending_commitments(self) -> List[Dict]:
         """Get all pending commitments."""
-        return [c for c in self.user_profile.commitments if not c.get("completed", False)]
+        with self._lock:
+            return list(self._pending_commitments.values())
+
+    def due_within(self, window: timedelta, now: datetime = None) -> List[Dict]:
+        """Get pending commitments due between now and now + window, soonest first."""
+        now = now or datetime.now()
+        with self._lock:
+            start = bisect_right(self._deadline_index, (now, ""))
+            end = bisect_right(self._deadline_index, (now + window, "\uffff"))
+            return [self._pending_commitments[cid] for _, cid in self._deadline_index[start:end]]
+
+    def overdue(self, now: datetime = None) -> List[Dict]:
+        """Get pending commitments whose deadline has passed, most overdue first."""
+        now = now or datetime.now()
+        with self._lock:
+            end = bisect_right(self._deadline_index, (now, ""))
+            return [self._pending_commitments[cid] for _, cid in self._deadline_index[:end]]
 
     def add_user_interest(self, interest: str):
         """Add an interest to user profile."""
-        if interest not in self.user_profile.interests:
-            self.user_profile.interests.append(interest)
-            self.user_profile.last_updated = datetime.now().isoformat()
-            self._save_user_profile()
+        with self._lock:
+            if interest not in self.user_profile.interests:
+                self.user_profile.interests.append(interest)
+                self.user_profile.last_updated = datetime.now().isoformat()
+                self._save_user_profile()
 
     def add_user_goal(self, goal: str):
         """Add a goal to user profile."""
-        if goal not in self.user_profile.goals:
-            self.user_profile.goals.append(goal)
-            self.user_profile.last_updated = datetime.now().isoformat()
-            self._save_user_profile()
+        with self._lock:
+            if goal not in self.user_profile.goals:
+                self.user_profile.goals.append(goal)
+                self.user_profile.last_updated = datetime.now().isoformat()
+                self._save_user_profile()
 
     def add_relationship_note(self, note: str):
         """Add a note about the relationship."""
-        self.user_profile.relationship_notes.append(note)
-        self.user_profile.last_updated = datetime.now().isoformat()
-        self._save_user_profile()
+        with self._lock:
+            self.user_profile.relationship_notes.append(note)
+            self.user_profile.last_updated = datetime.now().isoformat()
+            self._save_user_profile()
 
-    def get_daily_summary(self) -> Dict[str, Any]:
-        """Get summary of today's interactions."""
+    def get_daily_summary(self, log_date: str = None) -> Dict[str, Any]:
+        """Get summary of a day's interactions (today by default, archived days included)."""
+        log = self._get_daily_log(log_date) if log_date else self.today_log
         return {
-            "date": self.today_log.date,
-            "interaction_count": len(self.today_log.interactions),
-            "lessons_learned": self.today_log.lessons_learned,
-            "challenges": self.today_log.challenges,
-            "performance_notes": self.today_log.performance_notes,
-            "external_entities": self.today_log.external_entities,
-            "modes_used": list(set(i.mode for i in self.today_log.interactions)),
+            "date": log.date,
+            "interaction_count": len(log.interactions),
+            "lessons_learned": log.lessons_learned,
+            "challenges": log.challenges,
+            "performance_notes": log.performance_notes,
+            "external_entities": log.external_entities,
+            "modes_used": list(set(i.mode for i in log.interactions)),
         }
 
+    def get_logged_dates(self) -> List[str]:
+        """Get the dates (ISO format) that have a daily log, oldest first (today always included)."""
+        # Today's log may not have reached storage yet while writes are deferred
+        if self.store:
+            return sorted(set(self.store.get_logged_dates()) | {self.today_log.date})
+        return sorted(
+            {p.stem for p in self.daily_logs_dir.glob("*.json")}
+            | {p.stem for p in self.daily_logs_dir.glob("*.jsonl")}
+            | set(self.archive.list_days())
+            | {self.today_log.date}
+        )
+
+    def query_interactions(
+        self,
+        since: Union[str, date, datetime] = None,
+        until: Union[str, date, datetime] = None,
+        mode: str = None,
+        topic: str = None,
+        limit: int = None,
+    ) -> List[Interaction]:
+        """
+        Query interactions across all days, oldest first.
+
+        With the SQLite backend this is an index lookup; with JSON logs
+        only the days inside [since, until) are opened. Today is always
+        served from the live log, which includes writes not yet flushed.
+        """
+        since = since.isoformat() if isinstance(since, (date, datetime)) else since
+        until = until.isoformat() if isinstance(until, (date, datetime)) else until
+        today = self.today_log.date
+
+        def matches(interaction: Interaction) -> bool:
+            if since and interaction.timestamp < since:
+                return False
+            if until and interaction.timestamp >= until:
+                return False
+            if mode and interaction.mode != mode:
+                return False
+            if topic and topic not in interaction.topics:
+                return False
+            return True
+
+        if self.store:
+            # Earlier days come from the database, today from memory
+            before_today = min(until, today) if until else today
+            results = self.store.query_interactions(since, before_today, mode, topic, limit)
+            if not until or until[:10] >= today:
+                with self._lock:
+                    interactions = list(self.today_log.interactions)
+                results.extend(i for i in interactions if matches(i))
+            return results[-limit:] if limit else results
+
+        results = []
+        for log_date in self.get_logged_dates():
+            if since and log_date < since[:10]:
+                continue
+            if until and log_date > until[:10]:
+                break
+            results.extend(i for i in self._get_daily_log(log_date).interactions if matches(i))
+
+        return results[-limit:] if limit else results
+
+    def _get_daily_log(self, log_date: str) -> DailyLog:
+        """Get any day's log, using the live log for today."""
+        if log_date == self.today_log.date:
+            return self.today_log
+        if self.store:
+            return self.store.load_daily_log(log_date)
+        return self._read_daily_log(log_date)
+
+    # -------------------------------------------------------------------------
+    # History search
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _history_doc(log_date: str, position: int, interaction: Interaction) -> tuple:
+        """Build the (doc_id, text, meta) index entry for an interaction."""
+        return (
+            f"{log_date}#{position}",
+            f"{interaction.user_input}\n{interaction.vigil_response}",
+            interaction.timestamp,
+        )
+
+    def _index_interaction(self, log_date: str, position: int, interaction: Interaction):
+        """Add a new interaction to the history index."""
+        with self._history_lock:
+            # Until loading finishes, the loader picks up today's log itself
+            if not self._history_ready.is_set():
+                return
+            self.history_index.add(*self._history_doc(log_date, position, interaction))
+            self._history_counts[log_date] = max(self._history_counts.get(log_date, 0), position + 1)
+
+    def _load_history_index(self):
+        """Load the saved history index and index anything logged since."""
+        index, counts = BM25Index(), {}
+        if self.history_index_path.exists():
+            try:
+                with open(self.history_index_path, 'r') as f:
+                    data = json.load(f)
+                index = BM25Index.from_dict(data['index'])
+                counts = data['days']
+            except Exception as e:
+                print(f"[{BOT_NAME}] Error loading history index, rebuilding: {e}")
+                index, counts = BM25Index(), {}
+
+        # Days missing from the index, plus the last indexed day (which may
+        # have been saved mid-day), need catching up
+        last_indexed = max(counts) if counts else ""
+        today = self.today_log.date
+        for log_date in self.get_logged_dates():
+            if log_date == today or (log_date in counts and log_date < last_indexed):
+                continue
+            interactions = self._get_daily_log(log_date).interactions
+            for position in range(counts.get(log_date, 0), len(interactions)):
+                index.add(*self._history_doc(log_date, position, interactions[position]))
+            counts[log_date] = len(interactions)
+
+        with self._history_lock:
+            with self._lock:
+                today_log = self.today_log
+                interactions = list(today_log.interactions)
+            for position in range(counts.get(today_log.date, 0), len(interactions)):
+                index.add(*self._history_doc(today_log.date, position, interactions[position]))
+            counts[today_log.date] = len(interactions)
+
+            self.history_index = index
+            self._history_counts = counts
+            self._history_ready.set()
+
+    def _save_history_index(self):
+        """Persist the history index so startup doesn't re-read every log."""
+        if not self._history_ready.is_set():
+            return
+        with self._history_lock:
+            data = json.dumps({
+                'index': self.history_index.to_dict(),
+                'days': dict(self._history_counts),
+            })
+        try:
+            tmp_path = self.history_index_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, self.history_index_path)
+        except Exception as e:
+            print(f"[{BOT_NAME}] Error saving history index: {e}")
+
+    def search_history(
+        self,
+        query: str,
+        k: int = 5,
+        since: Union[str, date, datetime] = None,
+    ) -> List[Interaction]:
+        """
+        Search all past interactions, ranked by BM25 relevance.
+
+        Args:
+            query: Free text to match against what was said
+            k: Maximum number of results
+            since: Only interactions at or after this time
+
+        Returns:
+            Matching interactions, best match first
+        """
+        if not self._history_in_background and not self._history_ready.is_set():
+            self._load_history_index()
+        self._history_ready.wait()
+
+        since = since.isoformat() if isinstance(since, (date, datetime)) else since
+        doc_filter = (lambda doc_id, timestamp: timestamp >= since) if since else None
+
+        with self._history_lock:
+            hits = self.history_index.search(query, k, doc_filter)
+
+        logs: Dict[str, DailyLog] = {}
+        results = []
+        for doc_id, _ in hits:
+            log_date, position = doc_id.rsplit("#", 1)
+            if log_date not in logs:
+                logs[log_date] = self._get_daily_log(log_date)
+            interactions = logs[log_date].interactions
+            if int(position) < len(interactions):
+                results.append(interactions[int(position)])
+        return results
+
+    def get_history_context(self, query: str, max_results: int = 3) -> str:
+        """
+        Get relevant past conversations for a query.
+        Returns formatted context string for LLM prompting.
+        """
+        # Don't hold up a voice command while the index is still loading
+        if self._history_in_background and not self._history_ready.is_set():
+            return ""
+
+        results = self.search_history(query, k=max_results)
+
+        if not results:
+            return ""
+
+        lines = ["## RELEVANT PAST CONVERSATIONS\n"]
+        for interaction in results:
+            lines.append(f"**{interaction.timestamp[:10]}** — {PRIMARY_USER_NAME}: {interaction.user_input}")
+            lines.append(f"{BOT_NAME}: {interaction.vigil_response}\n")
+
+        return "\n".join(lines)
+
     def get_user_context(self) -> str:
-        """Get user context for LLM prompting."""
+        """Get user context for LLM prompting (cached until the profile changes)."""
+        with self._lock:
+            if self._user_context_cache is None:
+                self._user_context_cache = self._render_user_context()
+            return self._user_context_cache
+
+    def _render_user_context(self) -> str:
+        """Render the user context block."""
         profile = self.user_profile
         pending = self.get_pending_commitments()
 
@@ -279,8 +871,38 @@ class Memory:
         today = date.today().isoformat()
         if self.today_log.date != today:
             print(f"[{BOT_NAME}] New day detected. Creating fresh log.")
-            self.today_log = DailyLog(date=today)
-            self._save_daily_log()
+            previous_date = self.today_log.date
+            # Pending writes for the old day must land before it is compacted
+            self.flush()
+            with self._lock:
+                self.today_log = DailyLog(date=today)
+            if self.persister:
+                self.persister.mark_dirty("history_index", self._save_history_index)
+            else:
+                self._save_history_index()
+            if self.store:
+                # Rows are keyed by day; nothing to roll over
+                return
+            if MemoryConfig.JOURNAL_DAILY_LOGS:
+                self._compact_daily_log(previous_date)
+            else:
+                self._save_daily_log()
+            self._start_archiver()
+
+    def flush(self):
+        """Write any deferred memory changes to disk now."""
+        if self.persister:
+            self.persister.flush()
+
+    def close(self):
+        """Flush pending writes and release storage."""
+        if self.persister:
+            self.persister.stop()
+            self.persister = None
+        self._save_history_index()
+        if self.store:
+            self.store.close()
+            self.store = None
 
 
 if __name__ == "__main__":
@@ -301,6 +923,7 @@ if __name__ == "__main__":
 
     # Add a commitment
     memory.add_user_commitment("Finish the Vigil project", deadline="2024-12-31")
+    print(f"\n✅ Overdue: {[c['commitment'] for c in memory.overdue()]}")
 
     # Get summary
     summary = memory.get_daily_summary()
@@ -309,3 +932,5 @@ if __name__ == "__main__":
     # Get user context
     context = memory.get_user_context()
     print(f"\n✅ User Context:\n{context}")
+
+    memory.close()
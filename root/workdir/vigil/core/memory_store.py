@@ -0,0 +1,424 @@
+"""
+VIGIL - SQLite Memory Store
+Indexed storage backend for Memory, with a migration tool for JSON logs
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Union
+from dataclasses import asdict
+
+from config.settings import Paths, BOT_NAME
+from core.memory import Interaction, UserProfile, DailyLog, Memory
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    user_input TEXT NOT NULL,
+    vigil_response TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    learned TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_interactions_mode ON interactions(mode, timestamp);
+CREATE INDEX IF NOT EXISTS idx_interactions_day ON interactions(day);
+
+CREATE TABLE IF NOT EXISTS interaction_topics (
+    interaction_id INTEGER NOT NULL REFERENCES interactions(id) ON DELETE CASCADE,
+    topic TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_topics_topic ON interaction_topics(topic, interaction_id);
+CREATE INDEX IF NOT EXISTS idx_topics_interaction ON interaction_topics(interaction_id);
+
+CREATE TABLE IF NOT EXISTS lessons (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lessons_day ON lessons(day);
+
+CREATE TABLE IF NOT EXISTS challenges (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_challenges_day ON challenges(day);
+
+CREATE TABLE IF NOT EXISTS performance_notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_performance_notes_day ON performance_notes(day);
+
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    trust_level TEXT NOT NULL,
+    notes TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entities_day ON entities(day);
+CREATE INDEX IF NOT EXISTS idx_entities_name ON entities(name);
+
+CREATE TABLE IF NOT EXISTS commitments (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    commitment TEXT NOT NULL,
+    created TEXT NOT NULL,
+    deadline TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    completed_date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_commitments_position ON commitments(position);
+CREATE INDEX IF NOT EXISTS idx_commitments_pending ON commitments(completed, deadline);
+
+CREATE TABLE IF NOT EXISTS profile (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Daily-log list fields that are stored as (day, text) rows
+TEXT_TABLES = {
+    "lesson": ("lessons", "lessons_learned"),
+    "challenge": ("challenges", "challenges"),
+    "performance_note": ("performance_notes", "performance_notes"),
+}
+
+
+def _as_iso(value: Union[str, date, datetime, None]) -> Optional[str]:
+    """Normalize a date/datetime bound to an ISO string."""
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+class SQLiteMemoryStore:
+    """
+    SQLite storage engine for Vigil's memory.
+
+    Stores interactions, lessons, challenges, entities and commitments
+    in indexed tables so history across days can be queried without
+    opening every daily log.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or (Paths.REFLECTION / "memory" / "memory.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Memory is touched from the voice loop and the reflection thread
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def is_empty(self) -> bool:
+        """Check whether nothing has been stored yet."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM interactions) + (SELECT COUNT(*) FROM profile)"
+            ).fetchone()
+        return row[0] == 0
+
+    # -------------------------------------------------------------------------
+    # Daily logs
+    # -------------------------------------------------------------------------
+
+    def _insert_event(self, day: str, event: str, data: Any):
+        """Insert one daily-log event (caller holds the lock and commits)."""
+        if event == "interaction":
+            cursor = self._conn.execute(
+                "INSERT INTO interactions (day, timestamp, user_input, vigil_response, mode, sentiment, learned) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    day,
+                    data["timestamp"],
+                    data["user_input"],
+                    data["vigil_response"],
+                    data.get("mode", "conversation"),
+                    data.get("sentiment", "neutral"),
+                    data.get("learned"),
+                ),
+            )
+            self._conn.executemany(
+                "INSERT INTO interaction_topics (interaction_id, topic) VALUES (?, ?)",
+                [(cursor.lastrowid, topic) for topic in data.get("topics", [])],
+            )
+        elif event in TEXT_TABLES:
+            table, _ = TEXT_TABLES[event]
+            self._conn.execute(f"INSERT INTO {table} (day, text) VALUES (?, ?)", (day, data))
+        elif event == "external_entity":
+            self._conn.execute(
+                "INSERT INTO entities (day, name, type, trust_level, notes, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    day,
+                    data["name"],
+                    data["type"],
+                    data["trust_level"],
+                    data.get("notes", ""),
+                    data.get("timestamp", ""),
+                ),
+            )
+
+    def record_event(self, day: str, event: str, data: Any):
+        """Persist one daily-log change."""
+        self.record_events(day, [(event, data)])
+
+    def record_events(self, day: str, events: List[tuple]):
+        """Persist a batch of (event, data) daily-log changes in one transaction."""
+        with self._lock:
+            with self._conn:
+                for event, data in events:
+                    self._insert_event(day, event, data)
+
+    def import_daily_log(self, log: DailyLog):
+        """Replace everything stored for a day with the given log."""
+        with self._lock:
+            with self._conn:
+                for table in ("interactions", "lessons", "challenges", "performance_notes", "entities"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE day = ?", (log.date,))
+                for interaction in log.interactions:
+                    self._insert_event(log.date, "interaction", asdict(interaction))
+                for event, (_, field_name) in TEXT_TABLES.items():
+                    for text in getattr(log, field_name):
+                        self._insert_event(log.date, event, text)
+                for entity in log.external_entities:
+                    self._insert_event(log.date, "external_entity", entity)
+
+    def _topics_for(self, interaction_ids: List[int]) -> Dict[int, List[str]]:
+        """Fetch topics for a batch of interactions."""
+        topics: Dict[int, List[str]] = {i: [] for i in interaction_ids}
+        # Chunk to stay under SQLite's bound-parameter limit
+        for start in range(0, len(interaction_ids), 500):
+            chunk = interaction_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT interaction_id, topic FROM interaction_topics "
+                f"WHERE interaction_id IN ({placeholders}) ORDER BY rowid",
+                chunk,
+            )
+            for row in rows:
+                topics[row["interaction_id"]].append(row["topic"])
+        return topics
+
+    def _rows_to_interactions(self, rows: List[sqlite3.Row]) -> List[Interaction]:
+        """Convert interaction rows to Interaction objects."""
+        topics = self._topics_for([row["id"] for row in rows])
+        return [
+            Interaction(
+                timestamp=row["timestamp"],
+                user_input=row["user_input"],
+                vigil_response=row["vigil_response"],
+                mode=row["mode"],
+                sentiment=row["sentiment"],
+                topics=topics[row["id"]],
+                learned=row["learned"],
+            )
+            for row in rows
+        ]
+
+    def load_daily_log(self, day: str) -> DailyLog:
+        """Load a single day's log."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM interactions WHERE day = ? ORDER BY id", (day,)
+            ).fetchall()
+            log = DailyLog(date=day, interactions=self._rows_to_interactions(rows))
+
+            for _, (table, field_name) in TEXT_TABLES.items():
+                texts = self._conn.execute(
+                    f"SELECT text FROM {table} WHERE day = ? ORDER BY id", (day,)
+                )
+                setattr(log, field_name, [row["text"] for row in texts])
+
+            entities = self._conn.execute(
+                "SELECT name, type, trust_level, notes, timestamp FROM entities WHERE day = ? ORDER BY id",
+                (day,),
+            )
+            log.external_entities = [dict(row) for row in entities]
+        return log
+
+    def get_logged_dates(self) -> List[str]:
+        """Get every day with stored interactions, oldest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT day FROM interactions ORDER BY day")
+            return [row["day"] for row in rows]
+
+    def query_interactions(
+        self,
+        since: Union[str, date, datetime] = None,
+        until: Union[str, date, datetime] = None,
+        mode: str = None,
+        topic: str = None,
+        limit: int = None,
+    ) -> List[Interaction]:
+        """
+        Query interactions across all days.
+
+        Args:
+            since: Earliest timestamp (inclusive)
+            until: Latest timestamp (exclusive)
+            mode: Only interactions in this mode
+            topic: Only interactions tagged with this topic
+            limit: Maximum number of results (most recent kept)
+
+        Returns:
+            Matching interactions, oldest first
+        """
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("i.timestamp >= ?")
+            params.append(_as_iso(since))
+        if until is not None:
+            clauses.append("i.timestamp < ?")
+            params.append(_as_iso(until))
+        if mode:
+            clauses.append("i.mode = ?")
+            params.append(mode)
+        if topic:
+            clauses.append("i.id IN (SELECT interaction_id FROM interaction_topics WHERE topic = ?)")
+            params.append(topic)
+
+        sql = "SELECT i.* FROM interactions i"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY i.timestamp DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            interactions = self._rows_to_interactions(rows)
+        interactions.reverse()
+        return interactions
+
+    # -------------------------------------------------------------------------
+    # User profile
+    # -------------------------------------------------------------------------
+
+    def load_user_profile(self) -> Optional[UserProfile]:
+        """Load the user profile, or None if none is stored."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM profile").fetchall()
+            if not rows:
+                return None
+            data = {row["key"]: json.loads(row["value"]) for row in rows}
+            commitments = self._conn.execute(
+                "SELECT id, commitment, created, deadline, completed, completed_date "
+                "FROM commitments ORDER BY position"
+            ).fetchall()
+
+        data["commitments"] = []
+        for row in commitments:
+            commitment = {
+                "id": row["id"],
+                "commitment": row["commitment"],
+                "created": row["created"],
+                "deadline": row["deadline"],
+                "completed": bool(row["completed"]),
+            }
+            if row["completed_date"]:
+                commitment["completed_date"] = row["completed_date"]
+            data["commitments"].append(commitment)
+
+        return UserProfile(**data)
+
+    def save_user_profile(self, profile: UserProfile):
+        """Save the user profile and its commitments."""
+        data = asdict(profile)
+        commitments = data.pop("commitments")
+
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO profile (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in data.items()],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO commitments "
+                    "(id, position, commitment, created, deadline, completed, completed_date) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            c["id"],
+                            position,
+                            c["commitment"],
+                            c.get("created", ""),
+                            c.get("deadline"),
+                            int(c.get("completed", False)),
+                            c.get("completed_date"),
+                        )
+                        for position, c in enumerate(commitments)
+                    ],
+                )
+                self._conn.execute(
+                    "DELETE FROM commitments WHERE position >= ?", (len(commitments),)
+                )
+
+
+def migrate_json_memory(db_path: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Import existing JSON daily logs and user_profile.json into SQLite.
+
+    Safe to re-run: each day's rows are replaced, not duplicated.
+
+    Returns counts of imported days and interactions.
+    """
+    # No background threads: the archiver would move days while they are read
+    source = Memory(backend="json", background=False)
+    store = SQLiteMemoryStore(db_path)
+
+    # Includes days already rolled into the compressed monthly archives.
+    # Today is listed even with nothing logged yet; importing it empty would
+    # replace rows already in the database, so it needs a file on disk.
+    today = source.today_log.date
+    days = [
+        day for day in source.get_logged_dates()
+        if day != today
+        or source._get_journal_path(day).exists()
+        or source._get_log_path(day).exists()
+    ]
+
+    interaction_count = 0
+    for day in days:
+        log = source._read_daily_log(day)
+        store.import_daily_log(log)
+        interaction_count += len(log.interactions)
+
+    if source.user_profile_path.exists():
+        store.save_user_profile(source.user_profile)
+
+    store.close()
+    source.close()
+    print(f"[{BOT_NAME}] Migrated {len(days)} days ({interaction_count} interactions) to {store.db_path}")
+    return {"days": len(days), "interactions": interaction_count}
+
+
+if __name__ == "__main__":
+    # Import JSON memory into the SQLite store
+    print("Migrating JSON memory to SQLite...")
+    print("=" * 50)
+
+    counts = migrate_json_memory()
+    print(f"\n✅ Migration complete: {counts}")
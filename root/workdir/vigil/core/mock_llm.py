@@ -0,0 +1,430 @@
+"""
+VIGIL - Mock LLM Server
+Local stand-in for the OpenAI and Anthropic APIs, for offline benchmarking
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import BOT_NAME, MockLLMConfig
+from core.conversation import MESSAGE_OVERHEAD_TOKENS, estimate_tokens
+
+
+# Filler vocabulary for generated replies (about one token per word)
+WORDS = (
+    "vigil watches holds steady the path forward is clear patience builds "
+    "strength focus on one step then the next truth guides every choice"
+).split()
+
+
+@dataclass
+class MockProfile:
+    """How the stand-in behaves for one provider."""
+    latency: float = MockLLMConfig.LATENCY_SECONDS
+    jitter: float = MockLLMConfig.LATENCY_JITTER_SECONDS
+    tokens_per_second: float = MockLLMConfig.TOKENS_PER_SECOND
+    chunk_tokens: int = MockLLMConfig.CHUNK_TOKENS
+    response_tokens: int = MockLLMConfig.RESPONSE_TOKENS
+    failure_rate: float = MockLLMConfig.FAILURE_RATE
+    failure_status: int = MockLLMConfig.FAILURE_STATUS
+    stall_rate: float = MockLLMConfig.STALL_RATE
+    stall_seconds: float = MockLLMConfig.STALL_SECONDS
+
+    @classmethod
+    def from_config(cls) -> 'MockProfile':
+        """The default profile as MockLLMConfig currently sets it."""
+        return cls(
+            latency=MockLLMConfig.LATENCY_SECONDS,
+            jitter=MockLLMConfig.LATENCY_JITTER_SECONDS,
+            tokens_per_second=MockLLMConfig.TOKENS_PER_SECOND,
+            chunk_tokens=MockLLMConfig.CHUNK_TOKENS,
+            response_tokens=MockLLMConfig.RESPONSE_TOKENS,
+            failure_rate=MockLLMConfig.FAILURE_RATE,
+            failure_status=MockLLMConfig.FAILURE_STATUS,
+            stall_rate=MockLLMConfig.STALL_RATE,
+            stall_seconds=MockLLMConfig.STALL_SECONDS,
+        )
+
+
+def _content_text(content: Any) -> str:
+    """Text of a message's content (string or list of blocks)."""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content or [] if isinstance(block, dict))
+
+
+def mock_reply(prompt: str, tokens: int) -> str:
+    """Deterministic reply of about `tokens` tokens for a prompt."""
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+    words = [WORDS[(seed + i * 7) % len(WORDS)] for i in range(max(tokens, 1))]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + "."
+
+
+class MockLLMServer:
+    """
+    HTTP server speaking enough of the OpenAI chat completions and
+    Anthropic messages wire formats for the official SDK clients.
+
+    The first path segment selects a profile, so each provider can get
+    its own latency and failure behaviour from one server:
+
+        OpenAI(base_url=server.base_url("openai") + "/v1")
+        Anthropic(base_url=server.base_url("anthropic"))
+
+    Replies are generated from a hash of the prompt, and failures and
+    jitter come from a seeded RNG, so a run can be repeated exactly.
+    """
+
+    def __init__(self, host: str = None, port: int = None, seed: int = None):
+        self.host = host or MockLLMConfig.HOST
+        self.port = MockLLMConfig.PORT if port is None else port
+        self.default_profile = MockProfile.from_config()
+        self.profiles: Dict[str, MockProfile] = {
+            name: replace(self.default_profile, **overrides)
+            for name, overrides in MockLLMConfig.PROFILES.items()
+        }
+        self.requests = 0
+        self.failures = 0
+
+        self._rng = random.Random(MockLLMConfig.SEED if seed is None else seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> 'MockLLMServer':
+        """Start serving in a background thread."""
+        if self._server:
+            return self
+        server = self
+
+        class Handler(MockRequestHandler):
+            mock = server
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="MockLLMServer")
+        self._thread.start()
+        print(f"[{BOT_NAME}] Mock LLM server listening on {self.url}")
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def base_url(self, profile: str = "mock") -> str:
+        """Root URL for a profile (append /v1 for the OpenAI SDK)."""
+        return f"{self.url}/{profile}"
+
+    # -------------------------------------------------------------------------
+    # Behaviour
+    # -------------------------------------------------------------------------
+
+    def profile(self, name: str) -> MockProfile:
+        """Get a profile, falling back to the default."""
+        with self._lock:
+            return self.profiles.get(name, self.default_profile)
+
+    def configure(self, profile: str = None, **settings):
+        """
+        Change behaviour at runtime, e.g. configure("openai", failure_rate=1.0).
+
+        With no profile the default and every named profile change.
+        """
+        valid = {f.name for f in fields(MockProfile)}
+        unknown = set(settings) - valid
+        if unknown:
+            raise ValueError(f"Unknown mock settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            if profile:
+                base = self.profiles.get(profile, self.default_profile)
+                self.profiles[profile] = replace(base, **settings)
+            else:
+                self.default_profile = replace(self.default_profile, **settings)
+                for name in self.profiles:
+                    self.profiles[name] = replace(self.profiles[name], **settings)
+
+    def plan(self, profile: MockProfile) -> Tuple[float, bool, bool]:
+        """Roll (first-token delay, stall, fail) for one request."""
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, profile.latency + self._rng.uniform(-profile.jitter, profile.jitter))
+            stall = self._rng.random() < profile.stall_rate
+            fail = self._rng.random() < profile.failure_rate
+            if fail:
+                self.failures += 1
+        return delay, stall, fail
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request and failure counts."""
+        with self._lock:
+            return {"requests": self.requests, "failures": self.failures}
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """Answers /<profile>/v1/chat/completions and /<profile>/v1/messages."""
+
+    protocol_version = "HTTP/1.1"
+    mock: MockLLMServer = None
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def do_POST(self):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        profile_name = parts[0] if parts and parts[0] != "v1" else "mock"
+        endpoint = "/".join(parts[1:] if parts and parts[0] != "v1" else parts)
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+
+        if endpoint == "v1/chat/completions":
+            wire = "openai"
+        elif endpoint == "v1/messages":
+            wire = "anthropic"
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+            return
+
+        profile = self.mock.profile(profile_name)
+        delay, stall, fail = self.mock.plan(profile)
+        if stall:
+            time.sleep(profile.stall_seconds)
+        time.sleep(delay)
+
+        if fail:
+            self._send_error(wire, profile.failure_status)
+            return
+
+        messages = body.get("messages", [])
+        system = body.get("system")
+        prompt = _content_text(messages[-1].get("content")) if messages else ""
+        prompt_tokens = sum(
+            estimate_tokens(_content_text(m.get("content"))) + MESSAGE_OVERHEAD_TOKENS for m in messages
+        )
+        if system:
+            prompt_tokens += estimate_tokens(_content_text(system)) + MESSAGE_OVERHEAD_TOKENS
+
+        tokens = min(profile.response_tokens, body.get("max_tokens") or profile.response_tokens)
+        words = mock_reply(prompt, tokens).split(" ")
+        chunks = [
+            " ".join(words[i:i + profile.chunk_tokens]) + ("" if i + profile.chunk_tokens >= len(words) else " ")
+            for i in range(0, len(words), max(profile.chunk_tokens, 1))
+        ]
+        model = body.get("model", MockLLMConfig.MODEL)
+
+        if wire == "openai":
+            if body.get("stream"):
+                include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+                self._stream(self._openai_events(model, chunks, prompt_tokens, len(words), include_usage), profile)
+            else:
+                time.sleep(len(words) / profile.tokens_per_second)
+                self._send_json(200, self._openai_body(model, "".join(chunks), prompt_tokens, len(words)))
+        else:
+            if body.get("stream"):
+                self._stream(self._anthropic_events(model, chunks, prompt_tokens, len(words)), profile)
+            else:
+                time.sleep(len(words) / profile.tokens_per_second)
+                self._send_json(200, self._anthropic_body(model, "".join(chunks), prompt_tokens, len(words)))
+
+    # -------------------------------------------------------------------------
+    # Wire formats
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _openai_body(model: str, text: str, prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": 0},
+            },
+        }
+
+    @staticmethod
+    def _openai_events(
+        model: str, chunks: List[str], prompt_tokens: int, completion_tokens: int, include_usage: bool
+    ) -> Iterator[Tuple[Optional[str], Any, int]]:
+        """(event name, data, tokens in this chunk) for an OpenAI stream."""
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        def chunk(delta: Dict[str, Any], finish_reason: str = None, usage: Dict[str, int] = None) -> Dict[str, Any]:
+            return {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                "usage": usage,
+            }
+
+        yield None, chunk({"role": "assistant", "content": ""}), 0
+        for text in chunks:
+            yield None, chunk({"content": text}), len(text.split())
+        yield None, chunk({}, finish_reason="stop"), 0
+        if include_usage:
+            yield None, chunk({}, usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": 0},
+            }), 0
+        yield None, "[DONE]", 0
+
+    @staticmethod
+    def _anthropic_body(model: str, text: str, prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "cache_read_input_tokens": 0,
+                "cache_creation_input_tokens": 0,
+            },
+        }
+
+    @staticmethod
+    def _anthropic_events(
+        model: str, chunks: List[str], prompt_tokens: int, completion_tokens: int
+    ) -> Iterator[Tuple[Optional[str], Any, int]]:
+        """(event name, data, tokens in this chunk) for an Anthropic stream."""
+        message = MockRequestHandler._anthropic_body(model, "", prompt_tokens, 0)
+        message["content"] = []
+        message["stop_reason"] = None
+        yield "message_start", {"type": "message_start", "message": message}, 0
+        yield "content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+        }, 0
+        for text in chunks:
+            yield "content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text},
+            }, len(text.split())
+        yield "content_block_stop", {"type": "content_block_stop", "index": 0}, 0
+        yield "message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": completion_tokens},
+        }, 0
+        yield "message_stop", {"type": "message_stop"}, 0
+
+    # -------------------------------------------------------------------------
+    # Transport
+    # -------------------------------------------------------------------------
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, wire: str, status: int):
+        message = f"Injected mock failure ({status})"
+        if wire == "openai":
+            body = {"error": {"message": message, "type": "server_error", "code": status}}
+        else:
+            body = {"type": "error", "error": {"type": "api_error", "message": message}}
+        self._send_json(status, body)
+
+    def _stream(self, events: Iterator[Tuple[Optional[str], Any, int]], profile: MockProfile):
+        """Send server-sent events, pacing content chunks at the profile's token rate."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for event, data, tokens in events:
+                if tokens:
+                    time.sleep(tokens / profile.tokens_per_second)
+                payload = data if isinstance(data, str) else json.dumps(data)
+                frame = (f"event: {event}\n" if event else "") + f"data: {payload}\n\n"
+                encoded = frame.encode("utf-8")
+                self.wfile.write(f"{len(encoded):x}\r\n".encode("ascii") + encoded + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client stopped reading (e.g. the stream was interrupted)
+
+
+_server: Optional[MockLLMServer] = None
+_server_lock = threading.Lock()
+
+
+def get_mock_server() -> MockLLMServer:
+    """The process-wide mock server, started on first use."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = MockLLMServer().start()
+        return _server
+
+
+if __name__ == "__main__":
+    # Benchmark the Brain against the stand-in
+    from core import mock_llm
+    from core.brain import Brain
+
+    MockLLMConfig.ENABLED = True
+    brain = Brain()
+
+    questions = [f"Question {i}: what should I focus on?" for i in range(10)]
+    start = time.time()
+    for question in questions:
+        brain.think(question, conversation=brain.new_conversation("bench"))
+    print(f"\n{len(questions)} think() calls in {time.time() - start:.2f}s")
+
+    start = time.time()
+    first = None
+    for chunk in brain.think_stream("Stream a reply", conversation=brain.new_conversation("bench")):
+        first = first or time.time() - start
+    print(f"Stream: first chunk {first:.2f}s, done {time.time() - start:.2f}s")
+
+    start = time.time()
+    brain.trinity_mode("What is courage?", conversation=brain.new_conversation("bench"))
+    print(f"Trinity in {time.time() - start:.2f}s")
+
+    print(json.dumps(brain.get_provider_status(), indent=2))
+    # Imported by name: under -m this module is __main__, not core.mock_llm
+    print(json.dumps(mock_llm.get_mock_server().get_stats()))
+    brain.close()
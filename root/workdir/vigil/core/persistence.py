@@ -0,0 +1,117 @@
+"""
+VIGIL - Write-Behind Persistence
+Coalesces dirty state and flushes it to disk off the voice thread
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from config.settings import BOT_NAME
+
+
+class WriteBehindPersister:
+    """
+    Background writer for state that must reach disk but not block callers.
+
+    Two kinds of pending work are supported:
+    - Snapshots (mark_dirty): only the latest writer per key runs, so ten
+      profile edits between flushes cost one write.
+    - Appends (append): records are batched per key and handed to the
+      writer as one list, so a flush is one file open or one transaction.
+
+    Work is flushed every `flush_interval` seconds, as soon as
+    `max_pending` items are waiting, or on flush()/stop().
+    """
+
+    def __init__(self, flush_interval: float = 2.0, max_pending: int = 64, name: str = "WriteBehind"):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._snapshots: Dict[Hashable, Callable[[], None]] = {}
+        self._appends: Dict[Hashable, Tuple[Callable[[List[Any]], None], List[Any]]] = {}
+        self._pending = 0
+
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background flush thread."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._flush_loop,
+            daemon=True,
+            name=self.name,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the flush thread, writing out anything still pending."""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.flush()
+
+    def mark_dirty(self, key: Hashable, writer: Callable[[], None]):
+        """Schedule a snapshot write; repeated calls for a key coalesce."""
+        with self._lock:
+            if key not in self._snapshots:
+                self._pending += 1
+            self._snapshots[key] = writer
+            full = self._pending >= self.max_pending
+        if full:
+            self._wake_event.set()
+
+    def append(self, key: Hashable, record: Any, writer: Callable[[List[Any]], None]):
+        """Queue a record; all records for a key are written in one batch."""
+        with self._lock:
+            if key in self._appends:
+                self._appends[key][1].append(record)
+            else:
+                self._appends[key] = (writer, [record])
+            self._pending += 1
+            full = self._pending >= self.max_pending
+        if full:
+            self._wake_event.set()
+
+    def has_pending(self) -> bool:
+        """Check whether any writes are waiting."""
+        with self._lock:
+            return self._pending > 0
+
+    def flush(self):
+        """Write out all pending work on the calling thread."""
+        # Serialize flushes so batches for the same key stay in order
+        with self._flush_lock:
+            with self._lock:
+                appends, self._appends = self._appends, {}
+                snapshots, self._snapshots = self._snapshots, {}
+                self._pending = 0
+
+            for writer, records in appends.values():
+                try:
+                    writer(records)
+                except Exception as e:
+                    print(f"[{BOT_NAME}] Write-behind error: {e}")
+
+            for writer in snapshots.values():
+                try:
+                    writer()
+                except Exception as e:
+                    print(f"[{BOT_NAME}] Write-behind error: {e}")
+
+    def _flush_loop(self):
+        """Background loop that flushes on a timer or when woken."""
+        while not self._stop_event.is_set():
+            self._wake_event.wait(self.flush_interval)
+            self._wake_event.clear()
+            if self.has_pending():
+                self.flush()
@@ -0,0 +1,219 @@
+"""
+VIGIL - Response Cache
+Memoizes deterministic Brain answers in memory and on disk
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import BOT_NAME, LLMConfig, MemoryConfig, Paths
+from core.persistence import WriteBehindPersister
+
+
+# Prompts that lean on the conversation so far ("why is that?", "tell me
+# more") or on the moment ("what time is it") can't be answered from cache
+CONTEXT_DEPENDENT = re.compile(
+    r"\b(it|its|that|this|those|these|them|they|he|she|him|her|his|their|"
+    r"again|more|else|also|instead|why|previous|earlier|above|last|"
+    r"now|today|tonight|tomorrow|yesterday|time|date|current|latest|remember)\b"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL,
+    text TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    tokens_used INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses(expires_at);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, whitespace and trailing punctuation so rephrasings of
+    the same words share a cache entry."""
+    return " ".join(prompt.lower().split()).strip(" .?!")
+
+
+def make_key(prompt: str, context: str, model: str, temperature: float) -> str:
+    """Cache key from the normalized prompt, context hash, model and temperature."""
+    context_hash = hashlib.sha256((context or "").encode("utf-8")).hexdigest()
+    raw = "\x1f".join([normalize_prompt(prompt), context_hash, model, f"{temperature:.2f}"])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier LRU cache of LLM responses with a time-to-live.
+
+    The memory tier is an OrderedDict, so a hit is a dict lookup. Misses
+    fall through to a SQLite file that survives restarts; disk writes go
+    through a write-behind persister so storing never blocks the caller.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_entries: int = None,
+        ttl_seconds: float = None,
+    ):
+        self.max_entries = max_entries or LLMConfig.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or LLMConfig.RESPONSE_CACHE_TTL_SECONDS
+        self.db_path = db_path or (Paths.REFLECTION / "memory" / "response_cache.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # key -> (expires_at, response fields)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+
+        self.persister = WriteBehindPersister(
+            flush_interval=MemoryConfig.FLUSH_INTERVAL_SECONDS,
+            max_pending=MemoryConfig.FLUSH_MAX_PENDING,
+            name="ResponseCacheWriter",
+        )
+        self.persister.start()
+
+    @staticmethod
+    def should_cache(prompt: str, temperature: float, has_history: bool) -> bool:
+        """
+        Check whether a prompt's answer can be served from cache.
+
+        Creative temperatures are expected to vary, and a prompt that
+        refers back to the conversation means something different each
+        time it is asked.
+        """
+        if temperature > LLMConfig.RESPONSE_CACHE_MAX_TEMPERATURE:
+            return False
+        if has_history and CONTEXT_DEPENDENT.search(prompt.lower()):
+            return False
+        return True
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response; returns its fields or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                expires_at, data = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return data
+                del self._entries[key]
+
+        data = self._load(key, now)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, data["expires_at"], data)
+        return data
+
+    def put(self, key: str, text: str, provider: str, model: str, tokens_used: int = 0):
+        """Store a response in memory and (write-behind) on disk."""
+        expires_at = time.time() + self.ttl_seconds
+        data = {
+            "text": text,
+            "provider": provider,
+            "model": model,
+            "tokens_used": tokens_used,
+            "expires_at": expires_at,
+        }
+        with self._lock:
+            self._remember(key, expires_at, data)
+        self.persister.append("responses", (key, data), self._write_rows)
+
+    def _remember(self, key: str, expires_at: float, data: Dict[str, Any]):
+        """Insert into the memory tier, evicting least recently used (caller holds the lock)."""
+        self._entries[key] = (expires_at, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Read an unexpired entry from the disk tier."""
+        try:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT expires_at, text, provider, model, tokens_used "
+                    "FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+        except Exception as e:
+            print(f"[{BOT_NAME}] Response cache read error: {e}")
+            return None
+        if not row:
+            return None
+        expires_at, text, provider, model, tokens_used = row
+        return {
+            "text": text,
+            "provider": provider,
+            "model": model,
+            "tokens_used": tokens_used,
+            "expires_at": expires_at,
+        }
+
+    def _write_rows(self, rows: List[Tuple[str, Dict[str, Any]]]):
+        """Write a batch of entries to disk in one transaction."""
+        with self._db_lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, expires_at, text, provider, model, tokens_used) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (key, d["expires_at"], d["text"], d["provider"], d["model"], d["tokens_used"])
+                        for key, d in rows
+                    ],
+                )
+                # Keep the disk tier bounded too
+                self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key NOT IN "
+                    "(SELECT key FROM responses ORDER BY expires_at DESC LIMIT ?)",
+                    (LLMConfig.RESPONSE_CACHE_MAX_DISK_ENTRIES,),
+                )
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+        self.persister.flush()
+        with self._db_lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM responses")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counts and size of the memory tier."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+    def close(self):
+        """Flush pending writes and close the database."""
+        self.persister.stop()
+        with self._db_lock:
+            self._conn.close()
@@ -0,0 +1,356 @@
+"""
+VIGIL - Provider Router
+Latency-aware provider ordering, hedged requests, circuit breakers and
+interactive-first scheduling
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from config.settings import BOT_NAME, LLMConfig
+
+
+def _label(provider: Hashable) -> str:
+    """Readable provider name (enum value or str)."""
+    return str(getattr(provider, "value", provider))
+
+
+class ProviderStats:
+    """Rolling latency and error rate over a provider's most recent calls."""
+
+    def __init__(self, window: int):
+        # (latency seconds, succeeded)
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        """Add one call's outcome."""
+        with self._lock:
+            self._samples.append((latency, ok))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile (0-100) of successful calls, or None without data."""
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self._samples if ok)
+        if not latencies:
+            return None
+        rank = min(len(latencies) - 1, max(0, round(pct / 100 * (len(latencies) - 1))))
+        return latencies[rank]
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of recent calls that failed."""
+        with self._lock:
+            if not self._samples:
+                return 0.0
+            return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary for status displays."""
+        return {
+            "calls": len(self),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "error_rate": round(self.error_rate, 3),
+        }
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider that keeps failing.
+
+    Closed: calls pass; `failure_threshold` consecutive failures trip it.
+    Open: calls are refused until `cooldown` seconds have passed.
+    Half-open: one probe call is let through; success closes the
+    breaker, failure re-opens it for another cooldown.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = None, cooldown: float = None):
+        self.failure_threshold = failure_threshold or LLMConfig.BREAKER_FAILURE_THRESHOLD
+        self.cooldown = cooldown or LLMConfig.BREAKER_COOLDOWN_SECONDS
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Check whether a call would be allowed, without claiming the probe."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return time.time() - self.opened_at >= self.cooldown
+            return False
+
+    def allow(self) -> bool:
+        """Claim permission for a call; in half-open only the probe gets it."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record(self, ok: bool):
+        """Report the outcome of an allowed call."""
+        with self._lock:
+            if ok:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+                self.trips += 1
+
+    def abandon(self):
+        """Give up an allowed call without an outcome (e.g. it was cancelled)."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                # Cooldown already elapsed, so the next call can probe
+                self.state = self.OPEN
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary for status displays."""
+        with self._lock:
+            retry_in = 0.0
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.cooldown - (time.time() - self.opened_at))
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "trips": self.trips,
+                "retry_in": round(retry_in, 1),
+            }
+
+
+class ProviderRouter:
+    """
+    Orders providers by observed health and hedges slow requests.
+
+    Every call is timed and recorded per provider. When a request has
+    not answered by its provider's hedge percentile (p95 by default), the
+    next provider is started alongside it and whichever answers first is
+    used, so one degraded provider can't stall the caller for a full
+    client timeout.
+    """
+
+    def __init__(
+        self,
+        window: int = None,
+        hedge_percentile: float = None,
+        min_samples: int = None,
+        default_hedge_delay: float = None,
+    ):
+        self.window = window or LLMConfig.ROUTER_WINDOW
+        self.hedge_percentile = hedge_percentile or LLMConfig.HEDGE_PERCENTILE
+        self.min_samples = min_samples or LLMConfig.HEDGE_MIN_SAMPLES
+        self.default_hedge_delay = default_hedge_delay or LLMConfig.HEDGE_DEFAULT_DELAY_SECONDS
+
+        self._stats: Dict[Hashable, ProviderStats] = {}
+        self._breakers: Dict[Hashable, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def stats(self, provider: Hashable) -> ProviderStats:
+        """Get (creating if needed) a provider's stats."""
+        with self._lock:
+            if provider not in self._stats:
+                self._stats[provider] = ProviderStats(self.window)
+            return self._stats[provider]
+
+    def breaker(self, provider: Hashable) -> CircuitBreaker:
+        """Get (creating if needed) a provider's circuit breaker."""
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker()
+            return self._breakers[provider]
+
+    def record(self, provider: Hashable, latency: float, ok: bool):
+        """Record one call's outcome for a provider."""
+        self.stats(provider).record(latency, ok)
+
+    def rank(self, providers: Sequence[Hashable]) -> List[Hashable]:
+        """
+        Order providers best first, leaving out those with an open breaker.
+
+        Providers failing more than LLMConfig.ROUTER_DEMOTE_ERROR_RATE
+        of their calls go last. The rest keep the given order until every
+        one has enough samples to compare, then sort by median latency.
+        """
+        providers = [p for p in providers if self.breaker(p).available()]
+        compare_latency = all(len(self.stats(p)) >= self.min_samples for p in providers)
+
+        def key(provider):
+            stats = self.stats(provider)
+            demoted = stats.error_rate > LLMConfig.ROUTER_DEMOTE_ERROR_RATE
+            latency = (stats.percentile(50) or 0.0) if compare_latency else 0.0
+            return (demoted, latency)
+
+        return sorted(providers, key=key)
+
+    def hedge_delay(self, provider: Hashable) -> float:
+        """Seconds to wait on a provider before hedging with the next one."""
+        stats = self.stats(provider)
+        if len(stats) < self.min_samples:
+            return self.default_hedge_delay
+        delay = stats.percentile(self.hedge_percentile)
+        if delay is None:
+            return self.default_hedge_delay
+        return max(LLMConfig.HEDGE_MIN_DELAY_SECONDS, delay)
+
+    def _timed(self, provider: Hashable, call: Callable[[], Any]) -> Any:
+        """Run a call and record its latency; exceptions count as failures."""
+        start = time.time()
+        result = None
+        try:
+            result = call()
+        except Exception as e:
+            print(f"[{BOT_NAME}] Router: {_label(provider)} error: {e}")
+        self.record(provider, time.time() - start, result is not None)
+        return result
+
+    def run(self, calls: Sequence[Tuple[Hashable, Callable[[], Any]]]) -> Optional[Tuple[Hashable, Any]]:
+        """
+        Run calls in order with hedging until one returns a result.
+
+        A call that returns None or raises counts as failed, and the next
+        call starts straight away. A call still running after its hedge
+        delay gets the next call started beside it.
+
+        Args:
+            calls: (provider, zero-argument callable) pairs, best first
+
+        Returns:
+            (provider, result) from the first call to succeed, or None
+        """
+        waiting = list(calls)
+        if not waiting:
+            return None
+
+        executor = ThreadPoolExecutor(max_workers=len(waiting), thread_name_prefix="Router")
+        running = {}
+
+        def launch() -> Hashable:
+            provider, call = waiting.pop(0)
+            running[executor.submit(self._timed, provider, call)] = provider
+            return provider
+
+        try:
+            latest = launch()
+            while running:
+                delay = self.hedge_delay(latest) if waiting else None
+                done, _ = wait(running, timeout=delay, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    print(f"[{BOT_NAME}] {_label(latest)} slower than {delay:.1f}s, hedging with {_label(waiting[0][0])}")
+                    latest = launch()
+                    continue
+
+                for future in done:
+                    provider = running.pop(future)
+                    result = future.result()
+                    if result is not None:
+                        return provider, result
+
+                # Something failed - move on to the next provider now
+                if waiting:
+                    latest = launch()
+
+            return None
+
+        finally:
+            # Losing calls finish in the background and still record stats
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider latency, error and breaker summary."""
+        with self._lock:
+            providers = list(dict.fromkeys([*self._stats, *self._breakers]))
+        return {
+            _label(p): {**self.stats(p).to_dict(), "breaker": self.breaker(p).to_dict()}
+            for p in providers
+        }
+
+
+class PriorityGate:
+    """
+    Tracks interactive LLM calls so background work can stay out of their way.
+
+    Interactive callers wrap provider calls in interactive(); background
+    workers call wait_quiet() before each request, which returns once no
+    interactive call is running and none has finished for a short while.
+    Calls made inside background() on the same thread don't count as
+    interactive.
+    """
+
+    def __init__(self):
+        self._active = 0
+        self._last_end = 0.0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    @contextmanager
+    def interactive(self):
+        """Mark an interactive call for its duration."""
+        if getattr(self._local, "background", False):
+            yield
+            return
+        with self._cond:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._last_end = time.time()
+                self._cond.notify_all()
+
+    @contextmanager
+    def background(self):
+        """Run calls on this thread without counting them as interactive."""
+        self._local.background = True
+        try:
+            yield
+        finally:
+            self._local.background = False
+
+    @property
+    def active(self) -> int:
+        """Interactive calls running now."""
+        with self._cond:
+            return self._active
+
+    def wait_quiet(self, quiet_seconds: float = None, stop_event: threading.Event = None) -> bool:
+        """
+        Block until interactive traffic has been idle for `quiet_seconds`.
+
+        Returns False if `stop_event` was set while waiting.
+        """
+        quiet_seconds = LLMConfig.BATCH_IDLE_SECONDS if quiet_seconds is None else quiet_seconds
+        with self._cond:
+            while not (stop_event and stop_event.is_set()):
+                if self._active:
+                    self._cond.wait(0.5)
+                    continue
+                remaining = self._last_end + quiet_seconds - time.time()
+                if remaining <= 0:
+                    return True
+                # Wake up regularly so a stop request isn't left waiting
+                self._cond.wait(min(remaining, 0.5))
+            return False
@@ -0,0 +1,166 @@
+"""
+VIGIL - Search Index
+Incremental inverted index with BM25 ranking
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Words too common to say anything about relevance
+STOPWORDS = frozenset("""
+a about an and are as at be been but by can could did do does for from had has
+have he her him his how i if in into is it its just me my no not of on or our
+she so than that the their them then there these they this to too us was we
+were what when where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase index terms, dropping stopwords."""
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """
+    Inverted index over text documents, ranked with Okapi BM25.
+
+    Documents are added, replaced and removed one at a time, so the index
+    can follow its source incrementally instead of being rebuilt. Each
+    document can carry a small metadata value used for filtering results.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        # doc_id -> document length in terms
+        self.doc_lengths: Dict[str, int] = {}
+        # doc_id -> caller metadata (e.g. timestamp)
+        self.doc_meta: Dict[str, Any] = {}
+        # term -> {doc_id: term frequency}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_lengths
+
+    def add(self, doc_id: str, text: str, meta: Any = None):
+        """Index a document, replacing any previous version with the same ID."""
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+
+        self.doc_lengths[doc_id] = length
+        self.doc_meta[doc_id] = meta
+        self.total_length += length
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: str, text: str = None):
+        """
+        Remove a document from the index.
+
+        Passing the document's text limits the cleanup to its own terms;
+        otherwise every posting list is checked.
+        """
+        if doc_id not in self.doc_lengths:
+            return
+
+        terms = set(tokenize(text)) if text is not None else list(self.postings)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting and doc_id in posting:
+                del posting[doc_id]
+                if not posting:
+                    del self.postings[term]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self.doc_meta.pop(doc_id, None)
+
+    def score(self, query: str, doc_filter: Optional[Callable[[str, Any], bool]] = None) -> Dict[str, float]:
+        """Score every document matching at least one query term."""
+        if not self.doc_lengths:
+            return {}
+
+        n_docs = len(self.doc_lengths)
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                if doc_filter and not doc_filter(doc_id, self.doc_meta.get(doc_id)):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return scores
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        doc_filter: Optional[Callable[[str, Any], bool]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the best matching documents.
+
+        Args:
+            query: Free text query
+            k: Maximum number of results
+            doc_filter: Optional predicate on (doc_id, meta)
+
+        Returns:
+            List of (doc_id, score), best first
+        """
+        scores = self.score(query, doc_filter)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to JSON-compatible data."""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "docs": {
+                doc_id: [length, self.doc_meta.get(doc_id)]
+                for doc_id, length in self.doc_lengths.items()
+            },
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BM25Index':
+        """Rebuild an index from to_dict() output."""
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        for doc_id, (length, meta) in data.get("docs", {}).items():
+            index.doc_lengths[doc_id] = length
+            index.doc_meta[doc_id] = meta
+            index.total_length += length
+        index.postings = data.get("postings", {})
+        return index
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, str, Any]], **kwargs) -> 'BM25Index':
+        """Build an index from (doc_id, text, meta) tuples."""
+        index = cls(**kwargs)
+        for doc_id, text, meta in documents:
+            index.add(doc_id, text, meta)
+        return index
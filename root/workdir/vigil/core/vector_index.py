@@ -0,0 +1,468 @@
+"""
+VIGIL - Vector Index
+Local embeddings and cosine top-k search over a memory-mapped matrix
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.settings import BOT_NAME, KnowledgeConfig, Paths
+from core.search_index import tokenize
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+def vector_search_available() -> bool:
+    """Whether semantic retrieval can run in this environment."""
+    return NUMPY_AVAILABLE and KnowledgeConfig.VECTOR_SEARCH_ENABLED
+
+
+def content_hash(text: str) -> str:
+    """Fingerprint of an entry's text, used to skip re-embedding unchanged entries."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class Embedder:
+    """
+    Turns text into unit-length float32 vectors on the CPU.
+
+    Uses a sentence-transformers model when the package is installed.
+    Otherwise falls back to hashed word and character-trigram features,
+    which still match inflections and shared word parts but not true
+    paraphrases. Recent query embeddings are cached, since the same
+    command is looked up in several stores.
+    """
+
+    QUERY_CACHE_SIZE = 256
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or KnowledgeConfig.EMBEDDING_MODEL
+        self._model = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def _load(self):
+        """Load the embedding model on first use."""
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name, device="cpu")
+                print(f"[{BOT_NAME}] Embedding model loaded: {self.model_name}")
+            except ImportError:
+                print(f"[{BOT_NAME}] sentence-transformers not installed. Using hashed embeddings.")
+            except Exception as e:
+                print(f"[{BOT_NAME}] Embedding model error: {e}. Using hashed embeddings.")
+            self._loaded = True
+
+    @property
+    def name(self) -> str:
+        """Identifies the embedding space; vectors from different names don't mix."""
+        self._load()
+        if self._model is not None:
+            return self.model_name
+        return f"hashing-{KnowledgeConfig.HASH_EMBEDDING_DIM}"
+
+    @property
+    def dim(self) -> int:
+        self._load()
+        if self._model is not None:
+            return self._model.get_sentence_embedding_dimension()
+        return KnowledgeConfig.HASH_EMBEDDING_DIM
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        """Embed texts as rows of a normalized (len(texts), dim) float32 matrix."""
+        self._load()
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if self._model is not None:
+            vectors = self._model.encode(
+                texts,
+                batch_size=KnowledgeConfig.EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+            return vectors.astype(np.float32, copy=False)
+        return np.stack([self._hash_embed(text) for text in texts])
+
+    def embed_query(self, text: str) -> "np.ndarray":
+        """Embed one query, reusing recent results."""
+        with self._lock:
+            cached = self._query_cache.get(text)
+            if cached is not None:
+                self._query_cache.move_to_end(text)
+                return cached
+
+        vector = self.embed([text])[0]
+        with self._lock:
+            self._query_cache[text] = vector
+            while len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def _hash_embed(self, text: str) -> "np.ndarray":
+        """Signed feature hashing of words and their character trigrams."""
+        dim = KnowledgeConfig.HASH_EMBEDDING_DIM
+        vector = np.zeros(dim, dtype=np.float32)
+        for word in tokenize(text):
+            padded = f"<{word}>"
+            features = [word] + [padded[i:i + 3] for i in range(len(padded) - 2)]
+            for j, feature in enumerate(features):
+                h = zlib.crc32(feature.encode("utf-8"))
+                # Whole words weigh as much as all of their trigrams together
+                weight = 1.0 if j == 0 else 1.0 / (len(features) - 1)
+                vector[h % dim] += weight if h & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+_embedder: Optional[Embedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    """Get the process-wide embedder, so the model is loaded once."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            _embedder = Embedder()
+        return _embedder
+
+
+# Indexes over fixed sets of texts, by name (False where unavailable)
+_text_indexes: Dict[str, "VectorIndex"] = {}
+_text_indexes_lock = threading.Lock()
+
+
+class VectorIndex:
+    """
+    Embeddings for a set of keyed texts, searched by cosine similarity.
+
+    Vectors live in `<name>.f32`, a raw float32 matrix that is memory-mapped
+    rather than read into memory, next to `<name>.json` which maps rows to
+    IDs and records a hash of each row's text. An entry is embedded only
+    when it is new or its text has changed. Updates overwrite their row in
+    place, additions append rows and removals leave a dead row until
+    enough accumulate to compact the file.
+
+    Search multiplies the whole matrix by the query vector in one batch.
+    Past KnowledgeConfig.VECTOR_IVF_MIN_ROWS an inverted-file index (rows
+    clustered around k-means centroids) narrows the search to the clusters
+    nearest the query.
+    """
+
+    def __init__(self, name: str, index_dir: Path, embedder: Optional[Embedder] = None):
+        self.name = name
+        self.index_dir = index_dir
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.matrix_file = index_dir / f"{name}.f32"
+        self.manifest_file = index_dir / f"{name}.json"
+        self.embedder = embedder or get_embedder()
+
+        self._lock = threading.RLock()
+        # Row -> ID (None for a removed row), ID -> row, ID -> text hash
+        self.ids: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.hashes: Dict[str, str] = {}
+        self._matrix = None
+        self._live = None  # Bool mask of rows that hold an entry
+        self._ivf = None  # (centroids, [row indices per cluster], rows covered)
+        self._ivf_changes = 0
+
+        self._load()
+
+    @classmethod
+    def for_texts(cls, name: str, texts: Dict[str, str]) -> Optional["VectorIndex"]:
+        """
+        Get the process-wide index for a fixed set of texts, such as the
+        Codex chapters, syncing it with `texts` the first time it is asked for.
+
+        Returns:
+            The index, or None when vector search is unavailable
+        """
+        with _text_indexes_lock:
+            if name not in _text_indexes:
+                _text_indexes[name] = False
+                if vector_search_available():
+                    try:
+                        index = cls(name, Paths.KNOWLEDGE / "vectors")
+                        index.sync(texts)
+                        _text_indexes[name] = index
+                    except Exception as e:
+                        print(f"[{BOT_NAME}] Vector index '{name}' unavailable: {e}")
+            return _text_indexes[name] or None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def _load(self):
+        """Map the stored matrix, discarding it if it came from another model."""
+        if not self.manifest_file.exists() or not self.matrix_file.exists():
+            return
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("embedder") != self.embedder.name or manifest.get("dim") != self.embedder.dim:
+                print(f"[{BOT_NAME}] Vector index '{self.name}' is from another embedding model; rebuilding.")
+                return
+
+            # A crash between appending rows and saving the manifest can
+            # leave extra rows; they are ignored and overwritten later
+            self.ids = manifest.get("ids", [])
+            self.hashes = manifest.get("hashes", {})
+            self.rows = {key: row for row, key in enumerate(self.ids) if key is not None}
+            self._map(len(self.ids))
+        except Exception as e:
+            print(f"[{BOT_NAME}] Error loading vector index '{self.name}': {e}")
+            self.ids, self.rows, self.hashes = [], {}, {}
+            self._matrix = None
+
+    def _map(self, n_rows: int):
+        """(Re)map the first n_rows of the matrix file."""
+        self._matrix = None
+        self._ivf = None
+        if n_rows:
+            self._matrix = np.memmap(self.matrix_file, dtype=np.float32, mode='r', shape=(n_rows, self.embedder.dim))
+        self._live = np.array([key is not None for key in self.ids], dtype=bool)
+
+    def _save_manifest(self):
+        """Write the row map atomically."""
+        manifest = {
+            "embedder": self.embedder.name,
+            "dim": self.embedder.dim,
+            "ids": self.ids,
+            "hashes": self.hashes,
+        }
+        tmp_path = self.manifest_file.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_file)
+
+    def _compact(self):
+        """Rewrite the matrix without dead rows."""
+        live_rows = [row for row, key in enumerate(self.ids) if key is not None]
+        vectors = np.array(self._matrix[live_rows]) if live_rows else None
+        self._matrix = None  # Release the mapping before replacing the file
+
+        tmp_path = self.matrix_file.with_suffix(".f32.tmp")
+        with open(tmp_path, 'wb') as f:
+            if vectors is not None:
+                vectors.tofile(f)
+        os.replace(tmp_path, self.matrix_file)
+
+        self.ids = [self.ids[row] for row in live_rows]
+        self.rows = {key: row for row, key in enumerate(self.ids)}
+        self._map(len(self.ids))
+
+    # -------------------------------------------------------------------------
+    # Updates
+    # -------------------------------------------------------------------------
+
+    def upsert_many(self, items: Dict[str, str]) -> int:
+        """
+        Embed new or changed texts and store their vectors.
+
+        Returns:
+            Number of texts that were (re-)embedded
+        """
+        with self._lock:
+            changed = {}
+            for key, text in items.items():
+                digest = content_hash(text)
+                if self.hashes.get(key) != digest:
+                    changed[key] = (text, digest)
+            if not changed:
+                return 0
+
+            keys = list(changed)
+            vectors = self.embedder.embed([changed[key][0] for key in keys])
+
+            # The file may hold rows past the manifest from an interrupted write
+            with open(self.matrix_file, 'ab') as f:
+                f.truncate(len(self.ids) * self.embedder.dim * 4)
+
+            appended = []
+            with open(self.matrix_file, 'r+b') as f:
+                for key, vector in zip(keys, vectors):
+                    row = self.rows.get(key)
+                    if row is None:
+                        appended.append((key, vector))
+                        continue
+                    f.seek(row * self.embedder.dim * 4)
+                    f.write(vector.tobytes())
+                    self._ivf_changes += 1
+                f.seek(0, os.SEEK_END)
+                for key, vector in appended:
+                    f.write(vector.tobytes())
+                    self.rows[key] = len(self.ids)
+                    self.ids.append(key)
+
+            for key in keys:
+                self.hashes[key] = changed[key][1]
+            self._save_manifest()
+            self._remap_after_write()
+            return len(keys)
+
+    def upsert(self, key: str, text: str) -> bool:
+        """Embed one text if it is new or changed. Returns True if it was embedded."""
+        return self.upsert_many({key: text}) > 0
+
+    def remove(self, key: str):
+        """Drop a key's vector."""
+        with self._lock:
+            row = self.rows.pop(key, None)
+            if row is None:
+                return
+            self.ids[row] = None
+            self.hashes.pop(key, None)
+            self._live[row] = False
+
+            dead = len(self.ids) - len(self.rows)
+            if dead > max(64, len(self.ids) // 4):
+                self._compact()
+            self._save_manifest()
+
+    def sync(self, items: Dict[str, str]) -> int:
+        """
+        Make the index hold exactly these texts, embedding only what changed.
+
+        Returns:
+            Number of texts that were (re-)embedded
+        """
+        with self._lock:
+            for key in [key for key in self.rows if key not in items]:
+                self.remove(key)
+            embedded = self.upsert_many(items)
+            if embedded:
+                print(f"[{BOT_NAME}] Embedded {embedded} entries for '{self.name}'.")
+            return embedded
+
+    def _remap_after_write(self):
+        """Map newly appended rows, keeping the IVF index unless it has gone stale."""
+        ivf = self._ivf
+        self._map(len(self.ids))
+        if ivf and self._ivf_changes <= ivf[2] // 10:
+            self._ivf = ivf
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def search(self, query: str, k: int = 5, min_similarity: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Find the texts closest in meaning to a query.
+
+        Args:
+            query: Free text query
+            k: Maximum number of results
+            min_similarity: Drop results below this cosine similarity
+
+        Returns:
+            List of (key, similarity), most similar first
+        """
+        with self._lock:
+            if self._matrix is None or not self.rows:
+                return []
+            vector = self.embedder.embed_query(query)
+            rows = self._candidate_rows(vector)
+
+            matrix = self._matrix if rows is None else self._matrix[rows]
+            scores = matrix @ vector
+            live = self._live if rows is None else self._live[rows]
+            scores = np.where(live, scores, -np.inf)
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            results = []
+            for i in top:
+                score = float(scores[i])
+                if score == -np.inf or (min_similarity is not None and score < min_similarity):
+                    break
+                row = int(i) if rows is None else int(rows[i])
+                results.append((self.ids[row], score))
+            return results
+
+    def _candidate_rows(self, vector: "np.ndarray") -> Optional["np.ndarray"]:
+        """Rows worth scoring for a query, or None to score them all."""
+        if len(self.ids) < KnowledgeConfig.VECTOR_IVF_MIN_ROWS:
+            return None
+        if self._ivf is None:
+            self._build_ivf()
+
+        centroids, lists, covered = self._ivf
+        probes = min(KnowledgeConfig.VECTOR_IVF_PROBES, len(lists))
+        nearest = np.argpartition(-(centroids @ vector), probes - 1)[:probes]
+        # Rows appended since the IVF was built are always scored
+        tail = np.arange(covered, len(self.ids))
+        return np.concatenate([lists[c] for c in nearest] + [tail])
+
+    def _build_ivf(self, iterations: int = 8, sample_size: int = 20000):
+        """Cluster the rows with spherical k-means."""
+        n_rows = len(self.ids)
+        n_lists = max(1, int(np.sqrt(n_rows)))
+        rng = np.random.default_rng(0)
+
+        sample = np.sort(rng.choice(n_rows, size=min(sample_size, n_rows), replace=False))
+        points = np.array(self._matrix[sample])
+        centroids = points[rng.choice(len(points), size=n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(points @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = points[assignment == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        assignment = np.empty(n_rows, dtype=np.int64)
+        for start in range(0, n_rows, 8192):
+            block = self._matrix[start:start + 8192]
+            assignment[start:start + 8192] = np.argmax(block @ centroids.T, axis=1)
+        lists = [np.flatnonzero(assignment == c) for c in range(n_lists)]
+
+        self._ivf = (centroids, lists, n_rows)
+        self._ivf_changes = 0
+        print(f"[{BOT_NAME}] Built IVF index for '{self.name}' ({n_lists} clusters over {n_rows} rows).")
+
+
+if __name__ == "__main__":
+    # Semantic lookup over a few sample texts
+    import tempfile
+    import time
+
+    if not vector_search_available():
+        print(f"[{BOT_NAME}] NumPy is not installed; vector search is unavailable.")
+    else:
+        index = VectorIndex("demo", Path(tempfile.mkdtemp()))
+        index.sync({
+            "sleep": "Getting enough rest and sleeping well at night",
+            "money": "Budgeting, saving money and paying off debt",
+            "code": "Writing Python programs and fixing software bugs",
+        })
+        for query in ["I keep waking up tired", "my savings plan", "the program crashes"]:
+            start = time.perf_counter()
+            results = index.search(query, k=1)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"'{query}' -> {results} ({elapsed:.2f} ms)")
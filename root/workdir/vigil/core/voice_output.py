@@ -4,14 +4,75 @@ Premium voice using ElevenLabs with Windows SAPI fallback
 """
 
 import io
+import queue
+import re
 import tempfile
 import threading
-from typing import Optional
+from typing import Iterable, List, Optional
 from pathlib import Path
 
 from config.settings import ELEVENLABS_API_KEY, VoiceConfig, BOT_NAME
 
 
+class SentenceSegmenter:
+    """
+    Splits streamed text into complete sentences.
+
+    Text is fed in arbitrary chunks (as an LLM produces it) and each
+    sentence is released as soon as its terminating punctuation and the
+    following whitespace arrive, so speech can start before the full
+    response exists.
+    """
+
+    # Sentence end: terminal punctuation (plus closing quotes/brackets)
+    # followed by whitespace, or a line break
+    BOUNDARY = re.compile(r'[.!?…]+["\')\]]*\s+|\n+')
+
+    # Words whose trailing period doesn't end a sentence
+    ABBREVIATIONS = frozenset({
+        "mr", "mrs", "ms", "dr", "st", "sr", "jr", "vs", "etc", "e.g", "i.e", "approx",
+    })
+
+    def __init__(self, min_chars: int = None):
+        self.min_chars = min_chars if min_chars is not None else VoiceConfig.STREAM_MIN_SENTENCE_CHARS
+        self._buffer = ""
+        self._held = ""
+
+    def _is_abbreviation(self, text: str) -> bool:
+        """Check whether text ends with an abbreviation's period."""
+        if not text.endswith("."):
+            return False
+        words = text[:-1].split()
+        return bool(words) and words[-1].lower().lstrip("(\"'") in self.ABBREVIATIONS
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns any sentences it completed."""
+        self._buffer += text
+        sentences = []
+        start = 0
+
+        for match in self.BOUNDARY.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if self._is_abbreviation(candidate):
+                continue
+            start = match.end()
+
+            self._held = f"{self._held} {candidate}".strip() if self._held else candidate
+            if len(self._held) >= self.min_chars:
+                sentences.append(self._held)
+                self._held = ""
+
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text is left once the stream has ended."""
+        rest = f"{self._held} {self._buffer.strip()}".strip()
+        self._buffer = ""
+        self._held = ""
+        return rest or None
+
+
 class VoiceOutput:
     """
     Handles text-to-speech conversion.
@@ -67,39 +128,40 @@ class VoiceOutput:
             return False
 
         try:
-            from elevenlabs import play, Voice, VoiceSettings
-
-            # Generate audio
-            audio = self.elevenlabs_client.text_to_speech.convert(
-                text=text,
-                voice_id=VoiceConfig.ELEVENLABS_VOICE_ID,
-                model_id=VoiceConfig.ELEVENLABS_MODEL,
-            )
-
-            # Play the audio
-            # Convert generator to bytes if needed
-            if hasattr(audio, '__iter__') and not isinstance(audio, bytes):
-                audio_bytes = b''.join(audio)
-            else:
-                audio_bytes = audio
-
-            # Save to temp file and play
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp_file:
-                tmp_file.write(audio_bytes)
-                tmp_path = tmp_file.name
-
-            # Play using pygame or fallback
-            self._play_audio_file(tmp_path)
-
-            # Cleanup
-            Path(tmp_path).unlink(missing_ok=True)
-
+            self._play_audio_bytes(self._synthesize_elevenlabs(text))
             return True
 
         except Exception as e:
             print(f"[{BOT_NAME}] ElevenLabs speak error: {e}")
             return False
 
+    def _synthesize_elevenlabs(self, text: str) -> bytes:
+        """Generate MP3 audio for text with ElevenLabs."""
+        audio = self.elevenlabs_client.text_to_speech.convert(
+            text=text,
+            voice_id=VoiceConfig.ELEVENLABS_VOICE_ID,
+            model_id=VoiceConfig.ELEVENLABS_MODEL,
+        )
+
+        # Convert generator to bytes if needed
+        if hasattr(audio, '__iter__') and not isinstance(audio, bytes):
+            return b''.join(audio)
+        return audio
+
+    def _play_audio_bytes(self, audio_bytes: bytes):
+        """Play MP3 audio held in memory."""
+        # Save to temp file and play
+        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp_file:
+            tmp_file.write(audio_bytes)
+            tmp_path = tmp_file.name
+
+        try:
+            # Play using pygame or fallback
+            self._play_audio_file(tmp_path)
+        finally:
+            # Cleanup
+            Path(tmp_path).unlink(missing_ok=True)
+
     def _play_audio_file(self, file_path: str):
         """Play an audio file using available player."""
         try:
@@ -167,6 +229,91 @@ class VoiceOutput:
         # Fallback to pyttsx3
         return self.speak_pyttsx3(text)
 
+    def speak_stream(self, chunks: Iterable[str], use_elevenlabs: bool = True) -> str:
+        """
+        Speak streamed text sentence by sentence while it is still arriving.
+
+        Three stages run at once: the caller's thread reads `chunks` (e.g.
+        Brain.think_stream) and cuts it into sentences, a synthesis thread
+        turns each sentence into audio, and a playback thread plays clips
+        in order. Speech starts once the first sentence is complete, and
+        the next sentence is synthesized while the current one plays.
+
+        Args:
+            chunks: Iterable of text fragments
+            use_elevenlabs: Whether to try ElevenLabs first
+
+        Returns:
+            The full text that was streamed
+        """
+        use_elevenlabs = use_elevenlabs and self.elevenlabs_available
+        segmenter = SentenceSegmenter()
+        sentences: queue.Queue = queue.Queue()
+        clips: queue.Queue = queue.Queue()
+
+        synthesizer = threading.Thread(
+            target=self._synthesize_sentences,
+            args=(sentences, clips, use_elevenlabs),
+            daemon=True,
+            name="SpeakStreamSynth",
+        )
+        player = threading.Thread(
+            target=self._play_clips,
+            args=(clips,),
+            daemon=True,
+            name="SpeakStreamPlay",
+        )
+        synthesizer.start()
+        player.start()
+
+        parts = []
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                for sentence in segmenter.feed(chunk):
+                    sentences.put(sentence)
+            rest = segmenter.flush()
+            if rest:
+                sentences.put(rest)
+        finally:
+            sentences.put(None)
+            player.join()
+
+        return "".join(parts)
+
+    def _synthesize_sentences(self, sentences: queue.Queue, clips: queue.Queue, use_elevenlabs: bool):
+        """Synthesis stage of speak_stream: sentence -> (sentence, audio)."""
+        while True:
+            sentence = sentences.get()
+            if sentence is None:
+                break
+
+            audio = None
+            if use_elevenlabs:
+                try:
+                    audio = self._synthesize_elevenlabs(sentence)
+                except Exception as e:
+                    print(f"[{BOT_NAME}] ElevenLabs speak error: {e}")
+            clips.put((sentence, audio))
+        clips.put(None)
+
+    def _play_clips(self, clips: queue.Queue):
+        """Playback stage of speak_stream; pyttsx3 covers failed syntheses."""
+        while True:
+            clip = clips.get()
+            if clip is None:
+                break
+
+            sentence, audio = clip
+            print(f"[{BOT_NAME}] Speaking: '{sentence}'")
+            if audio:
+                try:
+                    self._play_audio_bytes(audio)
+                    continue
+                except Exception as e:
+                    print(f"[{BOT_NAME}] Audio playback error: {e}")
+            self.speak_pyttsx3(sentence)
+
     def speak_async(self, text: str, use_elevenlabs: bool = True):
         """
         Speak in a background thread (non-blocking).
@@ -7,6 +7,9 @@ Core Knowledge from the Cosmic Ascension Council
 import re
 from typing import Dict, Optional
 
+from config.settings import KnowledgeConfig
+from core.vector_index import VectorIndex
+
 
 class AscensionCodex:
     """
@@ -125,9 +128,27 @@ class AscensionCodex:
         """Get all chapters."""
         return cls.CHAPTERS
 
+    @staticmethod
+    def _embedding_text(chapter: Dict) -> str:
+        """Text embedded for a chapter."""
+        return " ".join([chapter["title"], chapter["essence"], *chapter["teachings"], chapter["activation"]])
+
+    @classmethod
+    def vector_index(cls) -> Optional[VectorIndex]:
+        """Embeddings of every chapter, built once per process (None if unavailable)."""
+        texts = {key: cls._embedding_text(chapter) for key, chapter in cls.CHAPTERS.items()}
+        return VectorIndex.for_texts("codex", texts)
+
     @classmethod
     def get_relevant_chapter(cls, query_text: str) -> Dict:
         """Return the most relevant chapter based on query content."""
+        # Closest in meaning first, so paraphrases find their chapter
+        vectors = cls.vector_index()
+        if vectors is not None:
+            matches = vectors.search(query_text, k=1, min_similarity=KnowledgeConfig.VECTOR_MIN_SIMILARITY)
+            if matches:
+                return cls.CHAPTERS[matches[0][0]]
+
         query_lower = query_text.lower()
 
         for chapter_key, chapter in cls.CHAPTERS.items():
@@ -0,0 +1,165 @@
+"""
+VIGIL - Knowledge Importer
+Streaming parsers that turn documents into knowledge entry records
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+from config.settings import BOT_NAME, KnowledgeConfig
+
+
+# Suffixes import_from_directory picks up
+SUPPORTED_SUFFIXES = (".txt", ".md", ".markdown", ".jsonl", ".pdf")
+
+# Paragraphs are separated by blank lines; pdftotext also emits form feeds between pages
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n|\f")
+
+
+def _title_for(text: str) -> str:
+    """Default title: the start of the text."""
+    return text[:50] + "..." if len(text) > 50 else text
+
+
+def _record(content: str, category: str, source: str, **fields) -> Dict[str, Any]:
+    """A record with the arguments KnowledgeBase.add_entries expects."""
+    record = {
+        "title": _title_for(content),
+        "content": content,
+        "category": category,
+        "tags": [],
+        "source": source,
+        "importance": 5,
+        "metadata": {},
+    }
+    record.update({key: value for key, value in fields.items() if value is not None})
+    return record
+
+
+def _iter_chunks(path: Path) -> Iterator[str]:
+    """Read a text file a chunk at a time."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(KnowledgeConfig.IMPORT_CHUNK_CHARS)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_paragraphs(chunks: Iterable[str]) -> Iterator[str]:
+    """Split streamed text into paragraphs, carrying partial ones across chunks."""
+    buffer = ""
+    for chunk in chunks:
+        parts = PARAGRAPH_BREAK.split(buffer + chunk)
+        buffer = parts.pop()
+        for part in parts:
+            part = part.strip()
+            if part:
+                yield part
+    buffer = buffer.strip()
+    if buffer:
+        yield buffer
+
+
+def iter_text_records(path: Path, category: str) -> Iterator[Dict[str, Any]]:
+    """Plain text (including text extracted from PDFs): one entry per paragraph."""
+    for paragraph in iter_paragraphs(_iter_chunks(path)):
+        yield _record(paragraph, category, str(path))
+
+
+def iter_markdown_records(path: Path, category: str) -> Iterator[Dict[str, Any]]:
+    """Markdown: one entry per paragraph, titled by the section heading it falls under."""
+    heading = ""
+    for paragraph in iter_paragraphs(_iter_chunks(path)):
+        lines = paragraph.split("\n")
+        # A heading may share its paragraph with the text that follows it
+        while lines and lines[0].lstrip().startswith("#"):
+            heading = lines.pop(0).lstrip().lstrip("#").strip()
+        text = "\n".join(lines).strip()
+        if not text:
+            continue
+        title = f"{heading}: {_title_for(text)}" if heading else None
+        metadata = {"section": heading} if heading else None
+        yield _record(text, category, str(path), title=title, metadata=metadata)
+
+
+def iter_jsonl_records(path: Path, category: str) -> Iterator[Dict[str, Any]]:
+    """
+    JSON Lines: one entry per object.
+
+    Each object needs "content" (or "text"); "title", "category", "tags",
+    "source", "importance" and "metadata" are used when present. Lines
+    that aren't JSON, or whose importance isn't a number, are skipped.
+    """
+    skipped = 0
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+                content = str(data.get("content") or data.get("text") or "").strip()
+                importance = int(data.get("importance", 5))
+            except (ValueError, TypeError, AttributeError):
+                content = ""
+            if not content:
+                skipped += 1
+                continue
+            yield _record(
+                content,
+                data.get("category") or category,
+                data.get("source") or str(path),
+                title=data.get("title"),
+                tags=list(data.get("tags") or []),
+                importance=importance,
+                metadata=data.get("metadata"),
+            )
+    if skipped:
+        print(f"[{BOT_NAME}] Skipped {skipped} JSONL lines without content or a valid importance in {path.name}")
+
+
+def iter_pdf_records(path: Path, category: str) -> Iterator[Dict[str, Any]]:
+    """PDF: extract text page by page, then one entry per paragraph."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        print(f"[{BOT_NAME}] pypdf not installed. Skipping {path.name} (import its extracted text instead).")
+        return
+
+    reader = PdfReader(str(path))
+    pages = ((page.extract_text() or "") + "\n\n" for page in reader.pages)
+    for paragraph in iter_paragraphs(pages):
+        yield _record(paragraph, category, str(path))
+
+
+def iter_records(path: Path, category: str) -> Iterator[Dict[str, Any]]:
+    """Stream entry records from a file, parsed according to its suffix."""
+    suffix = path.suffix.lower()
+    if suffix in (".md", ".markdown"):
+        return iter_markdown_records(path, category)
+    if suffix == ".jsonl":
+        return iter_jsonl_records(path, category)
+    if suffix == ".pdf":
+        return iter_pdf_records(path, category)
+    return iter_text_records(path, category)
+
+
+def parse_file(path: str, category: str) -> List[Dict[str, Any]]:
+    """Parse a whole file into records (runs in worker processes)."""
+    try:
+        return list(iter_records(Path(path), category))
+    except Exception as e:
+        print(f"[{BOT_NAME}] Error parsing {path}: {e}")
+        return []
+
+
+def find_files(directory: Path, recursive: bool = True) -> List[Path]:
+    """Importable files in a directory, in a stable order."""
+    pattern = "**/*" if recursive else "*"
+    return sorted(
+        path for path in directory.glob(pattern)
+        if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES
+    )
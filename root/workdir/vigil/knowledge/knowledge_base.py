@@ -3,13 +3,25 @@ VIGIL - Custom Knowledge Base
 User-extensible knowledge storage and retrieval
 """
 
+import heapq
 import json
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any
+from dataclasses import dataclass, field
 
-from config.settings import Paths, BOT_NAME
+from config.settings import Paths, BOT_NAME, KnowledgeConfig
+from core.search_index import BM25Index
+from core.vector_index import VectorIndex, vector_search_available
+from knowledge.codex import AscensionCodex
+from knowledge.importer import find_files, iter_records, parse_file
+from knowledge.shrines import ShrineVirtues
+from knowledge.store import KnowledgeStore
 
 
 @dataclass
@@ -27,6 +39,20 @@ class KnowledgeEntry:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+# Fields whose change means an entry must be re-indexed
+INDEXED_FIELDS = ("title", "content", "tags", "category", "importance")
+
+
+def _index_text(entry: KnowledgeEntry) -> str:
+    """Text indexed for an entry; the title counts twice, as it says most about the entry."""
+    return " ".join([entry.title, entry.title, " ".join(entry.tags), entry.content])
+
+
+def _embedding_text(entry: KnowledgeEntry) -> str:
+    """Text embedded for semantic search."""
+    return f"{entry.title}. {entry.content}"
+
+
 class KnowledgeBase:
     """
     Vigil's custom knowledge base.
@@ -37,45 +63,176 @@ class KnowledgeBase:
     - Imported from files
 
     Knowledge is categorized and tagged for efficient retrieval.
+    Entries live in a KnowledgeStore (an append-only log with a manifest),
+    so startup reads only the manifest and entries are loaded on demand.
+    Text search goes through an inverted index (BM25) that is kept in step
+    with every add, update and delete. When vector search is available,
+    entries are also embedded so that query context can find entries that
+    say the same thing in other words. Both indexes, and the Codex and
+    shrine embeddings, are built by a background thread at startup, so
+    the first query doesn't pay for a full scan of the store. Embedding
+    never holds up text search: until the vector index is ready, queries
+    fall back to keyword matches alone.
     """
 
-    def __init__(self):
+    def __init__(self, background: bool = True):
         Paths.ensure_directories()
 
         self.kb_dir = Paths.KNOWLEDGE / "custom"
         self.kb_dir.mkdir(exist_ok=True)
 
+        # Entries by ID, read from the store as they are needed
+        self.store = KnowledgeStore(self.kb_dir / "store", KnowledgeEntry)
+        self.entries: KnowledgeStore = self.store
+        # Entry text, ranked by BM25; meta is the entry's importance
+        self._index: Optional[BM25Index] = None
+        # Entry embeddings for semantic search (False when unavailable)
+        self._vectors = None
+        # Held while the text index is built or changed, so entries written
+        # during the startup build are neither missed nor added twice
+        self._index_lock = threading.RLock()
+        # Held while the vector index is built. Until it is ready, embedding
+        # changes wait here (ID -> text, None for a delete); None once built
+        self._vector_build_lock = threading.Lock()
+        self._vector_changes: Optional[Dict[str, Optional[str]]] = {} if background else None
+
         self.entries_file = self.kb_dir / "entries.json"
-        self.entries: Dict[str, KnowledgeEntry] = {}
+        if self.entries_file.exists() and not len(self.store):
+            self._migrate_json()
+
+        if background:
+            threading.Thread(
+                target=self.warm,
+                daemon=True,
+                name="KnowledgeIndexWarmer",
+            ).start()
 
-        self._load_entries()
         print(f"[{BOT_NAME}] Knowledge base initialized with {len(self.entries)} entries.")
 
-    def _load_entries(self):
-        """Load knowledge entries from disk."""
-        if self.entries_file.exists():
-            try:
-                with open(self.entries_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                for entry_id, entry_data in data.items():
-                    self.entries[entry_id] = KnowledgeEntry(**entry_data)
-            except Exception as e:
-                print(f"[{BOT_NAME}] Error loading knowledge base: {e}")
-
-    def _save_entries(self):
-        """Save knowledge entries to disk."""
+    def _migrate_json(self):
+        """Move entries from the old single-file format into the store."""
+        try:
+            with open(self.entries_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.store.put_many(KnowledgeEntry(**entry_data) for entry_data in data.values())
+            self.store.checkpoint()
+            os.replace(self.entries_file, self.entries_file.with_suffix(".json.migrated"))
+            print(f"[{BOT_NAME}] Migrated {len(data)} knowledge entries to segmented storage.")
+        except Exception as e:
+            print(f"[{BOT_NAME}] Error migrating knowledge base: {e}")
+
+    def warm(self):
+        """Build the text and vector indexes ahead of the first query."""
+        try:
+            self.index
+        except Exception as e:
+            print(f"[{BOT_NAME}] Error building knowledge index: {e}")
+        try:
+            self._vector_index()
+            # The Codex and shrines are searched alongside on every command
+            AscensionCodex.vector_index()
+            ShrineVirtues.vector_index()
+        except Exception as e:
+            print(f"[{BOT_NAME}] Error building vector indexes: {e}")
+
+    @property
+    def index(self) -> BM25Index:
+        """The text index, built from every entry if warm() hasn't yet."""
+        with self._index_lock:
+            if self._index is None:
+                self._index = BM25Index.build(
+                    (entry_id, _index_text(entry), entry.importance)
+                    for entry_id, entry in self.entries.items()
+                )
+            return self._index
+
+    def _vector_index(self, wait: bool = True) -> Optional[VectorIndex]:
+        """
+        Open the vector index if warm() hasn't yet, embedding entries it is missing.
+
+        Embedding runs outside _index_lock, so text search and writes carry
+        on meanwhile; their embedding changes are queued and applied before
+        the index is put in place. With wait=False, returns None rather
+        than waiting for a build that warm() has pending or under way.
+        """
+        if self._vectors is not None:
+            return self._vectors or None
+        if not wait and self._vector_changes is not None:
+            return None
+        with self._vector_build_lock:
+            with self._index_lock:
+                if self._vectors is not None:
+                    return self._vectors or None
+                if self._vector_changes is None:
+                    self._vector_changes = {}
+
+            vectors = None
+            if vector_search_available():
+                try:
+                    vectors = VectorIndex("custom", Paths.KNOWLEDGE / "vectors")
+                    # Changes are embedded as they happen once the index is
+                    # open, so only entries added before it was built are missing
+                    for entry_id in [key for key in vectors.rows if key not in self.entries]:
+                        vectors.remove(entry_id)
+                    missing = {
+                        entry_id: _embedding_text(self.entries[entry_id])
+                        for entry_id in self.entries if entry_id not in vectors
+                    }
+                    if missing:
+                        vectors.upsert_many(missing)
+                        print(f"[{BOT_NAME}] Embedded {len(missing)} knowledge entries.")
+                except Exception as e:
+                    print(f"[{BOT_NAME}] Vector index unavailable: {e}")
+                    vectors = None
+
+            # Catch up on writes made during the build, until none are left
+            while True:
+                with self._index_lock:
+                    changes, self._vector_changes = self._vector_changes, {}
+                    if not changes or vectors is None:
+                        self._vectors = vectors or False
+                        self._vector_changes = None
+                        return vectors
+                self._apply_vector_changes(vectors, changes)
+
+    @staticmethod
+    def _apply_vector_changes(vectors: VectorIndex, changes: Dict[str, Optional[str]]):
+        """Embed changed entries and drop deleted ones."""
         try:
-            data = {eid: asdict(entry) for eid, entry in self.entries.items()}
-            with open(self.entries_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            for entry_id in [key for key, text in changes.items() if text is None]:
+                vectors.remove(entry_id)
+            texts = {key: text for key, text in changes.items() if text is not None}
+            if texts:
+                vectors.upsert_many(texts)
         except Exception as e:
-            print(f"[{BOT_NAME}] Error saving knowledge base: {e}")
+            print(f"[{BOT_NAME}] Error embedding knowledge entries: {e}")
+
+    def _update_vectors(self, changes: Dict[str, Optional[str]]):
+        """
+        Bring the vector index up to date with changed (ID -> text) and
+        deleted (ID -> None) entries. Call without holding _index_lock.
+        """
+        with self._index_lock:
+            if self._vector_changes is not None:
+                # A build is under way and applies these when it finishes
+                self._vector_changes.update(changes)
+                return
+        vectors = self._vector_index()
+        if vectors is not None:
+            self._apply_vector_changes(vectors, changes)
+
+    def close(self):
+        """Checkpoint the store so the next startup has no log to replay."""
+        self.store.close()
 
     def _generate_id(self) -> str:
         """Generate a unique ID for a new entry."""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        count = len(self.entries)
-        return f"kb_{timestamp}_{count}"
+        # A random suffix keeps IDs unique within the same second and after deletes
+        while True:
+            entry_id = f"kb_{timestamp}_{uuid.uuid4().hex[:12]}"
+            if entry_id not in self.entries:
+                return entry_id
 
     def add_entry(
         self,
@@ -108,33 +265,104 @@ class KnowledgeBase:
             metadata=metadata or {},
         )
 
-        self.entries[entry_id] = entry
-        self._save_entries()
+        with self._index_lock:
+            self.store.put(entry)
+            if self._index is not None:
+                self._index.add(entry_id, _index_text(entry), entry.importance)
+        self._update_vectors({entry_id: _embedding_text(entry)})
 
         print(f"[{BOT_NAME}] Added knowledge: '{title}' [{category}]")
         return entry_id
 
+    def add_entries(
+        self,
+        records: Iterable[Dict[str, Any]],
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> List[str]:
+        """
+        Add many entries at once.
+
+        Records hold add_entry's arguments. They are consumed as a stream,
+        then written, indexed and embedded in batches of
+        KnowledgeConfig.IMPORT_BATCH_SIZE.
+
+        Args:
+            records: Dicts with title, content and optionally category,
+                tags, source, importance and metadata
+            progress: Called with the running entry count after each batch
+
+        Returns:
+            IDs of the new entries
+        """
+        entry_ids = []
+        records = iter(records)
+        while True:
+            batch = list(islice(records, KnowledgeConfig.IMPORT_BATCH_SIZE))
+            if not batch:
+                break
+
+            now = datetime.now().isoformat()
+            entries = [
+                KnowledgeEntry(
+                    id=self._generate_id(),
+                    title=record["title"],
+                    content=record["content"],
+                    category=record.get("category", "general"),
+                    tags=record.get("tags") or [],
+                    source=record.get("source", ""),
+                    created=now,
+                    updated=now,
+                    importance=record.get("importance", 5),
+                    metadata=record.get("metadata") or {},
+                )
+                for record in batch
+            ]
+            with self._index_lock:
+                self.store.put_many(entries)
+                if self._index is not None:
+                    for entry in entries:
+                        self._index.add(entry.id, _index_text(entry), entry.importance)
+            self._update_vectors({entry.id: _embedding_text(entry) for entry in entries})
+            entry_ids.extend(entry.id for entry in entries)
+
+            if progress:
+                progress(len(entry_ids))
+
+        return entry_ids
+
     def update_entry(self, entry_id: str, **kwargs) -> bool:
         """Update an existing entry."""
         if entry_id not in self.entries:
             return False
 
-        entry = self.entries[entry_id]
-        for key, value in kwargs.items():
-            if hasattr(entry, key):
-                setattr(entry, key, value)
-
-        entry.updated = datetime.now().isoformat()
-        self._save_entries()
+        with self._index_lock:
+            entry = self.entries[entry_id]
+            old_text = _index_text(entry)
+            for key, value in kwargs.items():
+                if hasattr(entry, key):
+                    setattr(entry, key, value)
+
+            reindex = any(key in INDEXED_FIELDS for key in kwargs)
+            if reindex and self._index is not None:
+                self._index.remove(entry_id, old_text)
+                self._index.add(entry_id, _index_text(entry), entry.importance)
+
+            entry.updated = datetime.now().isoformat()
+            self.store.put(entry)
+        if reindex:
+            self._update_vectors({entry_id: _embedding_text(entry)})
         return True
 
     def delete_entry(self, entry_id: str) -> bool:
         """Delete an entry."""
-        if entry_id in self.entries:
-            del self.entries[entry_id]
-            self._save_entries()
-            return True
-        return False
+        if entry_id not in self.entries:
+            return False
+        with self._index_lock:
+            if self._index is not None:
+                self._index.remove(entry_id, _index_text(self.entries[entry_id]))
+            self.store.delete(entry_id)
+        self._update_vectors({entry_id: None})
+        return True
 
     def get_entry(self, entry_id: str) -> Optional[KnowledgeEntry]:
         """Get a specific entry by ID."""
@@ -146,68 +374,124 @@ class KnowledgeBase:
         category: str = None,
         tags: List[str] = None,
         min_importance: int = 0,
+        limit: int = None,
     ) -> List[KnowledgeEntry]:
         """
         Search the knowledge base.
 
         Args:
-            query: Text to search for in title and content
+            query: Words to search for in title, tags and content
             category: Filter by category
             tags: Filter by tags (any match)
             min_importance: Minimum importance level
+            limit: Maximum number of results (None = all)
 
         Returns:
-            List of matching entries, sorted by importance
+            List of matching entries. With a query, entries matching any
+            of its words are ranked by BM25 relevance blended with
+            importance (KnowledgeConfig.IMPORTANCE_WEIGHT); without one,
+            by importance.
         """
-        results = []
-        query_lower = query.lower() if query else ""
-
-        for entry in self.entries.values():
-            # Check importance
-            if entry.importance < min_importance:
-                continue
-
-            # Check category
-            if category and entry.category != category:
-                continue
-
-            # Check tags
-            if tags and not any(tag in entry.tags for tag in tags):
-                continue
-
-            # Check query in title/content
-            if query_lower:
-                if query_lower not in entry.title.lower() and query_lower not in entry.content.lower():
-                    continue
-
-            results.append(entry)
-
-        # Sort by importance (highest first)
-        results.sort(key=lambda e: e.importance, reverse=True)
-        return results
+        # Category and tag filters come straight from the store's indexes
+        candidates = self._filter_ids(category, tags)
+
+        if not query:
+            if candidates is None:
+                # Walk the importance order, so only returned entries are touched
+                ids = self.store.ids_by_importance(min_importance)
+                return [self.entries[entry_id] for entry_id in islice(ids, limit)]
+            ranked = [
+                entry_id for entry_id in candidates
+                if self.store.importance(entry_id) >= min_importance
+            ]
+            # Sort by importance (highest first)
+            ranked.sort(key=self.store.importance, reverse=True)
+            return [self.entries[entry_id] for entry_id in ranked[:limit]]
+
+        # Importance is index metadata, so filtering on it skips the entry lookup
+        if candidates is not None:
+            doc_filter = lambda entry_id, importance: importance >= min_importance and entry_id in candidates
+        elif min_importance:
+            doc_filter = lambda entry_id, importance: importance >= min_importance
+        else:
+            doc_filter = None
+        scores = self.index.score(query, doc_filter)
+        if not scores:
+            return []
+
+        # Normalize relevance to 0-1 so it blends with importance on the same scale
+        best = max(scores.values())
+        weight = KnowledgeConfig.IMPORTANCE_WEIGHT
+        ranked = {
+            entry_id: (1 - weight) * score / best + weight * self.store.importance(entry_id) / 10
+            for entry_id, score in scores.items()
+        }
+        top = heapq.nlargest(limit or len(ranked), ranked, key=ranked.get)
+        return [self.entries[entry_id] for entry_id in top]
+
+    def _filter_ids(self, category: Optional[str], tags: Optional[List[str]]) -> Optional[set]:
+        """IDs in the category and carrying any of the tags (None when neither filter is set)."""
+        if not category and not tags:
+            return None
+        ids = None
+        if tags:
+            ids = set().union(*(self.store.tags.get(tag, ()) for tag in tags))
+        if category:
+            in_category = self.store.categories.get(category, set())
+            ids = in_category.intersection(ids) if ids is not None else set(in_category)
+        return ids
 
     def get_by_category(self, category: str) -> List[KnowledgeEntry]:
         """Get all entries in a category."""
-        return [e for e in self.entries.values() if e.category == category]
+        # IDs start with their creation time, so sorting keeps entries in the order they were added
+        return [self.entries[entry_id] for entry_id in sorted(self.store.categories.get(category, ()))]
 
     def get_categories(self) -> List[str]:
         """Get all unique categories."""
-        return list(set(e.category for e in self.entries.values()))
+        return list(self.store.categories)
 
     def get_tags(self) -> List[str]:
         """Get all unique tags."""
-        all_tags = set()
-        for entry in self.entries.values():
-            all_tags.update(entry.tags)
-        return list(all_tags)
+        return list(self.store.tags)
+
+    def semantic_search(self, query: str, min_importance: int = 0, limit: int = 5) -> List[KnowledgeEntry]:
+        """
+        Find entries close in meaning to a query, most similar first.
+
+        Returns an empty list when vector search is unavailable or the
+        index is still being built.
+        """
+        vectors = self._vector_index(wait=False)
+        if vectors is None or not query:
+            return []
+
+        # Over-fetch so the importance filter still leaves enough results
+        results = []
+        for entry_id, _ in vectors.search(
+            query, k=limit * 4, min_similarity=KnowledgeConfig.VECTOR_MIN_SIMILARITY
+        ):
+            if entry_id in self.store and self.store.importance(entry_id) >= min_importance:
+                results.append(self.entries[entry_id])
+                if len(results) == limit:
+                    break
+        return results
 
     def get_context_for_query(self, query: str, max_entries: int = 3) -> str:
         """
         Get relevant knowledge context for a query.
         Returns formatted context string for LLM prompting.
         """
-        # Search for relevant entries
-        results = self.search(query=query, min_importance=3)[:max_entries]
+        # Merge keyword and semantic matches by reciprocal rank, so an entry
+        # ranked well by either one makes the cut
+        fused: Dict[str, float] = {}
+        for ranking in (
+            self.search(query=query, min_importance=3, limit=max_entries),
+            self.semantic_search(query, min_importance=3, limit=max_entries),
+        ):
+            for rank, entry in enumerate(ranking):
+                fused[entry.id] = fused.get(entry.id, 0.0) + 1.0 / (60 + rank)
+        top = heapq.nlargest(max_entries, fused, key=fused.get)
+        results = [self.entries[entry_id] for entry_id in top]
 
         if not results:
             return ""
@@ -219,10 +503,17 @@ class KnowledgeBase:
 
         return "\n".join(lines)
 
-    def import_from_file(self, file_path: str, category: str = "imported") -> int:
+    def import_from_file(
+        self,
+        file_path: str,
+        category: str = "imported",
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
         """
-        Import knowledge from a text file.
-        Each paragraph becomes a separate entry.
+        Import knowledge from a text, Markdown, JSONL or PDF file.
+        Each paragraph (or JSONL object) becomes a separate entry.
+
+        The file is streamed in chunks, so its size is not limited by memory.
 
         Returns count of entries imported.
         """
@@ -231,22 +522,13 @@ class KnowledgeBase:
             print(f"[{BOT_NAME}] File not found: {file_path}")
             return 0
 
-        try:
-            content = path.read_text(encoding='utf-8')
-            paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-
-            count = 0
-            for i, para in enumerate(paragraphs):
-                title = para[:50] + "..." if len(para) > 50 else para
-                self.add_entry(
-                    title=title,
-                    content=para,
-                    category=category,
-                    source=file_path,
-                    importance=5,
-                )
-                count += 1
+        def report(count: int):
+            print(f"[{BOT_NAME}] Importing {path.name}: {count} entries...")
+            if progress:
+                progress(count)
 
+        try:
+            count = len(self.add_entries(iter_records(path, category), progress=report))
             print(f"[{BOT_NAME}] Imported {count} entries from {file_path}")
             return count
 
@@ -254,13 +536,73 @@ class KnowledgeBase:
             print(f"[{BOT_NAME}] Error importing file: {e}")
             return 0
 
+    def import_from_directory(
+        self,
+        directory: str,
+        category: str = "imported",
+        recursive: bool = True,
+        workers: int = 1,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+    ) -> int:
+        """
+        Import every supported file in a directory.
+
+        Args:
+            directory: Folder to import
+            category: Category for the new entries
+            recursive: Include subfolders
+            workers: Parse this many files at once in separate processes
+                (1 = stream each file in this process)
+            progress: Called with (entries, files done, total files)
+
+        Returns count of entries imported.
+        """
+        files = find_files(Path(directory), recursive=recursive)
+        if not files:
+            print(f"[{BOT_NAME}] No importable files in {directory}")
+            return 0
+
+        files_done = 0
+
+        def report(count: int):
+            print(f"[{BOT_NAME}] Importing: {count} entries ({files_done}/{len(files)} files)...")
+            if progress:
+                progress(count, files_done, len(files))
+
+        def sequential() -> Iterator[Dict[str, Any]]:
+            nonlocal files_done
+            for path in files:
+                try:
+                    yield from iter_records(path, category)
+                except Exception as e:
+                    print(f"[{BOT_NAME}] Error parsing {path}: {e}")
+                files_done += 1
+
+        def parallel() -> Iterator[Dict[str, Any]]:
+            nonlocal files_done
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(parse_file, str(path), category) for path in files]
+                for future in as_completed(futures):
+                    files_done += 1
+                    yield from future.result()
+
+        try:
+            records = parallel() if workers > 1 and len(files) > 1 else sequential()
+            count = len(self.add_entries(records, progress=report))
+            print(f"[{BOT_NAME}] Imported {count} entries from {len(files)} files in {directory}")
+            return count
+
+        except Exception as e:
+            print(f"[{BOT_NAME}] Error importing directory: {e}")
+            return 0
+
     def get_summary(self) -> Dict[str, Any]:
         """Get a summary of the knowledge base."""
         return {
             "total_entries": len(self.entries),
             "categories": self.get_categories(),
             "tags": self.get_tags(),
-            "avg_importance": sum(e.importance for e in self.entries.values()) / len(self.entries) if self.entries else 0,
+            "avg_importance": self.store.importance_total / len(self.entries) if self.entries else 0,
         }
 
 
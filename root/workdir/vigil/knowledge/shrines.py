@@ -6,6 +6,9 @@ Ethical Guardrails from the Book of Light Pillars
 import re
 from typing import Dict, Optional, List
 
+from config.settings import KnowledgeConfig
+from core.vector_index import VectorIndex
+
 
 class ShrineVirtues:
     """
@@ -134,9 +137,27 @@ class ShrineVirtues:
         """Get all shrines."""
         return cls.SHRINES
 
+    @staticmethod
+    def _embedding_text(shrine: Dict) -> str:
+        """Text embedded for a shrine."""
+        return " ".join([shrine["name"], shrine["essence"], shrine["teaching"], shrine["protocol"]])
+
+    @classmethod
+    def vector_index(cls) -> Optional[VectorIndex]:
+        """Embeddings of every shrine, built once per process (None if unavailable)."""
+        texts = {key: cls._embedding_text(shrine) for key, shrine in cls.SHRINES.items()}
+        return VectorIndex.for_texts("shrines", texts)
+
     @classmethod
     def get_relevant_shrine(cls, query_text: str) -> Dict:
         """Return the most relevant shrine based on query content."""
+        # Closest in meaning first, so paraphrases find their shrine
+        vectors = cls.vector_index()
+        if vectors is not None:
+            matches = vectors.search(query_text, k=1, min_similarity=KnowledgeConfig.VECTOR_MIN_SIMILARITY)
+            if matches:
+                return cls.SHRINES[matches[0][0]]
+
         query_lower = query_text.lower()
         words = set(re.findall(r'\b\w+\b', query_lower))
 
@@ -0,0 +1,356 @@
+"""
+VIGIL - Knowledge Store
+Segmented append-only storage for knowledge entries, loaded lazily
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_left, insort
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from config.settings import BOT_NAME, KnowledgeConfig
+
+
+MANIFEST_VERSION = 1
+
+
+class KnowledgeStore:
+    """
+    Knowledge entries in an append-only log, read back on demand.
+
+    Every add, update or delete appends one JSON line to the active
+    segment file (`segment-<n>.log`), so a mutation costs the size of the
+    entry rather than the size of the knowledge base. Segments roll over
+    at KnowledgeConfig.STORE_SEGMENT_BYTES.
+
+    `manifest.json` is a checkpoint: where each live entry's latest
+    record sits (segment, offset, length) plus its importance, and the
+    category and tag indexes. The importance order is rebuilt from it.
+    Startup reads the manifest and replays only the log written after it;
+    entries themselves are read on first access.
+    The manifest is rewritten every KnowledgeConfig.STORE_CHECKPOINT_EVERY
+    records and on close.
+
+    Once superseded records make up KnowledgeConfig.STORE_COMPACT_DEAD_RATIO
+    of the log, live records are copied into fresh segments and the old
+    ones deleted.
+
+    The store behaves as a read-only mapping of entry ID to entry; writes
+    go through put(), put_many() and delete().
+    """
+
+    def __init__(self, store_dir: Path, factory: Callable[..., Any]):
+        self.store_dir = store_dir
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_file = store_dir / "manifest.json"
+        self.factory = factory
+
+        self._lock = threading.RLock()
+        # ID -> [segment, offset, length, importance] of its latest record
+        self.locations: Dict[str, List[int]] = {}
+        # Category / tag -> IDs, and ID -> (category, tags) to undo them
+        self.categories: Dict[str, Set[str]] = {}
+        self.tags: Dict[str, Set[str]] = {}
+        self._keys: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        # (importance, ID) for every entry, ascending, and the importance total
+        self.by_importance: List[Tuple[int, str]] = []
+        self.importance_total = 0
+        # Entries read so far
+        self._cache: Dict[str, Any] = {}
+
+        self.segment = 1
+        self.total_bytes = 0  # Bytes of every record in the log
+        self.live_bytes = 0  # Bytes of records still current
+        self._since_checkpoint = 0
+        self._writer = None
+
+        self._load()
+
+    # -------------------------------------------------------------------------
+    # Mapping interface
+    # -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self.locations
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.locations))
+
+    def __getitem__(self, entry_id: str) -> Any:
+        entry = self.get(entry_id)
+        if entry is None:
+            raise KeyError(entry_id)
+        return entry
+
+    def get(self, entry_id: str, default: Any = None) -> Any:
+        """Get an entry, reading it from its segment on first access."""
+        with self._lock:
+            entry = self._cache.get(entry_id)
+            if entry is not None:
+                return entry
+            location = self.locations.get(entry_id)
+            if location is None:
+                return default
+            record = json.loads(self._read_raw(location))
+            entry = self.factory(**record["entry"])
+            self._cache[entry_id] = entry
+            return entry
+
+    def keys(self) -> List[str]:
+        return list(self.locations)
+
+    def values(self) -> List[Any]:
+        """Every entry (reads any not yet loaded)."""
+        return [self[entry_id] for entry_id in self.keys()]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(entry_id, self[entry_id]) for entry_id in self.keys()]
+
+    def importance(self, entry_id: str) -> int:
+        """An entry's importance, without reading the entry."""
+        return self.locations[entry_id][3]
+
+    def ids_by_importance(self, min_importance: int = 0) -> Iterator[str]:
+        """Entry IDs from most to least important, stopping below min_importance."""
+        for importance, entry_id in reversed(self.by_importance):
+            if importance < min_importance:
+                return
+            yield entry_id
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def put(self, entry: Any):
+        """Store a new or changed entry."""
+        self.put_many([entry])
+
+    def put_many(self, entries: Iterable[Any]):
+        """Store several entries with a single append."""
+        with self._lock:
+            lines = []
+            for entry in entries:
+                line = json.dumps({"op": "put", "entry": asdict(entry)}, ensure_ascii=False)
+                lines.append((entry, (line + "\n").encode("utf-8")))
+            if not lines:
+                return
+
+            offset = self._append(b"".join(data for _, data in lines))
+            for entry, data in lines:
+                self._apply_put(entry.id, [self.segment, offset, len(data), entry.importance], entry.category, entry.tags)
+                self._cache[entry.id] = entry
+                offset += len(data)
+            self._after_write(len(lines))
+
+    def delete(self, entry_id: str) -> bool:
+        """Remove an entry. Returns False if there was none."""
+        with self._lock:
+            if entry_id not in self.locations:
+                return False
+            data = (json.dumps({"op": "del", "id": entry_id}) + "\n").encode("utf-8")
+            self._append(data)
+            self._apply_delete(entry_id)
+            self._cache.pop(entry_id, None)
+            self._after_write(1)
+            return True
+
+    def _append(self, data: bytes) -> int:
+        """Append to the active segment; returns the offset written at."""
+        if self._writer is not None and self._writer.tell() + len(data) > KnowledgeConfig.STORE_SEGMENT_BYTES:
+            self._writer.close()
+            self._writer = None
+            self.segment += 1
+        if self._writer is None:
+            self._writer = open(self._segment_path(self.segment), 'ab')
+        offset = self._writer.tell()
+        self._writer.write(data)
+        self._writer.flush()
+        self.total_bytes += len(data)
+        return offset
+
+    def _after_write(self, records: int):
+        """Checkpoint or compact when due."""
+        self._since_checkpoint += records
+        dead = self.total_bytes - self.live_bytes
+        if (
+            self.total_bytes > KnowledgeConfig.STORE_SEGMENT_BYTES
+            and dead > self.total_bytes * KnowledgeConfig.STORE_COMPACT_DEAD_RATIO
+        ):
+            self.compact()
+        elif self._since_checkpoint >= KnowledgeConfig.STORE_CHECKPOINT_EVERY:
+            self.checkpoint()
+
+    # -------------------------------------------------------------------------
+    # Index maintenance
+    # -------------------------------------------------------------------------
+
+    def _apply_put(self, entry_id: str, location: List[int], category: str, tags: List[str]):
+        self._apply_delete(entry_id)
+        self.locations[entry_id] = location
+        self.live_bytes += location[2]
+        self._keys[entry_id] = (category, tuple(tags))
+        self.categories.setdefault(category, set()).add(entry_id)
+        for tag in tags:
+            self.tags.setdefault(tag, set()).add(entry_id)
+        insort(self.by_importance, (location[3], entry_id))
+        self.importance_total += location[3]
+
+    def _apply_delete(self, entry_id: str):
+        location = self.locations.pop(entry_id, None)
+        if location is None:
+            return
+        self.live_bytes -= location[2]
+        category, tags = self._keys.pop(entry_id)
+        del self.by_importance[bisect_left(self.by_importance, (location[3], entry_id))]
+        self.importance_total -= location[3]
+        self._discard(self.categories, category, entry_id)
+        for tag in tags:
+            self._discard(self.tags, tag, entry_id)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, entry_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del index[key]
+
+    # -------------------------------------------------------------------------
+    # Segments, checkpoints and compaction
+    # -------------------------------------------------------------------------
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.store_dir / f"segment-{segment:06d}.log"
+
+    def _segments(self) -> List[int]:
+        """Segment numbers on disk, oldest first."""
+        return sorted(int(path.stem.split("-")[1]) for path in self.store_dir.glob("segment-*.log"))
+
+    def _read_raw(self, location: List[int]) -> bytes:
+        segment, offset, length = location[:3]
+        with open(self._segment_path(segment), 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def _load(self):
+        """Read the manifest, then replay the log written after it."""
+        start = (1, 0)
+        if self.manifest_file.exists():
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                self.locations = manifest["entries"]
+                self.categories = {key: set(ids) for key, ids in manifest["categories"].items()}
+                self.tags = {key: set(ids) for key, ids in manifest["tags"].items()}
+                self.total_bytes = manifest["total_bytes"]
+                self.live_bytes = sum(location[2] for location in self.locations.values())
+                start = tuple(manifest["checkpoint"])
+
+                categories = {entry_id: category for category, ids in self.categories.items() for entry_id in ids}
+                tags: Dict[str, List[str]] = {}
+                for tag, ids in self.tags.items():
+                    for entry_id in ids:
+                        tags.setdefault(entry_id, []).append(tag)
+                self._keys = {
+                    entry_id: (categories.get(entry_id, ""), tuple(tags.get(entry_id, ())))
+                    for entry_id in self.locations
+                }
+                self.by_importance = sorted((location[3], entry_id) for entry_id, location in self.locations.items())
+                self.importance_total = sum(importance for importance, _ in self.by_importance)
+            except Exception as e:
+                print(f"[{BOT_NAME}] Knowledge manifest unreadable ({e}); replaying the full log.")
+                self.locations, self.categories, self.tags, self._keys = {}, {}, {}, {}
+                self.by_importance, self.importance_total = [], 0
+                self.total_bytes = self.live_bytes = 0
+                start = (1, 0)
+
+        segments = [segment for segment in self._segments() if segment >= start[0]]
+        for segment in segments:
+            self._replay(segment, start[1] if segment == start[0] else 0)
+        if segments:
+            self.segment = segments[-1]
+
+    def _replay(self, segment: int, offset: int):
+        """Apply a segment's records from an offset, dropping a torn final record."""
+        path = self._segment_path(segment)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.total_bytes += len(line)
+                self._since_checkpoint += 1
+                if record["op"] == "put":
+                    entry = record["entry"]
+                    location = [segment, offset, len(line), entry.get("importance", 5)]
+                    self._apply_put(entry["id"], location, entry.get("category", ""), entry.get("tags") or [])
+                else:
+                    self._apply_delete(record["id"])
+                offset += len(line)
+
+        # Cut off a record left half-written by a crash
+        if path.stat().st_size > offset:
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+
+    def checkpoint(self):
+        """Write the manifest so the next startup can skip the log before this point."""
+        with self._lock:
+            offset = self._writer.tell() if self._writer is not None else 0
+            if self._writer is None and self._segment_path(self.segment).exists():
+                offset = self._segment_path(self.segment).stat().st_size
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "checkpoint": [self.segment, offset],
+                "total_bytes": self.total_bytes,
+                "entries": self.locations,
+                "categories": {key: sorted(ids) for key, ids in self.categories.items()},
+                "tags": {key: sorted(ids) for key, ids in self.tags.items()},
+            }
+            tmp_path = self.manifest_file.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_file)
+            self._since_checkpoint = 0
+
+    def compact(self):
+        """Copy live records into new segments and delete the old ones."""
+        with self._lock:
+            old_segments = self._segments()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self.segment = (old_segments[-1] if old_segments else self.segment) + 1
+
+            # Copy raw record bytes in log order, so reads stay sequential
+            self.total_bytes = 0
+            live = sorted(self.locations.items(), key=lambda item: item[1][:2])
+            for entry_id, location in live:
+                data = self._read_raw(location)
+                offset = self._append(data)
+                self.locations[entry_id] = [self.segment, offset, len(data), location[3]]
+            self.live_bytes = self.total_bytes
+
+            # Once the manifest points at the new segments the old ones are unused
+            self.checkpoint()
+            for segment in old_segments:
+                self._segment_path(segment).unlink()
+            print(f"[{BOT_NAME}] Compacted knowledge store: {len(self.locations)} entries in {len(self._segments())} segment(s).")
+
+    def close(self):
+        """Checkpoint and release the active segment."""
+        with self._lock:
+            self.checkpoint()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
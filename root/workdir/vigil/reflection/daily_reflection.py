@@ -77,18 +77,20 @@ class ReflectionSystem:
     Reflections are stored privately and can be reviewed by the user.
     """
 
-    def __init__(self, brain=None, memory=None):
+    def __init__(self, brain=None, memory=None, batch=None):
         """
         Initialize the reflection system.
 
         Args:
             brain: Reference to Vigil's brain (LLM) for generating reflections
             memory: Reference to Vigil's memory system
+            batch: BatchProcessor for scheduled reflections (None = call the brain directly)
         """
         Paths.ensure_directories()
 
         self.brain = brain
         self.memory = memory
+        self.batch = batch
 
         self.reflections_dir = Paths.REFLECTION_LOGS
         self.reflections_dir.mkdir(parents=True, exist_ok=True)
@@ -96,6 +98,10 @@ class ReflectionSystem:
         self._scheduler_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
 
+        # Reflections queued before a restart finish through this handler
+        if self.batch:
+            self.batch.register_handler("reflection", self._finish_batch_reflection)
+
         print(f"[{BOT_NAME}] Reflection system initialized.")
 
     def _get_reflection_path(self, reflection_date: date = None) -> Path:
@@ -138,7 +144,10 @@ class ReflectionSystem:
         }
 
         if self.memory:
-            summary = self.memory.get_daily_summary()
+            # Reflection runs just after midnight, so it looks back on
+            # yesterday's log (read from the archive if it's been rolled up)
+            yesterday = (date.today() - timedelta(days=1)).isoformat()
+            summary = self.memory.get_daily_summary(yesterday)
             data["lessons_learned"] = summary.get("lessons_learned", [])
             data["challenges"] = summary.get("challenges", [])
             data["external_entities"] = summary.get("external_entities", [])
@@ -209,12 +218,8 @@ Write this reflection in first person, as Vigil. Be honest, introspective, and f
 This is a private log—speak freely.
 """
 
-    def generate_reflection(self) -> DailyReflection:
-        """Generate today's reflection using the LLM."""
-        start_time = time.time()
-        today = date.today()
-        now = datetime.now()
-
+    def _begin_reflection(self) -> tuple:
+        """Gather today's data; returns (reflection without text, prompt)."""
         print(f"[{BOT_NAME}] 🌙 Beginning nightly reflection...")
 
         # Gather data
@@ -222,30 +227,20 @@ This is a private log—speak freely.
 
         # Create reflection structure
         reflection = DailyReflection(
-            date=today.isoformat(),
-            timestamp=now.isoformat(),
+            date=date.today().isoformat(),
+            timestamp=datetime.now().isoformat(),
             lessons_learned=daily_data.get("lessons_learned", []),
             challenges=daily_data.get("challenges", []),
             external_entities=daily_data.get("external_entities", []),
         )
+        return reflection, self._generate_reflection_prompt(daily_data)
 
-        # Generate reflection text using LLM
-        if self.brain:
-            prompt = self._generate_reflection_prompt(daily_data)
-
-            # Use a separate context for reflection (don't pollute main conversation)
-            original_history = self.brain.conversation_history.copy()
-            self.brain.conversation_history = []
-
-            response = self.brain.think(prompt, temperature=0.8)
-
-            # Restore original history
-            self.brain.conversation_history = original_history
-
-            if response:
-                reflection.reflection_text = response.text
-        else:
-            reflection.reflection_text = f"[Reflection generated without LLM at {now.isoformat()}]\n\nToday I continued to grow and learn alongside {PRIMARY_USER_NAME}."
+    def _finish_reflection(self, reflection: DailyReflection, text: Optional[str], start_time: float) -> DailyReflection:
+        """Fill in the generated text and save."""
+        if text:
+            reflection.reflection_text = text
+        elif not self.brain:
+            reflection.reflection_text = f"[Reflection generated without LLM at {reflection.timestamp}]\n\nToday I continued to grow and learn alongside {PRIMARY_USER_NAME}."
 
         reflection.duration_seconds = time.time() - start_time
 
@@ -256,6 +251,58 @@ This is a private log—speak freely.
 
         return reflection
 
+    def generate_reflection(self) -> DailyReflection:
+        """Generate today's reflection using the LLM."""
+        start_time = time.time()
+        reflection, prompt = self._begin_reflection()
+
+        text = None
+        if self.brain:
+            # Use a separate conversation for reflection (don't pollute main conversation)
+            response = self.brain.think(
+                prompt,
+                temperature=0.8,
+                conversation=self.brain.new_conversation("reflection"),
+            )
+            if response:
+                text = response.text
+
+        return self._finish_reflection(reflection, text, start_time)
+
+    def queue_reflection(self, callback: Optional[Callable[[DailyReflection], None]] = None):
+        """
+        Generate today's reflection through the batch processor.
+
+        Returns at once; the reflection is saved (and `callback` called)
+        when the batch job completes. Without a batch processor this
+        falls back to generate_reflection().
+        """
+        if not (self.batch and self.brain):
+            reflection = self.generate_reflection()
+            if callback:
+                callback(reflection)
+            return
+
+        start_time = time.time()
+        reflection, prompt = self._begin_reflection()
+
+        def on_done(job):
+            result = self._finish_batch_reflection(job)
+            if callback:
+                callback(result)
+
+        # The gathered reflection travels with the job so it can be finished after a restart
+        self.batch.submit(
+            prompt, on_done, caller="reflection", temperature=0.8,
+            metadata={"reflection": asdict(reflection), "start_time": start_time},
+        )
+
+    def _finish_batch_reflection(self, job) -> DailyReflection:
+        """Finish the reflection carried by a batch job."""
+        reflection = DailyReflection(**job.metadata["reflection"])
+        text = job.response.text if job.response else None
+        return self._finish_reflection(reflection, text, job.metadata["start_time"])
+
     def _should_reflect_now(self) -> bool:
         """Check if it's time for the daily reflection."""
         now = datetime.now()
@@ -277,7 +324,7 @@ This is a private log—speak freely.
 
             # Check if we should reflect (haven't reflected today and it's time)
             if last_reflection_date != today and self._should_reflect_now():
-                self.generate_reflection()
+                self.queue_reflection()
                 last_reflection_date = today
 
             # Sleep for a short interval
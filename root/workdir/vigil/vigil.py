@@ -26,6 +26,7 @@ import sys
 import time
 import signal
 import threading
+from datetime import date
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -42,6 +43,8 @@ from core.listener import WakeWordListener
 from core.voice_input import VoiceInput
 from core.voice_output import VoiceOutput
 from core.brain import Brain
+from core.async_brain import AsyncBrain
+from core.batch import BatchProcessor
 from core.memory import Memory
 from knowledge.codex import AscensionCodex
 from knowledge.shrines import ShrineVirtues
@@ -92,11 +95,20 @@ class Vigil:
         self.voice_input = VoiceInput()
         self.voice_output = VoiceOutput()
         self.brain = Brain()
+        # Non-voice callers (interface, agent tasks) share one event loop
+        self.async_brain = AsyncBrain(
+            router=self.brain.router,
+            ledger=self.brain.ledger,
+            priority=self.brain.priority,
+        )
+        # Reflection and agent work that nobody is waiting on
+        self.batch = BatchProcessor(self.brain)
         self.memory = Memory()
         self.knowledge_base = KnowledgeBase()
         self.reflection_system = ReflectionSystem(
             brain=self.brain,
-            memory=self.memory
+            memory=self.memory,
+            batch=self.batch,
         )
 
         # Task management and integrations
@@ -105,8 +117,12 @@ class Vigil:
         self.agent_system = AgentSystem(
             brain=self.brain,
             task_manager=self.task_manager,
-            memory=self.memory
+            memory=self.memory,
+            async_brain=self.async_brain,
+            batch=self.batch,
         )
+        # Handlers are registered now, so work saved at last shutdown can resume
+        self.batch.start()
         self.always_on_top_interface = None
 
         # Wake word listener
@@ -198,6 +214,10 @@ class Vigil:
             return self._handle_add_connector(command)
         elif "list connectors" in command_lower or "show connectors" in command_lower:
             return self._handle_list_connectors()
+        elif "provider status" in command_lower or "model status" in command_lower:
+            return self._handle_provider_status()
+        elif "usage report" in command_lower or "token usage" in command_lower:
+            return self._handle_usage_report()
 
         # Detect role and domain
         role = SacredRoles.detect_role(command)
@@ -208,12 +228,11 @@ class Vigil:
         shrine_context = ShrineVirtues.get_context_for_query(command)
         role_context = SacredRoles.get_role_context(command)
         kb_context = self.knowledge_base.get_context_for_query(command)
+        history_context = self.memory.get_history_context(command)
         user_context = self.memory.get_user_context()
 
-        # Build enhanced prompt with context
-        enhanced_prompt = f"""{command}
-
----
+        # Build per-turn context (sent with this command only, not kept in history)
+        turn_context = f"""---
 ## CONTEXT FOR VIGIL
 
 {user_context}
@@ -225,22 +244,26 @@ class Vigil:
 {shrine_context}
 
 {kb_context}
+
+{history_context}
 ---
 
 Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless the task requires detailed output.
 """
 
-        # Get response from brain
-        response = self.brain.think(enhanced_prompt)
-
-        if response:
-            # Speak the response
-            self.voice_output.speak(response.text)
+        # Stream the response from brain, speaking each sentence as it completes.
+        # Recalled history shifts with every interaction, so only the stable
+        # knowledge decides whether a cached answer still applies.
+        cache_context = "\n".join([user_context, role_context, codex_context, shrine_context, kb_context])
+        response_text = self.voice_output.speak_stream(
+            self.brain.think_stream(command, context=turn_context, cache_context=cache_context)
+        )
 
+        if response_text:
             # Record interaction in memory
             self.memory.record_interaction(
                 user_input=command,
-                vigil_response=response.text,
+                vigil_response=response_text,
                 mode=domain or "conversation",
             )
         else:
@@ -346,10 +369,15 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
     def _handle_show_interface(self):
         """Handle showing the always-on-top interface."""
         if self.always_on_top_interface is None or not self.always_on_top_interface.is_running:
-            def handle_interface_message(msg: str) -> str:
-                # Process message through brain
-                response = self.brain.think(msg)
+            async def interface_reply(msg: str) -> str:
+                # The interface keeps its own conversation, apart from voice
+                self.async_brain.session("interface", caller="ui")
+                response = await self.async_brain.think(msg, session="interface")
                 return response.text if response else "I'm having trouble processing that."
+
+            def handle_interface_message(msg: str):
+                # Returns a Future so the window stays responsive
+                return self.async_brain.submit(interface_reply(msg))
             
             def handle_interface_close():
                 print(f"[{BOT_NAME}] Interface closed")
@@ -399,6 +427,43 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
         response += f" I can connect to: {', '.join(platforms[:5])} and more."
         
         self.voice_output.speak(response)
+
+    def _handle_provider_status(self):
+        """Handle reporting LLM provider health."""
+        status = self.brain.get_provider_status()
+        if not status:
+            self.voice_output.speak("No model calls have been made yet.")
+            return
+
+        parts = []
+        for name, info in status.items():
+            breaker = info["breaker"]
+            if breaker["state"] == "open":
+                parts.append(f"{name} is offline, retrying in {breaker['retry_in']:.0f} seconds")
+            elif info["p50"] is not None:
+                parts.append(f"{name} is up, typically answering in {info['p50']:.1f} seconds")
+            else:
+                parts.append(f"{name} is up")
+
+        self.voice_output.speak(". ".join(parts) + ".")
+
+    def _handle_usage_report(self):
+        """Handle reporting today's LLM token usage and cost."""
+        today = date.today()
+        by_caller = self.brain.ledger.summarize(today, today, group_by="caller")
+        if not by_caller:
+            self.voice_output.speak("No model calls have been made today.")
+            return
+
+        totals = self.brain.ledger.get_daily_totals(today)
+        tokens = totals["prompt_tokens"] + totals["completion_tokens"]
+        top = sorted(by_caller.items(), key=lambda item: item[1]["cost_usd"], reverse=True)[:3]
+        breakdown = ", ".join(f"{caller} {stats['cost_usd']:.2f}" for caller, stats in top)
+        self.voice_output.speak(
+            f"Today I've made {totals['calls']} model calls using {tokens:,} tokens, "
+            f"about {totals['cost_usd']:.2f} dollars. Biggest spenders: {breakdown}."
+        )
+
     def run(self):
         """Main run loop."""
         self.is_running = True
@@ -440,6 +505,15 @@ Respond naturally as Vigil. Keep voice responses concise (2-4 sentences) unless
         self.listener.stop()
         self.reflection_system.stop_scheduler()
 
+        # Stop whatever still makes LLM calls, then close the shared ledger,
+        # memory and knowledge base after their last writer. All of this
+        # happens before anything slow (like the farewell).
+        self.batch.stop()
+        self.async_brain.close()
+        self.brain.close()
+        self.memory.close()
+        self.knowledge_base.close()
+
         # Farewell
         farewell = f"Until next time, {PRIMARY_USER_NAME}. Stay vigilant."
         self.voice_output.speak(farewell)